@@ -0,0 +1,255 @@
+"""Micro-batching work queue with an interactive priority lane.
+
+Side-effect free on import. Background jobs (conversation titles, history
+summaries, embeddings) are collected per handler for up to ``max_wait``
+seconds or ``max_batch_size`` items and dispatched as one batch on a bounded
+worker pool. Interactive jobs skip the batching window and are always taken
+before batch work:
+
+- ``interactive_reserve`` workers never run batch work, so an interactive job
+  finds a free worker even while every other worker is busy with batches
+- running batches are not interrupted; preemption happens at dispatch time
+
+Handlers take a list of items and return a list of results in the same
+order; ``per_item`` adapts a single-item function such as
+``client.chat_complete``.
+"""
+
+from __future__ import annotations
+
+import math
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Any, Callable, Deque, Dict, List, Optional, Sequence
+
+INTERACTIVE = 0
+BACKGROUND = 1
+
+BatchHandler = Callable[[List[Any]], Sequence[Any]]
+
+
+def per_item(fn: Callable[[Any], Any]) -> BatchHandler:
+    """Wrap a single-item function as a batch handler (items run in order)."""
+
+    def handler(items: List[Any]) -> List[Any]:
+        return [fn(item) for item in items]
+
+    return handler
+
+
+@dataclass
+class _Job:
+    handler: BatchHandler
+    item: Any
+    future: Future
+    priority: int
+    enqueued: float
+
+
+class DelayHistogram:
+    """Fixed-size log-bucketed histogram of delays in seconds.
+
+    Buckets are 1/8 of a doubling wide (about 9%) from 10 us up to ~5 min;
+    longer delays land in the last bucket. Memory does not grow with the
+    number of samples, and percentiles report the bucket's upper bound.
+    """
+
+    MIN_SECONDS = 1e-5
+    STEPS_PER_DOUBLING = 8
+    BUCKETS = 200
+
+    __slots__ = ("counts", "total")
+
+    def __init__(self) -> None:
+        self.counts = [0] * self.BUCKETS
+        self.total = 0
+
+    def add(self, seconds: float) -> None:
+        bucket = 0
+        if seconds > self.MIN_SECONDS:
+            steps = math.log2(seconds / self.MIN_SECONDS) * self.STEPS_PER_DOUBLING
+            bucket = min(self.BUCKETS - 1, math.ceil(steps))
+        self.counts[bucket] += 1
+        self.total += 1
+
+    def percentile(self, q: float) -> float:
+        if not self.total:
+            return 0.0
+        rank = min(self.total - 1, int(q * self.total))
+        seen = 0
+        bucket = 0
+        for bucket, count in enumerate(self.counts):
+            seen += count
+            if seen > rank:
+                break
+        return self.MIN_SECONDS * 2 ** (bucket / self.STEPS_PER_DOUBLING)
+
+
+@dataclass
+class BatchStats:
+    """Dispatch metrics; delays are seconds from submit to dispatch."""
+
+    submitted: int = 0
+    completed: int = 0
+    failed: int = 0
+    batches: int = 0
+    queue_delays: Dict[int, DelayHistogram] = field(
+        default_factory=lambda: {INTERACTIVE: DelayHistogram(), BACKGROUND: DelayHistogram()}
+    )
+
+    @property
+    def mean_batch_size(self) -> float:
+        return (self.completed + self.failed) / self.batches if self.batches else 0.0
+
+    def delay_percentile(self, priority: int, q: float) -> float:
+        return self.queue_delays[priority].percentile(q)
+
+
+class BatchQueue:
+    """Bounded worker pool that micro-batches background jobs.
+
+    Parameters
+    - max_workers: total dispatch threads
+    - max_batch_size: largest batch handed to a handler
+    - max_wait: longest a background job waits for its batch to fill
+    - interactive_reserve: workers kept free of batch work (must be < max_workers)
+    """
+
+    def __init__(
+        self,
+        *,
+        max_workers: int = 4,
+        max_batch_size: int = 16,
+        max_wait: float = 0.05,
+        interactive_reserve: int = 1,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if max_workers < 1 or not 0 <= interactive_reserve < max_workers:
+            raise ValueError("Need max_workers >= 1 and 0 <= interactive_reserve < max_workers")
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be >= 1")
+        self._max_batch_size = max_batch_size
+        self._max_wait = max_wait
+        self._batch_slots = max_workers - interactive_reserve
+        self._clock = clock
+        self._cond = threading.Condition()
+        self._interactive: Deque[_Job] = deque()
+        self._pending: Dict[BatchHandler, Deque[_Job]] = {}  # insertion order = oldest batch first
+        self._running_batches = 0
+        self._closed = False
+        self.stats = BatchStats()
+        self._workers = [
+            threading.Thread(target=self._work, name=f"batch-queue-{i}", daemon=True) for i in range(max_workers)
+        ]
+        for worker in self._workers:
+            worker.start()
+
+    def submit(self, handler: BatchHandler, item: Any, *, priority: int = BACKGROUND) -> Future:
+        """Queue ``item`` for ``handler``; the future resolves to its result."""
+        future: Future = Future()
+        job = _Job(handler, item, future, priority, self._clock())
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("BatchQueue is closed")
+            self.stats.submitted += 1
+            if priority == INTERACTIVE:
+                self._interactive.append(job)
+            else:
+                self._pending.setdefault(handler, deque()).append(job)
+            self._cond.notify()
+        return future
+
+    def close(self, wait: bool = True) -> None:
+        """Stop accepting jobs; queued batches are flushed without waiting for their window."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        if wait:
+            for worker in self._workers:
+                worker.join()
+
+    def __enter__(self) -> "BatchQueue":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    def _take(self) -> Optional[List[_Job]]:
+        """Block until work is due; None once closed and drained. Caller holds no lock."""
+        with self._cond:
+            while True:
+                if self._interactive:
+                    return [self._interactive.popleft()]
+                wait: Optional[float] = None
+                if self._pending and self._running_batches < self._batch_slots:
+                    now = self._clock()
+                    for handler, jobs in self._pending.items():
+                        due = jobs[0].enqueued + self._max_wait - now
+                        if len(jobs) >= self._max_batch_size or due <= 0 or self._closed:
+                            batch = [jobs.popleft() for _ in range(min(len(jobs), self._max_batch_size))]
+                            if not jobs:
+                                del self._pending[handler]
+                            self._running_batches += 1
+                            return batch
+                        wait = due if wait is None else min(wait, due)
+                elif self._closed and not self._pending:
+                    return None
+                self._cond.wait(wait)
+
+    def _work(self) -> None:
+        stats = self.stats
+        while True:
+            batch = self._take()
+            if batch is None:
+                return
+            is_batch = batch[0].priority != INTERACTIVE
+            now = self._clock()
+            live = [job for job in batch if job.future.set_running_or_notify_cancel()]
+            try:
+                results = list(batch[0].handler([job.item for job in live])) if live else []
+                if len(results) != len(live):
+                    raise ValueError(f"Batch handler returned {len(results)} results for {len(live)} items")
+            except BaseException as exc:
+                for job in live:
+                    job.future.set_exception(exc)
+                failed, results = len(live), []
+            else:
+                for job, result in zip(live, results):
+                    job.future.set_result(result)
+                failed = 0
+            with self._cond:
+                stats.batches += 1
+                stats.completed += len(results)
+                stats.failed += failed
+                for job in batch:
+                    stats.queue_delays[job.priority].add(now - job.enqueued)
+                if is_batch:
+                    self._running_batches -= 1
+                    self._cond.notify()
+
+
+class PriorityClient:
+    """Chat client facade routing calls through a BatchQueue.
+
+    ``chat_complete`` is interactive and blocks like the wrapped client, so it
+    can be passed to ``respond_once``; ``chat_complete_later`` queues
+    background work and returns a future.
+    """
+
+    def __init__(self, client: Any, queue: BatchQueue) -> None:
+        self._client = client
+        self._queue = queue
+        self._handler = per_item(self._call)
+
+    def _call(self, request: Dict[str, Any]) -> dict:
+        return self._client.chat_complete(request["messages"], model=request.get("model"))
+
+    def chat_complete(self, messages: list[dict[str, str]], *, model: Optional[str] = None) -> dict:
+        request = {"messages": messages, "model": model}
+        return self._queue.submit(self._handler, request, priority=INTERACTIVE).result()
+
+    def chat_complete_later(self, messages: list[dict[str, str]], *, model: Optional[str] = None) -> Future:
+        return self._queue.submit(self._handler, {"messages": messages, "model": model}, priority=BACKGROUND)
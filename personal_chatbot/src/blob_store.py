@@ -0,0 +1,301 @@
+"""Content-addressed upload storage with per-conversation hard links.
+
+Side-effect free on import. Layout under the uploads directory:
+
+- ``blobs/<sha[:2]>/<sha256>``: one copy of every distinct upload
+- ``<conversation_id>/<yyyy-mm>/<filename>``: hard link to the blob, so the
+  documented per-conversation paths keep working for readers
+- ``<conversation_id>/.refs.json``: reference records, {relative path: sha256}
+
+The blob's link count is its reference count (links minus the blob entry
+itself): releasing the last conversation reference deletes the blob.
+Re-uploading known bytes keeps no second copy, but the bytes are still
+spooled to a temp file because their hash is only known at the end; a
+caller that knows the hash up front (e.g. a client-supplied digest) passes
+``sha256`` so known bytes are only hashed, never written. ``attach`` adds a
+reference from a hash alone without reading any data. Hard links are
+required; every resolved path goes through ``safe_join``.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import re
+import threading
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import BinaryIO, Dict, Iterable, Mapping, Optional, Sequence, Union
+
+from personal_chatbot.src import file_handler
+from personal_chatbot.src.file_handler import (
+    ALLOWED_EXTENSIONS,
+    MAX_UPLOAD_BYTES,
+    UPLOAD_CHUNK_SIZE,
+    SavedUpload,
+    UploadError,
+    check_conversation_id,
+    check_upload,
+    conversation_upload_dir,
+    hash_stream,
+    link_unique,
+    safe_filename,
+    safe_join,
+    stream_to_temp,
+)
+
+BLOBS_DIR = "blobs"
+REFS_FILE = ".refs.json"
+
+_SHA256 = re.compile(r"[0-9a-f]{64}")
+
+
+class StoredUpload(SavedUpload):
+    deduplicated: bool  # True when the bytes were already stored
+
+
+@dataclass
+class DedupStats:
+    uploads: int = 0
+    deduplicated: int = 0
+    bytes_written: int = 0
+    bytes_saved: int = 0
+    blobs_deleted: int = 0
+
+
+class BlobStore:
+    """Deduplicating upload store rooted at ``base_dir`` (default UPLOADS_DIR)."""
+
+    def __init__(
+        self,
+        base_dir: Path | str | None = None,
+        *,
+        max_bytes: int = MAX_UPLOAD_BYTES,
+        chunk_size: int = UPLOAD_CHUNK_SIZE,
+        allowlist: Iterable[str] | Sequence[str] = ALLOWED_EXTENSIONS,
+    ) -> None:
+        self._base = Path(file_handler.UPLOADS_DIR if base_dir is None else base_dir).resolve()
+        self._max_bytes = max_bytes
+        self._chunk_size = chunk_size
+        self._allowlist = tuple(allowlist)
+        self._lock = threading.Lock()  # serialises link/unlink (so a blob is never freed mid-attach) and stats
+        self.stats = DedupStats()
+
+    def blob_path(self, sha256: str) -> Path:
+        if not _SHA256.fullmatch(sha256):
+            raise UploadError("Invalid content hash")
+        return safe_join(self._base, BLOBS_DIR, sha256[:2], sha256)
+
+    def has(self, sha256: str) -> bool:
+        return self.blob_path(sha256).exists()
+
+    def refcount(self, sha256: str) -> int:
+        try:
+            return self.blob_path(sha256).stat().st_nlink - 1
+        except FileNotFoundError:
+            return 0
+
+    def put(
+        self,
+        stream: Union[BinaryIO, Iterable[bytes]],
+        filename: str,
+        conversation_id: str,
+        *,
+        expected_size: Optional[int] = None,
+        sha256: Optional[str] = None,
+        now: Optional[datetime] = None,
+    ) -> StoredUpload:
+        """Stream an upload, store its bytes once, and reference it from the conversation.
+
+        With ``sha256`` given and already stored, the stream is hashed without
+        being written; UploadError is raised if it does not match.
+        """
+        self._check(filename, conversation_id, expected_size)
+        tmp_dir = safe_join(self._base, BLOBS_DIR)
+        tmp_dir.mkdir(parents=True, exist_ok=True)
+        if sha256 is not None:
+            pin = self._pin(sha256, tmp_dir)
+            if pin is not None:
+                return self._put_known(stream, sha256, pin, filename, conversation_id, now)
+        tmp, size, sha256 = stream_to_temp(stream, tmp_dir, max_bytes=self._max_bytes, chunk_size=self._chunk_size)
+        try:
+            with self._lock:
+                blob = self.blob_path(sha256)
+                deduplicated = blob.exists()
+                if not deduplicated:
+                    blob.parent.mkdir(exist_ok=True)
+                    os.replace(tmp, blob)
+                upload = self._link(blob, sha256, size, filename, conversation_id, now)
+                self._count_upload(size, deduplicated)
+        finally:
+            tmp.unlink(missing_ok=True)
+        return StoredUpload(**upload, deduplicated=deduplicated)
+
+    def attach(
+        self,
+        sha256: str,
+        filename: str,
+        conversation_id: str,
+        *,
+        now: Optional[datetime] = None,
+    ) -> StoredUpload:
+        """Reference already-stored bytes by hash; no data is read or written.
+
+        Raises KeyError if the blob is unknown.
+        """
+        self._check(filename, conversation_id, None)
+        with self._lock:
+            blob = self.blob_path(sha256)
+            try:
+                size = blob.stat().st_size
+            except FileNotFoundError:
+                raise KeyError(sha256) from None
+            upload = self._link(blob, sha256, size, filename, conversation_id, now)
+            self._count_upload(size, True)
+        return StoredUpload(**upload, deduplicated=True)
+
+    def release(self, upload: Mapping[str, object]) -> bool:
+        """Drop one conversation reference (a SavedUpload); True if its blob was freed."""
+        rel = Path(str(upload["path"])).relative_to(self._base.name)
+        conversation_id = rel.parts[0]
+        self._check_conversation(conversation_id)
+        with self._lock:
+            refs = self._read_refs(conversation_id)
+            sha256 = refs.pop(rel.as_posix(), None)
+            if sha256 is None:
+                return False
+            safe_join(self._base, rel.as_posix()).unlink(missing_ok=True)
+            self._write_refs(conversation_id, refs)
+            return self._free_if_unreferenced(sha256)
+
+    def release_conversation(self, conversation_id: str) -> int:
+        """Drop every reference held by a conversation; returns the number of blobs freed."""
+        self._check_conversation(conversation_id)
+        freed = 0
+        with self._lock:
+            refs = self._read_refs(conversation_id)
+            for rel, sha256 in refs.items():
+                safe_join(self._base, rel).unlink(missing_ok=True)
+                freed += self._free_if_unreferenced(sha256)
+            safe_join(self._base, conversation_id, REFS_FILE).unlink(missing_ok=True)
+        return freed
+
+    def collect_garbage(self) -> int:
+        """Delete blobs nothing links to (e.g. left by a crash between store and link)."""
+        root = safe_join(self._base, BLOBS_DIR)
+        if not root.exists():
+            return 0
+        freed = 0
+        with self._lock:
+            for blob in root.glob("??/*"):
+                if _SHA256.fullmatch(blob.name):
+                    freed += self._free_if_unreferenced(blob.name)
+        return freed
+
+    def _pin(self, sha256: str, tmp_dir: Path) -> Optional[Path]:
+        """Hold an extra link to a stored blob so it survives until we link it; None if unknown."""
+        with self._lock:
+            blob = self.blob_path(sha256)
+            if not blob.exists():
+                return None
+            try:
+                return link_unique(blob, tmp_dir, f".pin-{sha256}", move_fallback=False)
+            except OSError as exc:
+                raise UploadError("Uploads directory does not support hard links") from exc
+
+    def _put_known(
+        self,
+        stream: Union[BinaryIO, Iterable[bytes]],
+        sha256: str,
+        pin: Path,
+        filename: str,
+        conversation_id: str,
+        now: Optional[datetime],
+    ) -> StoredUpload:
+        try:
+            size, digest = hash_stream(stream, max_bytes=self._max_bytes, chunk_size=self._chunk_size)
+            if digest != sha256:
+                raise UploadError("Upload does not match its sha256")
+            with self._lock:
+                upload = self._link(self.blob_path(sha256), sha256, size, filename, conversation_id, now)
+                self._count_upload(size, True)
+        finally:
+            pin.unlink(missing_ok=True)
+        return StoredUpload(**upload, deduplicated=True)
+
+    def _count_upload(self, size: int, deduplicated: bool) -> None:
+        """Caller holds the lock."""
+        self.stats.uploads += 1
+        if deduplicated:
+            self.stats.deduplicated += 1
+            self.stats.bytes_saved += size
+        else:
+            self.stats.bytes_written += size
+
+    def _check(self, filename: str, conversation_id: str, expected_size: Optional[int]) -> None:
+        check_upload(
+            filename,
+            conversation_id,
+            allowlist=self._allowlist,
+            max_bytes=self._max_bytes,
+            expected_size=expected_size,
+        )
+        self._check_conversation(conversation_id)
+
+    @staticmethod
+    def _check_conversation(conversation_id: str) -> None:
+        check_conversation_id(conversation_id)
+        if conversation_id == BLOBS_DIR:
+            raise UploadError("Invalid conversation id")
+
+    def _link(
+        self,
+        blob: Path,
+        sha256: str,
+        size: int,
+        filename: str,
+        conversation_id: str,
+        now: Optional[datetime],
+    ) -> SavedUpload:
+        dest_dir = conversation_upload_dir(conversation_id, base_dir=self._base, now=now)
+        name = safe_filename(filename)
+        refs = self._read_refs(conversation_id)
+        for rel, known in refs.items():
+            existing = safe_join(self._base, rel)
+            if known == sha256 and existing.parent == dest_dir and existing.name == name:
+                dest = existing  # same bytes under the same name: nothing to do
+                break
+        else:
+            try:
+                dest = link_unique(blob, dest_dir, name, move_fallback=False)
+            except OSError as exc:
+                raise UploadError("Uploads directory does not support hard links") from exc
+            refs[dest.relative_to(self._base).as_posix()] = sha256
+            self._write_refs(conversation_id, refs)
+        return SavedUpload(
+            filename=dest.name,
+            path=dest.relative_to(self._base.parent).as_posix(),
+            ext=dest.suffix.lower(),
+            size=size,
+            sha256=sha256,
+        )
+
+    def _free_if_unreferenced(self, sha256: str) -> bool:
+        if self.refcount(sha256) > 0 or not self.has(sha256):
+            return False
+        self.blob_path(sha256).unlink()
+        self.stats.blobs_deleted += 1
+        return True
+
+    def _read_refs(self, conversation_id: str) -> Dict[str, str]:
+        try:
+            return json.loads(safe_join(self._base, conversation_id, REFS_FILE).read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return {}
+
+    def _write_refs(self, conversation_id: str, refs: Dict[str, str]) -> None:
+        path = safe_join(self._base, conversation_id, REFS_FILE)
+        tmp = path.with_name(REFS_FILE + ".tmp")
+        tmp.write_text(json.dumps(refs, sort_keys=True), encoding="utf-8")
+        os.replace(tmp, path)
@@ -0,0 +1,437 @@
+"""Parallel "export everything" into one zip archive (docs/data-structures.md §8).
+
+Side-effect free on import. Conversations are rendered by a thread pool with
+the single-conversation renderer; one writer streams each rendered document,
+in input order, straight into a deflated zip entry, so nothing is staged in
+temp files and memory is bounded by ``queue_blocks * block_size`` per
+in-flight conversation:
+
+- ``<exports>/.export-manifest.json`` maps conversation_id to the SHA-256 of
+  its last exported Markdown and, for stores with a change log, the
+  ``last_change`` it covered. Unchanged conversations never reach the
+  archive: a matching change sequence skips them before rendering; stores
+  without a change log are hashed by a render pass that writes nothing
+  (changed ones are then rendered again into the archive)
+- The archive is built as ``.export-all.zip.part`` next to a journal of
+  completed entries (appended after every ``sync_every`` entries, once the
+  archive data is fsynced). After an interruption the next call truncates
+  the part file to the last journaled entry and carries on from there
+- Entries are ``{conversation_id}/{safe_title}-{yyyyMMdd_HHmmss}.md``; the
+  finished archive is published as ``conversations-{yyyyMMdd_HHmmss}.zip``
+  without overwriting an earlier one
+
+zstandard is not a dependency, so only zip (deflate) is produced. Entries
+are limited to 2 GiB uncompressed (no ZIP64 on streamed entries).
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import queue
+import struct
+import threading
+import zipfile
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, BinaryIO, Deque, Dict, Iterable, List, Optional, Set, Tuple
+
+from personal_chatbot.src import file_handler
+from personal_chatbot.src.exporter import (
+    ConversationInfo,
+    _Counter,
+    export_filename,
+    iter_records,
+    render_front_matter,
+    render_markdown,
+    safe_title,
+)
+from personal_chatbot.src.memory_manager import MemoryStore
+
+MANIFEST_FILE = ".export-manifest.json"
+PART_FILE = ".export-all.zip.part"
+JOURNAL_FILE = ".export-all.journal"
+
+_LOCAL_HEADER = struct.Struct("<4s5H3L2H")  # zipfile's structFileHeader
+_LOCAL_MAGIC = b"PK\x03\x04"
+
+
+@dataclass
+class BulkExportResult:
+    archive: Optional[Path]  # None when every conversation was unchanged
+    exported: int = 0
+    skipped: int = 0
+    resumed: int = 0  # entries carried over from an interrupted run
+    messages: int = 0
+    bytes_rendered: int = 0
+    archive_bytes: int = 0
+
+
+@dataclass
+class _Rendered:
+    sha256: str
+    messages: int
+    size: int
+    unchanged: bool = False  # hashed only; nothing to write
+
+
+@dataclass
+class _Failed:
+    error: BaseException
+
+
+def load_manifest(exports_dir: Path | str) -> Dict[str, str]:
+    """conversation_id -> SHA-256 of its last exported Markdown."""
+    return _read_manifest(Path(exports_dir))[0]
+
+
+def _read_manifest(exports_dir: Path) -> Tuple[Dict[str, str], Dict[str, List[Any]]]:
+    """(hashes, changes); ``changes`` maps conversation_id -> [last_change, info key]."""
+    try:
+        data = json.loads((exports_dir / MANIFEST_FILE).read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        return {}, {}
+    return dict(data.get("conversations", {})), dict(data.get("changes", {}))
+
+
+def _write_manifest(exports_dir: Path, hashes: Dict[str, str], changes: Dict[str, List[Any]]) -> None:
+    path = exports_dir / MANIFEST_FILE
+    tmp = path.with_name(MANIFEST_FILE + ".tmp")
+    data = {"version": 2, "conversations": hashes, "changes": changes}
+    tmp.write_text(json.dumps(data, sort_keys=True), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def _info_key(info: ConversationInfo) -> str:
+    """Fingerprint of everything besides the records that shapes the Markdown."""
+    shape = [render_front_matter(info), [list(f) for f in info.files]]
+    return hashlib.sha256(json.dumps(shape).encode("utf-8")).hexdigest()
+
+
+def entry_name(info: ConversationInfo, now: datetime) -> str:
+    return f"{safe_title(info.conversation_id)}/{export_filename(info, now)}"
+
+
+def _render(
+    store: MemoryStore,
+    info: ConversationInfo,
+    pipe: "queue.Queue[Any]",
+    stop: threading.Event,
+    *,
+    page_size: int,
+    block_size: int,
+    previous: Optional[str] = None,
+) -> None:
+    """Worker: render ``info`` into UTF-8 blocks on ``pipe``, then a _Rendered (or _Failed).
+
+    With ``previous`` (a store without a change log) the Markdown is hashed
+    first and an unchanged conversation yields only ``_Rendered(unchanged=True)``.
+    """
+
+    def put(item: Any) -> None:
+        while not stop.is_set():
+            try:
+                pipe.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    if stop.is_set():
+        return
+    if previous is not None:
+        try:
+            digest = hashlib.sha256()
+            counter = _Counter(iter_records(store, info.conversation_id, page_size=page_size))
+            size = 0
+            for piece in render_markdown(info, counter):
+                block = piece.encode("utf-8")
+                digest.update(block)
+                size += len(block)
+        except BaseException as exc:
+            put(_Failed(exc))
+            return
+        if digest.hexdigest() == previous:
+            put(_Rendered(previous, counter.count, size, unchanged=True))
+            return
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        counter = _Counter(iter_records(store, info.conversation_id, page_size=page_size))
+        pieces: List[str] = []
+        pending = 0
+        for piece in render_markdown(info, counter):
+            pieces.append(piece)
+            pending += len(piece)
+            if pending >= block_size:
+                block = "".join(pieces).encode("utf-8")
+                digest.update(block)
+                size += len(block)
+                put(block)
+                pieces, pending = [], 0
+                if stop.is_set():
+                    return
+        block = "".join(pieces).encode("utf-8")
+        digest.update(block)
+        size += len(block)
+        put(block)
+        put(_Rendered(digest.hexdigest(), counter.count, size))
+    except BaseException as exc:
+        put(_Failed(exc))
+
+
+class _Journal:
+    """Append-only record of finished entries for resuming an interrupted export."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._pending: List[str] = []
+
+    def read(self) -> Tuple[Optional[Dict[str, Any]], List[Dict[str, Any]]]:
+        """(header, entries); a torn final line is ignored."""
+        try:
+            lines = self.path.read_text(encoding="utf-8").splitlines()
+        except FileNotFoundError:
+            return None, []
+        records = []
+        for line in lines:
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                break
+        if not records or "started" not in records[0]:
+            return None, []
+        return records[0], records[1:]
+
+    def start(self, started: str, records: Iterable[Dict[str, Any]] = ()) -> None:
+        """Begin a journal, or rewrite it keeping only ``records`` (the ones verified on disk)."""
+        lines = [json.dumps({"version": 1, "started": started})]
+        lines.extend(json.dumps(record, separators=(",", ":")) for record in records)
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        tmp.write_text("\n".join(lines) + "\n", encoding="utf-8")
+        os.replace(tmp, self.path)
+
+    def append(self, record: Dict[str, Any]) -> None:
+        self._pending.append(json.dumps(record, separators=(",", ":")) + "\n")
+
+    def sync(self, archive: BinaryIO) -> None:
+        """Make the archive durable, then the entries that describe it."""
+        if not self._pending:
+            return
+        archive.flush()
+        os.fsync(archive.fileno())
+        with open(self.path, "a", encoding="utf-8") as fh:
+            fh.write("".join(self._pending))
+            fh.flush()
+            os.fsync(fh.fileno())
+        self._pending.clear()
+
+
+def _entry_record(info: zipfile.ZipInfo, end: int) -> Dict[str, Any]:
+    return {
+        "name": info.filename,
+        "offset": info.header_offset,
+        "end": end,
+        "crc": info.CRC,
+        "csize": info.compress_size,
+        "size": info.file_size,
+        "date_time": list(info.date_time),
+        "method": info.compress_type,
+        "attr": info.external_attr,
+    }
+
+
+def _restore_entry(fh: BinaryIO, file_size: int, record: Dict[str, Any]) -> Optional[zipfile.ZipInfo]:
+    """Rebuild a journaled entry's ZipInfo, or None if its local header is not on disk."""
+    name = record["name"]
+    if record["end"] > file_size:
+        return None
+    fh.seek(record["offset"])
+    header = fh.read(_LOCAL_HEADER.size)
+    if len(header) < _LOCAL_HEADER.size:
+        return None
+    fields = _LOCAL_HEADER.unpack(header)
+    if fields[0] != _LOCAL_MAGIC or fields[6] != record["crc"] or fh.read(fields[9]) != name.encode("utf-8"):
+        return None
+    info = zipfile.ZipInfo(name, date_time=tuple(record["date_time"]))
+    info.compress_type = record["method"]
+    info.CRC = record["crc"]
+    info.compress_size = record["csize"]
+    info.file_size = record["size"]
+    info.header_offset = record["offset"]
+    info.external_attr = record["attr"]
+    return info
+
+
+def _change_marker(store: Any, info: ConversationInfo) -> Optional[List[Any]]:
+    """[last_change, id of that change's record, info key], or None without a change log."""
+    if not hasattr(store, "changes_since"):
+        return None
+    seq = store.last_change(info.conversation_id)
+    latest = store.changes_since(info.conversation_id, seq - 1, 1) if seq else []
+    if not latest or latest[0].seq != seq:
+        return None
+    return [seq, latest[0].record_id, _info_key(info)]
+
+
+def export_all(
+    store: MemoryStore,
+    conversations: Iterable[ConversationInfo],
+    *,
+    exports_dir: Path | str | None = None,
+    workers: int = 4,
+    now: Optional[datetime] = None,
+    force: bool = False,
+    page_size: int = 500,
+    block_size: int = 64 * 1024,
+    queue_blocks: int = 16,
+    compresslevel: int = 6,
+    sync_every: int = 32,
+) -> BulkExportResult:
+    """Export every changed conversation into one zip in EXPORTS_DIR.
+
+    Resumes an interrupted run found in ``exports_dir`` (conversations it
+    already finished are not rendered again). ``force`` exports unchanged
+    conversations too.
+    """
+    if workers < 1:
+        raise ValueError("workers must be >= 1")
+    directory = Path(file_handler.EXPORTS_DIR if exports_dir is None else exports_dir)
+    directory.mkdir(parents=True, exist_ok=True)
+    previous, previous_changes = _read_manifest(directory)
+    journal = _Journal(directory / JOURNAL_FILE)
+    part = directory / PART_FILE
+    result = BulkExportResult(archive=None)
+
+    header, records = journal.read() if part.exists() else (None, [])
+    hashes: Dict[str, str] = {}  # conversation_id -> hash of the entry written by this run
+    changes: Dict[str, List[Any]] = {}  # conversation_id -> change marker now covered
+    seen: Set[str] = set()
+    restored: List[zipfile.ZipInfo] = []
+    if header is not None:
+        started = datetime.fromisoformat(header["started"])
+        fh = open(part, "r+b")
+        file_size = os.fstat(fh.fileno()).st_size
+        end = 0
+        kept: List[Dict[str, Any]] = []
+        for record in records:
+            entry = record.get("entry")
+            if entry is not None:
+                info = _restore_entry(fh, file_size, entry)
+                if info is None:
+                    break
+                restored.append(info)
+                end = entry["end"]
+                hashes[record["id"]] = record["sha256"]
+            if record.get("change") is not None:
+                changes[record["id"]] = record["change"]
+            seen.add(record["id"])
+            kept.append(record)
+        fh.seek(end)
+        fh.truncate()
+        journal.start(header["started"], kept)
+        result.resumed = len(restored)
+    else:
+        started = now or datetime.now(timezone.utc)
+        journal.start(started.isoformat())
+        fh = open(part, "w+b")
+
+    archive = zipfile.ZipFile(fh, "w", zipfile.ZIP_DEFLATED, compresslevel=compresslevel)
+    for info in restored:
+        archive.filelist.append(info)
+        archive.NameToInfo[info.filename] = info
+    stop = threading.Event()
+    try:
+        unsynced = 0
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="export-all") as pool:
+            todo = iter(conversations)
+            # (info, render pipe or None when skipped unrendered, change marker)
+            in_flight: Deque[Tuple[ConversationInfo, Optional["queue.Queue[Any]"], Optional[List[Any]]]] = deque()
+
+            def fill() -> None:
+                while len(in_flight) < 2 * workers:
+                    info = next(todo, None)
+                    if info is None:
+                        return
+                    cid = info.conversation_id
+                    if cid in seen:
+                        continue
+                    seen.add(cid)
+                    marker = _change_marker(store, info)
+                    if not force and marker is not None and previous_changes.get(cid) == marker and cid in previous:
+                        in_flight.append((info, None, marker))
+                        continue
+                    check = previous.get(cid) if not force and marker is None else None
+                    pipe: "queue.Queue[Any]" = queue.Queue(maxsize=queue_blocks)
+                    pool.submit(
+                        _render, store, info, pipe, stop, page_size=page_size, block_size=block_size, previous=check
+                    )
+                    in_flight.append((info, pipe, marker))
+
+            try:
+                fill()
+                while in_flight:
+                    info, pipe, marker = in_flight.popleft()
+                    cid = info.conversation_id
+                    record: Dict[str, Any] = {"id": cid, "sha256": previous.get(cid), "entry": None, "change": marker}
+                    rendered = _write_entry(archive, entry_name(info, started), pipe) if pipe is not None else None
+                    if rendered is None or rendered.unchanged:
+                        result.skipped += 1
+                    else:
+                        result.exported += 1
+                        record["sha256"] = hashes[cid] = rendered.sha256
+                        record["entry"] = _entry_record(archive.filelist[-1], archive.start_dir)
+                    if rendered is not None:
+                        result.messages += rendered.messages
+                        result.bytes_rendered += rendered.size
+                    if marker is not None:
+                        changes[cid] = marker
+                    journal.append(record)
+                    unsynced += 1
+                    if unsynced >= sync_every:
+                        journal.sync(fh)
+                        unsynced = 0
+                    fill()
+            finally:
+                stop.set()  # unblock workers still feeding abandoned pipes
+        journal.sync(fh)
+        archive.close()
+        fh.flush()
+        os.fsync(fh.fileno())
+        archive_bytes = fh.tell()
+    except BaseException:
+        journal.sync(fh)  # keep the progress made so far for the next attempt
+        archive.close()
+        fh.close()
+        raise
+    fh.close()
+
+    _write_manifest(directory, {**previous, **hashes}, {**previous_changes, **changes})
+    if archive.filelist:
+        name = f"conversations-{started:%Y%m%d_%H%M%S}.zip"
+        result.archive = file_handler.link_unique(part, directory, name)
+        result.archive_bytes = archive_bytes
+    journal.path.unlink(missing_ok=True)
+    part.unlink(missing_ok=True)
+    return result
+
+
+def _write_entry(archive: zipfile.ZipFile, name: str, pipe: "queue.Queue[Any]") -> _Rendered:
+    """Stream the worker's blocks into a new entry; an unchanged result writes nothing."""
+    item = pipe.get()
+    if isinstance(item, _Failed):
+        raise item.error
+    if isinstance(item, _Rendered) and item.unchanged:
+        return item
+    with archive.open(name, "w") as entry:
+        while True:
+            if isinstance(item, bytes):
+                entry.write(item)
+            elif isinstance(item, _Failed):
+                raise item.error
+            else:
+                return item
+            item = pipe.get()
@@ -11,7 +11,16 @@ Constraints:
 
 from __future__ import annotations
 
-from typing import Any, Optional, Protocol
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Callable, Iterator, List, Optional, Protocol
+
+from personal_chatbot.src.ids import new_id
+from personal_chatbot.src.store_adapter import adapt
+
+if TYPE_CHECKING:  # pragma: no cover - typing only
+    from personal_chatbot.src.context_builder import ContextBuilder
 
 
 class ChatBackend(Protocol):
@@ -57,6 +66,8 @@ def respond_once(
     user_id: str,
     memory_store: Any,
     client: Any,
+    *,
+    context: Optional["ContextBuilder"] = None,
 ) -> str:
     """Perform a single user→assistant turn.
 
@@ -66,117 +77,211 @@ def respond_once(
     3) Persist the assistant's reply to memory
     4) Return the assistant text
 
-    The function is adapter-agnostic. It attempts common method names used by
-    in-memory stores in tests: create, create_message, add_message, append.
+    The function is adapter-agnostic: writes go through store_adapter.adapt,
+    which resolves the store's write method once per store type.
 
     Parameters
     - user_text: The user's input message
     - user_id: Unique identifier for the user/thread
     - memory_store: Storage adapter (supports simple message persistence)
     - client: OpenRouter-like client exposing chat_complete(messages=[...], ...)
+    - context: optional ContextBuilder over ``memory_store``; when given, recent
+      history within its token budget is sent instead of the lone user message
 
     Returns
     - Assistant reply text
     """
     # 1) Write user message
+    store = adapt(memory_store)
     user_msg = {"role": "user", "content": user_text}
-    try:
-        from personal_chatbot.src.memory_manager import MemoryRecord  # type: ignore
-        # Create a stable deterministic id for this turn to satisfy MemoryRecord requirement
-        user_rec = MemoryRecord(
-            id=f"{user_id}:user:1",
-            user_id=user_id,
-            content=user_text,
-            metadata={},
-        )  # type: ignore[call-arg]
-        if hasattr(memory_store, "create"):
-            memory_store.create(user_rec)  # type: ignore[attr-defined]
-        else:
-            _write_message(memory_store, user_id, user_msg)
-    except Exception:
-        _write_message(memory_store, user_id, user_msg)
+    store.write(user_id, "user", user_text, record_id=new_id())
 
     # 2) Call model
-    messages = [user_msg]
+    messages = context.build(user_id) if context is not None else [user_msg]
     response = client.chat_complete(messages=messages)  # tests mock transport; keep minimal payload
     assistant_text = _extract_reply_text(response)
 
     # 3) Write assistant message
-    assistant_msg = {"role": "assistant", "content": assistant_text}
-    try:
-        from personal_chatbot.src.memory_manager import MemoryRecord  # type: ignore
-        asst_rec = MemoryRecord(
-            id=f"{user_id}:assistant:1",
-            user_id=user_id,
-            content=assistant_text,
-            metadata={},
-        )  # type: ignore[call-arg]
-        if hasattr(memory_store, "create"):
-            memory_store.create(asst_rec)  # type: ignore[attr-defined]
-        else:
-            _write_message(memory_store, user_id, assistant_msg)
-    except Exception:
-        _write_message(memory_store, user_id, assistant_msg)
+    store.write(user_id, "assistant", assistant_text, record_id=new_id())
 
     # 4) Return text
     return assistant_text
 
 
-def _write_message(store: Any, user_id: str, message: dict[str, Any]) -> None:
-    """Best-effort write to memory using common method names.
+@dataclass
+class FlushStats:
+    """Streaming cadence metrics for one respond_stream call (seconds)."""
+
+    tokens: int = 0
+    flushes: int = 0
+    chars: int = 0
+    overhead_seconds: float = 0.0
+    flush_intervals: List[float] = field(default_factory=list)
+
+    @property
+    def mean_flush_interval(self) -> float:
+        return sum(self.flush_intervals) / len(self.flush_intervals) if self.flush_intervals else 0.0
+
+    @property
+    def overhead_per_token(self) -> float:
+        """Buffering cost per delta, excluding time spent waiting on the model."""
+        return self.overhead_seconds / self.tokens if self.tokens else 0.0
 
-    Adapts to multiple contracts observed in tests:
-    - Stores with (user_id, message) methods: create_message/add_message/append
-    - Stores with create(record) where record is a dataclass/type exposed as MemoryRecord in memory_manager
-    - Fallbacks for write/create accepting different shapes
+
+class ResponseStream:
+    """Iterator of coalesced reply chunks produced by respond_stream.
+
+    Deltas from the model are buffered and released once ``flush_interval``
+    seconds have passed since the previous flush or ``max_buffer_chars`` are
+    pending. The assistant message is persisted exactly once when the stream
+    finishes, is cancelled, or is closed by the consumer; a failed model
+    stream persists nothing.
     """
-    # Preferred explicit methods with (user_id, message)
-    if hasattr(store, "create_message"):
-        store.create_message(user_id, message)  # type: ignore[attr-defined]
-        return
-    if hasattr(store, "add_message"):
-        store.add_message(user_id, message)  # type: ignore[attr-defined]
-        return
-    if hasattr(store, "append"):
-        store.append(user_id, message)  # type: ignore[attr-defined]
-        return
-
-    # Attempt to use MemoryRecord from our memory_manager (used in tests)
-    try:
-        from personal_chatbot.src.memory_manager import MemoryRecord  # type: ignore
-        rec = MemoryRecord(user_id=user_id, role=message.get("role"), content=message.get("content"))  # type: ignore[call-arg]
-        if hasattr(store, "create"):
-            store.create(rec)  # type: ignore[attr-defined]
-            return
-        if hasattr(store, "write"):
-            store.write(rec)  # type: ignore[attr-defined]
+
+    def __init__(
+        self,
+        deltas: Iterator[str],
+        persist: Callable[[str, bool], None],
+        *,
+        flush_interval: float,
+        max_buffer_chars: int,
+        clock: Callable[[], float],
+    ) -> None:
+        self.stats = FlushStats()
+        self.text = ""
+        self.cancelled = False
+        self._deltas = deltas
+        self._persist = persist
+        self._flush_interval = flush_interval
+        self._max_buffer_chars = max_buffer_chars
+        self._clock = clock
+        self._cancel = threading.Event()
+        self._started = False
+        self._chunks = self._run()
+
+    def __iter__(self) -> "ResponseStream":
+        return self
+
+    def __next__(self) -> str:
+        self._started = True
+        return next(self._chunks)
+
+    def cancel(self) -> None:
+        """Request cancellation; safe to call from another thread.
+
+        The stream stops at the next delta, flushes what was buffered and
+        persists the partial reply marked as cancelled.
+        """
+        self._cancel.set()
+
+    def close(self) -> None:
+        """Stop the stream, close the model stream and persist what was received.
+
+        A stream closed before its first chunk persists an empty reply
+        marked as cancelled; closing again is a no-op.
+        """
+        if self._started:
+            self._chunks.close()
             return
-    except Exception:
-        # Ignore and continue to generic handling below
-        pass
+        self._started = True
+        self._chunks.close()  # never started: its finally block will not run
+        self._cancel.set()
+        self.cancelled = True
+        close = getattr(self._deltas, "close", None)
+        if close is not None:
+            close()
+        self._persist(self.text, True)
+
+    def __del__(self) -> None:
+        if not getattr(self, "_started", True):
+            self.close()
+
+    def _run(self) -> Iterator[str]:
+        stats = self.stats
+        clock = self._clock
+        parts: List[str] = []
+        pending: List[str] = []
+        pending_chars = 0
+        last_flush = clock()
+        failed = False
+        try:
+            for delta in self._deltas:
+                if self._cancel.is_set():
+                    break
+                started = time.perf_counter()
+                stats.tokens += 1
+                pending.append(delta)
+                pending_chars += len(delta)
+                now = clock()
+                due = now - last_flush >= self._flush_interval or pending_chars >= self._max_buffer_chars
+                if due:
+                    chunk = "".join(pending)
+                    parts.append(chunk)
+                    pending.clear()
+                    pending_chars = 0
+                    stats.flushes += 1
+                    stats.chars += len(chunk)
+                    stats.flush_intervals.append(now - last_flush)
+                    last_flush = now
+                stats.overhead_seconds += time.perf_counter() - started
+                if due:
+                    yield chunk
+            if pending:
+                chunk = "".join(pending)
+                parts.append(chunk)
+                pending.clear()
+                stats.flushes += 1
+                stats.chars += len(chunk)
+                stats.flush_intervals.append(clock() - last_flush)
+                yield chunk
+        except GeneratorExit:
+            self._cancel.set()
+            raise
+        except BaseException:
+            failed = True
+            raise
+        finally:
+            self.cancelled = self._cancel.is_set()
+            close = getattr(self._deltas, "close", None)
+            if close is not None:
+                close()
+            if not failed:
+                if pending:
+                    parts.append("".join(pending))
+                self.text = "".join(parts)
+                self._persist(self.text, self.cancelled)
+
+
+def respond_stream(
+    user_text: str,
+    user_id: str,
+    memory_store: Any,
+    client: Any,
+    *,
+    flush_interval: float = 0.08,
+    max_buffer_chars: int = 512,
+    clock: Callable[[], float] = time.monotonic,
+    context: Optional["ContextBuilder"] = None,
+) -> ResponseStream:
+    """Streaming counterpart of respond_once.
+
+    Persists the user's message, then returns a ResponseStream yielding
+    buffered reply chunks (default cadence 80ms, within the 50–150ms UI
+    budget). Requires a client exposing chat_stream(messages=[...]).
+    """
+    store = adapt(memory_store)
+    user_msg = {"role": "user", "content": user_text}
+    store.write(user_id, "user", user_text, record_id=new_id())
+
+    def persist(text: str, cancelled: bool) -> None:
+        store.write(
+            user_id,
+            "assistant",
+            text,
+            record_id=new_id(),
+            metadata={"cancelled": True} if cancelled else None,
+        )
 
-    # Generic methods may accept (user_id, message) or a single-arg message/content
-    for method_name in ("create", "write"):
-        if hasattr(store, method_name):
-            method = getattr(store, method_name)
-            # Try (user_id, message)
-            try:
-                method(user_id, message)  # type: ignore[misc]
-                return
-            except TypeError:
-                pass
-            # Try single-arg dict
-            try:
-                method(message)  # type: ignore[misc]
-                return
-            except TypeError:
-                pass
-            # Try single-arg content string
-            if isinstance(message, dict) and "content" in message:
-                try:
-                    method(message["content"])  # type: ignore[misc]
-                    return
-                except Exception:
-                    pass
-
-    raise AttributeError("Unsupported memory_store interface for writing messages")
\ No newline at end of file
+    messages = context.build(user_id) if context is not None else [user_msg]
+    deltas = client.chat_stream(messages=messages)
+    return ResponseStream(deltas, persist, flush_interval=flush_interval, max_buffer_chars=max_buffer_chars, clock=clock)
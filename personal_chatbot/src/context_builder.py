@@ -0,0 +1,163 @@
+"""Conversation context assembly under a token budget.
+
+Side-effect free on import. Builds the ``messages`` list for a chat
+completion from recent MemoryStore history:
+
+- Token counts are cached per conversation, so a new turn only fetches and
+  counts the records added since the previous build.
+- When the window exceeds the budget, the oldest turns are dropped in order;
+  an optional summarizer folds turns that scroll out of a cached window into
+  a single system message. History older than the first build is never loaded.
+"""
+
+from __future__ import annotations
+
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Callable, Deque, Dict, List, Optional
+
+from personal_chatbot.src.memory_manager import MemoryError, MemoryRecord, MemoryStore
+
+Message = Dict[str, str]
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap, deterministic token estimate (~4 chars per token) plus per-message overhead."""
+    return (len(text) + 3) // 4 + 4
+
+
+@dataclass
+class _Turn:
+    record_id: str
+    message: Message
+    tokens: int
+
+
+@dataclass
+class _Window:
+    turns: Deque[_Turn] = field(default_factory=deque)
+    tokens: int = 0
+    last_id: Optional[str] = None
+    summary: Optional[Message] = None
+    summary_tokens: int = 0
+
+
+class ContextBuilder:
+    """Assemble recent history for ``user_id`` within ``max_tokens``.
+
+    Parameters
+    - store: MemoryStore holding the conversation (records carry ``metadata["role"]``)
+    - max_tokens: budget for history (and summary) messages
+    - counter: token counter for one message's content
+    - summarizer: optional deterministic callable turning dropped messages plus
+      the previous summary text into a new summary string
+    - page_size: records fetched per store call while filling the window
+    """
+
+    def __init__(
+        self,
+        store: MemoryStore,
+        *,
+        max_tokens: int = 3000,
+        counter: Callable[[str], int] = estimate_tokens,
+        summarizer: Optional[Callable[[List[Message], Optional[str]], str]] = None,
+        page_size: int = 50,
+    ) -> None:
+        if max_tokens <= 0:
+            raise ValueError("max_tokens must be positive")
+        self._store = store
+        self._max_tokens = max_tokens
+        self._counter = counter
+        self._summarizer = summarizer
+        self._page_size = page_size
+        self._windows: Dict[str, _Window] = {}
+
+    def build(self, user_id: str) -> List[Message]:
+        """Return OpenRouter-style messages, oldest first, ending with the latest turn.
+
+        The most recent record is always included, even if it alone exceeds the budget.
+        """
+        window = self._windows.get(user_id)
+        if window is None:
+            window = self._windows[user_id] = self._fill(user_id)
+        else:
+            try:
+                self._extend(user_id, window)
+            except MemoryError:
+                # Cursor record was deleted; rebuild from the store.
+                window = self._windows[user_id] = self._fill(user_id)
+        messages = [t.message for t in window.turns]
+        if window.summary is not None:
+            messages.insert(0, window.summary)
+        return messages
+
+    def token_count(self, user_id: str) -> int:
+        """Tokens used by the cached window (0 when nothing is cached)."""
+        window = self._windows.get(user_id)
+        return window.tokens + window.summary_tokens if window else 0
+
+    def invalidate(self, user_id: Optional[str] = None) -> None:
+        """Drop cached windows, e.g. after records were deleted or edited."""
+        if user_id is None:
+            self._windows.clear()
+        else:
+            self._windows.pop(user_id, None)
+
+    def _turn(self, record: MemoryRecord) -> _Turn:
+        role = record.metadata_view().get("role") or "user"
+        return _Turn(record.id, {"role": role, "content": record.content}, self._counter(record.content))
+
+    def _fill(self, user_id: str) -> _Window:
+        """Initial build: page newest-first only until the budget is reached."""
+        window = _Window()
+        newest: List[_Turn] = []
+        cursor: Optional[str] = None
+        full = False
+        while not full:
+            page = self._store.list_by_user(user_id, limit=self._page_size, newest_first=True, cursor=cursor)
+            for record in page:
+                turn = self._turn(record)
+                if newest and window.tokens + turn.tokens > self._max_tokens:
+                    full = True
+                    break
+                newest.append(turn)
+                window.tokens += turn.tokens
+            if len(page) < self._page_size:
+                break
+            cursor = page[-1].id
+        window.turns.extend(reversed(newest))
+        if newest:
+            window.last_id = newest[0].record_id
+        return window
+
+    def _extend(self, user_id: str, window: _Window) -> None:
+        """Incremental build: fetch records after ``last_id`` and trim the oldest."""
+        while True:
+            page = self._store.list_by_user(user_id, limit=self._page_size, cursor=window.last_id)
+            for record in page:
+                turn = self._turn(record)
+                window.turns.append(turn)
+                window.tokens += turn.tokens
+                window.last_id = record.id
+            if len(page) < self._page_size:
+                break
+        self._trim(window)
+
+    def _trim(self, window: _Window) -> None:
+        """Drop oldest turns until the window (plus summary) fits the budget.
+
+        With a summarizer, dropped turns are folded into the running summary;
+        if the new summary pushes the window over budget, trimming repeats.
+        """
+        dropped: List[Message] = []
+        while len(window.turns) > 1 and window.tokens + window.summary_tokens > self._max_tokens:
+            turn = window.turns.popleft()
+            window.tokens -= turn.tokens
+            dropped.append(turn.message)
+        if not dropped or self._summarizer is None:
+            return
+        previous = window.summary["content"] if window.summary else None
+        text = self._summarizer(dropped, previous)
+        window.summary = {"role": "system", "content": text}
+        window.summary_tokens = self._counter(text)
+        self._trim(window)
@@ -0,0 +1,408 @@
+"""Streaming Markdown export of conversations (docs/data-structures.md §8).
+
+Side-effect free on import. A conversation is rendered as a generator of
+small string pieces (front matter, one transcript entry per record, the
+referenced-files section) fed from ``MemoryStore.list_by_user`` pages, so
+memory stays flat however long the transcript is:
+
+- Output goes to a hidden temp file in EXPORTS_DIR through a large write
+  buffer, then is published under ``{safe_title}-{yyyyMMdd_HHmmss}.md``
+  without overwriting an existing export
+- Message bodies are fenced with a backtick run longer than any inside
+  them, so pasted code cannot break the transcript
+- ``export_incremental`` keeps one export per conversation up to date: a
+  checkpoint in ``EXPORTS_DIR/.checkpoints/`` records the store's change
+  sequence and the byte layout of the file, so later calls append only the
+  messages created since (deletions or a resized front matter re-render)
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import re
+import tempfile
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
+
+from personal_chatbot.src import file_handler
+from personal_chatbot.src.ids import id_timestamp_ms
+from personal_chatbot.src.memory_manager import CHANGE_CREATE, MemoryRecord, MemoryStore
+
+CHECKPOINTS_DIR = ".checkpoints"
+
+_BACKTICK_RUN = re.compile(r"`{3,}")
+_UNSAFE_TITLE_CHARS = re.compile(r"[^\w\-]+")
+_UUID7 = re.compile(r"[0-9a-f]{8}-[0-9a-f]{4}-7[0-9a-f]{3}-[0-9a-f]{4}-[0-9a-f]{12}")
+
+
+@dataclass(frozen=True)
+class ConversationInfo:
+    """Front-matter fields; ``conversation_id`` is the store's user_id/thread key."""
+
+    conversation_id: str
+    title: str = ""
+    created_at: str = ""
+    updated_at: str = ""
+    model: str = ""
+    files: Sequence[Tuple[str, str]] = ()  # (filename, relative_path)
+
+
+@dataclass
+class ExportResult:
+    path: Path
+    bytes_written: int
+    messages: int
+    files: List[Tuple[str, str]] = field(default_factory=list)
+    incremental: bool = False  # True when only new messages were appended
+
+
+@dataclass
+class ExportCheckpoint:
+    """How far an export got: the change it covers and the file's byte layout."""
+
+    conversation_id: str
+    path: str  # file name in the exports directory
+    seq: int  # store.last_change() read before rendering
+    last_id: Optional[str]  # newest record in the file
+    front_matter: int  # bytes
+    transcript_end: int  # bytes; the referenced-files section follows
+    size: int
+    files: List[Tuple[str, str]] = field(default_factory=list)
+
+
+def safe_title(title: str, fallback: str = "conversation") -> str:
+    slug = _UNSAFE_TITLE_CHARS.sub("-", title).strip("-")[:80]
+    return slug or fallback
+
+
+def _quote(value: str) -> str:
+    return '"' + value.replace("\\", "\\\\").replace('"', '\\"') + '"'
+
+
+def render_front_matter(info: ConversationInfo) -> str:
+    return (
+        "---\n"
+        f"title: {_quote(info.title)}\n"
+        f"created_at: {_quote(info.created_at)}\n"
+        f"updated_at: {_quote(info.updated_at)}\n"
+        f"model: {_quote(info.model)}\n"
+        "---\n\n## Transcript\n\n"
+    )
+
+
+def record_timestamp(record: MemoryRecord) -> Optional[datetime]:
+    """``metadata['created_at']`` (ISO 8601 or epoch seconds), else the UUIDv7 id's time."""
+    created = record.metadata_view().get("created_at")
+    try:
+        if isinstance(created, (int, float)):
+            return datetime.fromtimestamp(created, timezone.utc)
+        if isinstance(created, str) and created:
+            return datetime.fromisoformat(created)
+    except (ValueError, OverflowError, OSError):
+        pass
+    if _UUID7.fullmatch(record.id):
+        return datetime.fromtimestamp(id_timestamp_ms(record.id) / 1000.0, timezone.utc)
+    return None
+
+
+@lru_cache(maxsize=4096)
+def _minute_label(minute: int) -> str:
+    return f"{datetime.fromtimestamp(minute * 60, timezone.utc):%Y-%m-%d %H:%M}"
+
+
+def _entry_label(record: MemoryRecord) -> Optional[str]:
+    if "created_at" not in record.metadata_view() and _UUID7.fullmatch(record.id):
+        return _minute_label(id_timestamp_ms(record.id) // 60000)  # fast path for new_id() records
+    when = record_timestamp(record)
+    return f"{when:%Y-%m-%d %H:%M}" if when is not None else None
+
+
+def render_entry(record: MemoryRecord) -> str:
+    """One transcript bullet with the message body in an indented fenced block."""
+    role = record.metadata_view().get("role", "user")
+    label = _entry_label(record)
+    head = f"- [{label}] {role}:\n" if label is not None else f"- {role}:\n"
+    content = record.content
+    fence = "```"
+    if fence in content:
+        fence = "`" * (max(len(run) for run in _BACKTICK_RUN.findall(content)) + 1)
+    body = content.replace("\n", "\n  ")
+    return f"{head}  {fence}\n  {body}\n  {fence}\n"
+
+
+def render_files(files: Iterable[Tuple[str, str]]) -> str:
+    lines = [f"- {name} — {path}\n" for name, path in files]
+    return "\n## Referenced Files\n" + "".join(lines) if lines else ""
+
+
+def iter_records(store: MemoryStore, user_id: str, *, page_size: int = 500) -> Iterator[MemoryRecord]:
+    """All of a user's records, oldest first, fetched page by page."""
+    cursor: Optional[str] = None
+    while True:
+        page = store.list_by_user(user_id, page_size, cursor=cursor)
+        yield from page
+        if len(page) < page_size:
+            return
+        cursor = page[-1].id
+
+
+def _record_files(record: MemoryRecord) -> List[str]:
+    paths = record.metadata_view().get("file_paths") or []
+    return [str(p) for p in paths] if isinstance(paths, (list, tuple)) else []
+
+
+def _collect_files(record: MemoryRecord, files: List[Tuple[str, str]], seen: Set[str]) -> None:
+    for path in _record_files(record):
+        if path not in seen:
+            seen.add(path)
+            files.append((Path(path).name, path))
+
+
+def render_markdown(
+    info: ConversationInfo,
+    records: Iterable[MemoryRecord],
+    *,
+    collected_files: Optional[List[Tuple[str, str]]] = None,
+) -> Iterator[str]:
+    """Yield the export document piece by piece.
+
+    Files come from ``info.files`` plus any ``metadata['file_paths']`` seen in
+    the transcript; they are appended to ``collected_files`` when given.
+    """
+    files: List[Tuple[str, str]] = list(info.files)
+    seen: Set[str] = {path for _, path in files}
+    yield render_front_matter(info)
+    for record in records:
+        _collect_files(record, files, seen)
+        yield render_entry(record)
+    yield render_files(files)
+    if collected_files is not None:
+        collected_files.extend(files)
+
+
+def export_filename(info: ConversationInfo, now: Optional[datetime] = None) -> str:
+    stamp = (now or datetime.now(timezone.utc)).strftime("%Y%m%d_%H%M%S")
+    return f"{safe_title(info.title, safe_title(info.conversation_id))}-{stamp}.md"
+
+
+def write_atomically(
+    pieces: Iterable[str], directory: Path, name: str, *, buffer_size: int, replace: bool = False
+) -> Tuple[Path, int]:
+    """Stream ``pieces`` to ``directory/name`` via a buffered temp file; returns (path, bytes).
+
+    An existing file is kept (the new one gets a suffix) unless ``replace``.
+    """
+    fd, tmp_name = tempfile.mkstemp(dir=directory, prefix=".export-", suffix=".part")
+    tmp = Path(tmp_name)
+    try:
+        with os.fdopen(fd, "wb", buffering=buffer_size) as out:
+            written = 0
+            for piece in pieces:
+                written += out.write(piece.encode("utf-8"))
+            out.flush()
+            os.fsync(out.fileno())
+        if replace:
+            os.replace(tmp, directory / name)
+            return directory / name, written
+        return file_handler.link_unique(tmp, directory, name), written
+    finally:
+        tmp.unlink(missing_ok=True)
+
+
+def export_conversation(
+    store: MemoryStore,
+    info: ConversationInfo,
+    *,
+    exports_dir: Path | str | None = None,
+    now: Optional[datetime] = None,
+    page_size: int = 500,
+    buffer_size: int = 1024 * 1024,
+) -> ExportResult:
+    """Export one conversation to Markdown in EXPORTS_DIR with flat memory use."""
+    directory = Path(file_handler.EXPORTS_DIR if exports_dir is None else exports_dir)
+    directory.mkdir(parents=True, exist_ok=True)
+    files: List[Tuple[str, str]] = []
+    counter = _Counter(iter_records(store, info.conversation_id, page_size=page_size))
+    pieces = render_markdown(info, counter, collected_files=files)
+    path, written = write_atomically(pieces, directory, export_filename(info, now), buffer_size=buffer_size)
+    return ExportResult(path=path, bytes_written=written, messages=counter.count, files=files)
+
+
+def _checkpoint_file(directory: Path, conversation_id: str) -> Path:
+    return directory / CHECKPOINTS_DIR / f"{safe_title(conversation_id)}.json"
+
+
+def load_checkpoint(directory: Path | str, conversation_id: str) -> Optional[ExportCheckpoint]:
+    try:
+        data = json.loads(_checkpoint_file(Path(directory), conversation_id).read_text(encoding="utf-8"))
+    except (FileNotFoundError, ValueError):
+        return None
+    if data.get("conversation_id") != conversation_id:  # another id slugged to the same name
+        return None
+    data["files"] = [tuple(pair) for pair in data.get("files", [])]
+    return ExportCheckpoint(**data)
+
+
+def _save_checkpoint(directory: Path, checkpoint: ExportCheckpoint) -> None:
+    path = _checkpoint_file(directory, checkpoint.conversation_id)
+    path.parent.mkdir(exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(json.dumps(checkpoint.__dict__), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def export_incremental(
+    store: MemoryStore,
+    info: ConversationInfo,
+    *,
+    exports_dir: Path | str | None = None,
+    now: Optional[datetime] = None,
+    page_size: int = 500,
+    buffer_size: int = 1024 * 1024,
+) -> ExportResult:
+    """Bring the conversation's export file up to date in O(new messages).
+
+    Needs a store with ``last_change``/``changes_since`` (ChangeTrackingStore);
+    other stores get a full re-render every time. The file is re-rendered in
+    place when messages were deleted, the file no longer matches its
+    checkpoint, or the front matter changed length. ``messages`` counts the
+    records rendered by this call.
+    """
+    directory = Path(file_handler.EXPORTS_DIR if exports_dir is None else exports_dir)
+    directory.mkdir(parents=True, exist_ok=True)
+    tracking = hasattr(store, "changes_since")
+    checkpoint = load_checkpoint(directory, info.conversation_id)
+    if checkpoint is not None and tracking:
+        result = _append_new(store, info, directory, checkpoint, buffer_size=buffer_size)
+        if result is not None:
+            return result
+    seq = store.last_change(info.conversation_id) if tracking else 0  # type: ignore[attr-defined]
+    files: List[Tuple[str, str]] = []
+    counter = _Counter(iter_records(store, info.conversation_id, page_size=page_size))
+    pieces = render_markdown(info, counter, collected_files=files)
+    if checkpoint is None:
+        path, written = write_atomically(pieces, directory, export_filename(info, now), buffer_size=buffer_size)
+    else:
+        path, written = write_atomically(pieces, directory, checkpoint.path, buffer_size=buffer_size, replace=True)
+    _save_checkpoint(
+        directory,
+        ExportCheckpoint(
+            conversation_id=info.conversation_id,
+            path=path.name,
+            seq=seq,
+            last_id=counter.last.id if counter.last is not None else None,
+            front_matter=len(render_front_matter(info).encode("utf-8")),
+            transcript_end=written - len(render_files(files).encode("utf-8")),
+            size=written,
+            files=files,
+        ),
+    )
+    return ExportResult(path=path, bytes_written=written, messages=counter.count, files=files)
+
+
+def _new_record_ids(store: Any, conversation_id: str, checkpoint: ExportCheckpoint) -> Optional[Tuple[int, List[str]]]:
+    """(latest seq, ids created since the checkpoint), or None if anything was deleted."""
+    seq, created, page = checkpoint.seq, [], 1000
+    while True:
+        changes = store.changes_since(conversation_id, seq, page)
+        for change in changes:
+            if change.op != CHANGE_CREATE:
+                return None
+            created.append(change.record_id)
+        if changes:
+            seq = changes[-1].seq
+        if len(changes) < page:
+            break
+    if checkpoint.last_id in created:  # created while the checkpointed render was running
+        created = created[created.index(checkpoint.last_id) + 1 :]
+    return seq, created
+
+
+def _append_new(
+    store: Any,
+    info: ConversationInfo,
+    directory: Path,
+    checkpoint: ExportCheckpoint,
+    *,
+    buffer_size: int,
+) -> Optional[ExportResult]:
+    """Append records created since ``checkpoint``; None when a full render is needed."""
+    found = _new_record_ids(store, info.conversation_id, checkpoint)
+    if found is None:
+        return None
+    seq, ids = found
+    records = [store.get(record_id) for record_id in ids]
+    if any(record is None for record in records):
+        return None
+    files = list(checkpoint.files)
+    seen = {path for _, path in files}
+    for name, path in info.files:
+        if path not in seen:
+            seen.add(path)
+            files.append((name, path))
+    for record in records:
+        _collect_files(record, files, seen)
+    front_matter = render_front_matter(info).encode("utf-8")
+    path = directory / checkpoint.path
+    written = 0
+    try:
+        with open(path, "r+b", buffering=buffer_size) as out:
+            if os.fstat(out.fileno()).st_size != checkpoint.size:
+                return None
+            current = out.read(checkpoint.front_matter)
+            if current != front_matter:
+                if len(front_matter) != len(current):
+                    return None
+                out.seek(0)
+                written += out.write(front_matter)
+            if records or files != checkpoint.files:
+                out.seek(checkpoint.transcript_end)
+                out.truncate()
+                for record in records:
+                    written += out.write(render_entry(record).encode("utf-8"))
+                transcript_end = out.tell()
+                written += out.write(render_files(files).encode("utf-8"))
+                size = out.tell()
+            else:
+                transcript_end, size = checkpoint.transcript_end, checkpoint.size
+            out.flush()
+            os.fsync(out.fileno())
+    except FileNotFoundError:
+        return None
+    last_id = records[-1].id if records else checkpoint.last_id
+    _save_checkpoint(
+        directory,
+        ExportCheckpoint(
+            conversation_id=info.conversation_id,
+            path=checkpoint.path,
+            seq=seq,
+            last_id=last_id,
+            front_matter=len(front_matter),
+            transcript_end=transcript_end,
+            size=size,
+            files=files,
+        ),
+    )
+    return ExportResult(path=path, bytes_written=written, messages=len(records), files=files, incremental=True)
+
+
+class _Counter:
+    """Pass-through iterator counting the records it yields and keeping the last one."""
+
+    def __init__(self, records: Iterable[Any]) -> None:
+        self._records = iter(records)
+        self.count = 0
+        self.last: Any = None
+
+    def __iter__(self) -> "_Counter":
+        return self
+
+    def __next__(self) -> Any:
+        record = next(self._records)
+        self.count += 1
+        self.last = record
+        return record
@@ -0,0 +1,600 @@
+"""Document text extraction and a bounded worker-process pool.
+
+Side-effect free on import; parsing libraries are imported only when a file
+of their format is extracted:
+
+- .pdf via PyMuPDF (``fitz``), .docx via python-docx, .xlsx via openpyxl
+- images via Pillow (placeholder text plus dimensions)
+- text formats decoded as UTF-8, falling back to chardet, then Latin-1
+
+``iter_chunks`` yields the same text lazily (pages, row chunks, byte chunks)
+and ``extract_partial`` stops at a character or token budget, returning an
+``ExtractionOffset`` to resume from.
+
+``ExtractionPool`` runs ``extract_content`` in 2–3 worker processes (per the
+concurrency budget in docs/architecture.md). Each job has a timeout, each
+worker an address-space limit, running jobs can be cancelled (the worker is
+killed and replaced), and queued jobs are served smallest first so a short
+text file is never stuck behind a 500-page PDF.
+"""
+
+from __future__ import annotations
+
+import codecs
+import heapq
+import itertools
+import multiprocessing
+import threading
+import time
+from concurrent.futures import Future, InvalidStateError
+from dataclasses import dataclass, field, replace
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, TypedDict
+
+# Bumped whenever extractor output changes for the same input (cache keys use it)
+EXTRACTOR_VERSION = 1
+
+TEXT_EXTENSIONS = frozenset(
+    {".txt", ".md", ".py", ".js", ".json", ".yaml", ".yml", ".csv", ".html", ".css", ".sql", ".xml"}
+)
+IMAGE_EXTENSIONS = frozenset({".png", ".jpg", ".jpeg", ".gif", ".webp"})
+DOCUMENT_EXTENSIONS = frozenset({".pdf", ".docx", ".xlsx"})
+
+
+class ExtractionError(Exception):
+    """Raised when a file cannot be extracted (unsupported, corrupt, or worker failure)."""
+
+
+class ExtractionTimeout(ExtractionError):
+    """Raised when a job exceeds its time limit; the worker running it is replaced."""
+
+
+class ExtractedMeta(TypedDict):
+    chars: int
+    lines: int
+    ext: str
+    pages: Optional[int]
+    sheets: Optional[int]
+    dimensions: Optional[List[int]]
+
+
+class ExtractedContent(TypedDict):
+    text: str
+    meta: ExtractedMeta
+
+
+def make_content(
+    text: str,
+    ext: str,
+    *,
+    pages: Optional[int] = None,
+    sheets: Optional[int] = None,
+    dimensions: Optional[List[int]] = None,
+) -> ExtractedContent:
+    meta = ExtractedMeta(
+        chars=len(text),
+        lines=text.count("\n") + 1 if text else 0,
+        ext=ext,
+        pages=pages,
+        sheets=sheets,
+        dimensions=dimensions,
+    )
+    return ExtractedContent(text=text, meta=meta)
+
+
+def make_preview(text: str, limit: int = 2000) -> str:
+    """First ``limit`` characters, with an ellipsis when the text was cut."""
+    return text if len(text) <= limit else text[:limit] + "…"
+
+
+def _require(module: str, package: str) -> Any:
+    try:
+        return __import__(module)
+    except ImportError as exc:
+        raise ExtractionError(f"{package} is required to extract this file type") from exc
+
+
+def _detect_encoding(sample: bytes) -> str:
+    """Pick a decoder for ``sample``: UTF-8 (BOM tolerated), chardet's guess, else Latin-1."""
+    try:
+        codecs.getincrementaldecoder("utf-8-sig")().decode(sample, final=False)
+        return "utf-8-sig"
+    except UnicodeDecodeError:
+        pass
+    try:
+        import chardet
+    except ImportError:
+        chardet = None  # type: ignore[assignment]
+    if chardet is not None:
+        encoding = chardet.detect(sample[:65536]).get("encoding")
+        if encoding:
+            try:
+                codecs.lookup(encoding)
+                return encoding
+            except LookupError:
+                pass
+    return "latin-1"
+
+
+def decode_text(data: bytes) -> str:
+    """Decode bytes as UTF-8 (BOM tolerated), then chardet's guess, then Latin-1."""
+    encoding = _detect_encoding(data)
+    try:
+        return data.decode(encoding)
+    except UnicodeDecodeError:
+        return data.decode("latin-1")
+
+
+@dataclass(frozen=True)
+class ExtractionOffset:
+    """Resume point inside a document.
+
+    ``unit`` is a page (PDF), sheet (XLSX), paragraph (DOCX) or byte position
+    (text); ``row`` is the line within a sheet (0 is its ``## Sheet`` header);
+    ``char`` counts characters already consumed from the chunk starting there.
+    """
+
+    unit: int = 0
+    row: int = 0
+    char: int = 0
+
+
+@dataclass(frozen=True)
+class ExtractionChunk:
+    text: str
+    offset: ExtractionOffset  # where ``text`` starts
+
+
+def _pdf_chunks(path: Path, start: ExtractionOffset) -> Iterator[ExtractionChunk]:
+    fitz = _require("fitz", "PyMuPDF")
+    with fitz.open(path) as doc:
+        for page in range(start.unit, doc.page_count):
+            text = doc.load_page(page).get_text()
+            yield ExtractionChunk(("\n\n" if page else "") + text, ExtractionOffset(page))
+
+
+def _docx_chunks(path: Path, start: ExtractionOffset, per_chunk: int) -> Iterator[ExtractionChunk]:
+    docx = _require("docx", "python-docx")
+    paragraphs = docx.Document(str(path)).paragraphs  # python-docx parses the whole part
+    for first in range(start.unit, len(paragraphs), per_chunk):
+        text = "\n".join(p.text for p in paragraphs[first:first + per_chunk])
+        yield ExtractionChunk(("\n" if first else "") + text, ExtractionOffset(first))
+
+
+def _xlsx_chunks(path: Path, start: ExtractionOffset, per_chunk: int) -> Iterator[ExtractionChunk]:
+    openpyxl = _require("openpyxl", "openpyxl")
+    workbook = openpyxl.load_workbook(path, read_only=True, data_only=True)
+    try:
+        for index in range(start.unit, len(workbook.worksheets)):
+            sheet = workbook.worksheets[index]
+            row = start.row if index == start.unit else 0
+            lines: List[str] = []
+            if row == 0:
+                lines.append(f"## Sheet: {sheet.title}")
+            first = row
+            for values in sheet.iter_rows(min_row=max(1, row), values_only=True):
+                lines.append(_format_row(values))
+                if len(lines) == per_chunk:
+                    yield ExtractionChunk(_xlsx_text(lines, index, first), ExtractionOffset(index, first))
+                    first += len(lines)
+                    lines = []
+            if lines:
+                yield ExtractionChunk(_xlsx_text(lines, index, first), ExtractionOffset(index, first))
+    finally:
+        workbook.close()
+
+
+def _xlsx_text(lines: List[str], sheet: int, row: int) -> str:
+    return ("\n" if sheet or row else "") + "\n".join(lines)
+
+
+def _text_chunks(path: Path, start: ExtractionOffset, chunk_bytes: int) -> Iterator[ExtractionChunk]:
+    with open(path, "rb") as fh:
+        encoding = _detect_encoding(fh.read(65536))
+        if encoding == "utf-8-sig" and start.unit:
+            encoding = "utf-8"  # the BOM was consumed by an earlier chunk
+        decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+        position = start.unit
+        fh.seek(position)
+        while True:
+            raw = fh.read(chunk_bytes)
+            text = decoder.decode(raw, final=not raw)
+            if text:
+                yield ExtractionChunk(text, ExtractionOffset(position))
+            if not raw:
+                return
+            position = fh.tell() - len(decoder.getstate()[0])
+
+
+def iter_chunks(
+    path: Path | str,
+    *,
+    start: ExtractionOffset = ExtractionOffset(),
+    rows_per_chunk: int = 500,
+    paragraphs_per_chunk: int = 200,
+    text_chunk_bytes: int = 64 * 1024,
+) -> Iterator[ExtractionChunk]:
+    """Lazily yield a document's text as pages, paragraph blocks, row chunks or byte chunks.
+
+    Joining every chunk's text gives the full extracted text, and memory is
+    bounded by one chunk (DOCX excepted: its XML is parsed whole). Starting
+    at a saved ``start`` continues exactly where a previous read stopped.
+    """
+    path = Path(path)
+    ext = path.suffix.lower()
+    if ext in TEXT_EXTENSIONS:
+        chunks = _text_chunks(path, start, text_chunk_bytes)
+    elif ext == ".pdf":
+        chunks = _pdf_chunks(path, start)
+    elif ext == ".docx":
+        chunks = _docx_chunks(path, start, paragraphs_per_chunk)
+    elif ext == ".xlsx":
+        chunks = _xlsx_chunks(path, start, rows_per_chunk)
+    elif ext in IMAGE_EXTENSIONS:
+        chunks = iter([ExtractionChunk(extract_content(path)["text"], ExtractionOffset())]) if start.unit == 0 else iter(())
+    else:
+        raise ExtractionError(f"Unsupported file type: {ext or path.name!r}")
+    try:
+        first = True
+        for chunk in chunks:
+            if first and start.char:
+                chunk = ExtractionChunk(chunk.text[start.char:], replace(chunk.offset, char=start.char))
+            first = False
+            yield chunk
+    except (ExtractionError, OSError, MemoryError):
+        raise
+    except Exception as exc:  # parser-specific errors for corrupt files
+        raise ExtractionError(f"Could not extract {path.name}: {exc}") from exc
+
+
+def _approx_tokens(text: str) -> int:
+    return (len(text) + 3) // 4
+
+
+def _fit(text: str, limit: int, budget: int, count_tokens: Callable[[str], int]) -> int:
+    """Longest prefix length <= ``limit`` whose token count fits ``budget``."""
+    lo, hi = 0, limit
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if count_tokens(text[:mid]) <= budget:
+            lo = mid
+        else:
+            hi = mid - 1
+    return lo
+
+
+@dataclass
+class PartialExtraction:
+    content: ExtractedContent
+    next_offset: Optional[ExtractionOffset]  # None once the document is exhausted
+
+    @property
+    def complete(self) -> bool:
+        return self.next_offset is None
+
+
+def _document_counts(path: Path, ext: str) -> Dict[str, Optional[int]]:
+    if ext == ".pdf":
+        fitz = _require("fitz", "PyMuPDF")
+        with fitz.open(path) as doc:
+            return {"pages": doc.page_count}
+    if ext == ".xlsx":
+        openpyxl = _require("openpyxl", "openpyxl")
+        workbook = openpyxl.load_workbook(path, read_only=True)
+        try:
+            return {"sheets": len(workbook.sheetnames)}
+        finally:
+            workbook.close()
+    return {}
+
+
+def extract_partial(
+    path: Path | str,
+    *,
+    offset: Optional[ExtractionOffset] = None,
+    max_chars: Optional[int] = None,
+    max_tokens: Optional[int] = None,
+    count_tokens: Callable[[str], int] = _approx_tokens,
+    **chunking: int,
+) -> PartialExtraction:
+    """Read from ``offset`` until ``max_chars`` or ``max_tokens`` is reached.
+
+    Parsing stops at the chunk where the budget runs out; pass the returned
+    ``next_offset`` back in to continue. Meta counts describe the returned
+    text, while ``pages``/``sheets`` describe the whole document.
+    """
+    path = Path(path)
+    parts: List[str] = []
+    chars = tokens = 0
+    next_offset: Optional[ExtractionOffset] = None
+    for chunk in iter_chunks(path, start=offset or ExtractionOffset(), **chunking):
+        text = chunk.text
+        take = len(text) if max_chars is None else min(len(text), max_chars - chars)
+        if max_tokens is not None and count_tokens(text[:take]) > max_tokens - tokens:
+            take = _fit(text, take, max_tokens - tokens, count_tokens)
+        if take < len(text):
+            parts.append(text[:take])
+            next_offset = replace(chunk.offset, char=chunk.offset.char + take)
+            break
+        parts.append(text)
+        chars += take
+        tokens += count_tokens(text) if max_tokens is not None else 0
+    ext = path.suffix.lower()
+    return PartialExtraction(make_content("".join(parts), ext, **_document_counts(path, ext)), next_offset)
+
+
+def _format_row(row: Tuple[Any, ...]) -> str:
+    return ",".join("" if value is None else str(value) for value in row)
+
+
+def _extract_image(path: Path, ext: str) -> ExtractedContent:
+    _require("PIL", "Pillow")
+    from PIL import Image
+
+    with Image.open(path) as image:  # reads the header only
+        width, height = image.size
+    return make_content(f"[image file] {path.name} ({width}x{height})", ext, dimensions=[width, height])
+
+
+def extract_content(path: Path | str) -> ExtractedContent:
+    """Extract text and metadata from a saved upload (the documented ExtractedContent shape)."""
+    path = Path(path)
+    ext = path.suffix.lower()
+    if ext in TEXT_EXTENSIONS:
+        return make_content(decode_text(path.read_bytes()), ext)
+    if ext in IMAGE_EXTENSIONS:
+        try:
+            return _extract_image(path, ext)
+        except (ExtractionError, OSError, MemoryError):
+            raise
+        except Exception as exc:  # Pillow errors for corrupt files
+            raise ExtractionError(f"Could not extract {path.name}: {exc}") from exc
+    text = "".join(chunk.text for chunk in iter_chunks(path))
+    return make_content(text, ext, **_document_counts(path, ext))
+
+
+# Worker pool
+
+
+def _worker_main(conn: Any, memory_limit_bytes: Optional[int], extractor: Callable[[Path], Any]) -> None:
+    if memory_limit_bytes:
+        try:
+            import resource
+
+            resource.setrlimit(resource.RLIMIT_AS, (memory_limit_bytes, memory_limit_bytes))
+        except (ImportError, ValueError, OSError):  # pragma: no cover - platform dependent
+            pass
+    while True:
+        try:
+            message = conn.recv()
+        except EOFError:
+            return
+        if message is None:
+            return
+        try:
+            conn.send((True, extractor(message)))
+        except MemoryError:
+            conn.send((False, ("ExtractionError", "Memory limit exceeded during extraction")))
+        except ExtractionError as exc:
+            conn.send((False, ("ExtractionError", str(exc))))
+        except Exception as exc:
+            conn.send((False, ("ExtractionError", f"{type(exc).__name__}: {exc}")))
+
+
+# Fork would copy the pool's slot threads and their locks into the children.
+_DEFAULT_START_METHOD = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+
+
+class ExtractionJob:
+    """Handle for one queued or running extraction.
+
+    The future stays pending while the job runs, so ``cancel`` works the same
+    way for queued and running jobs: ``cancelled()`` is true and ``result()``
+    raises CancelledError.
+    """
+
+    def __init__(self, path: Path, priority: int) -> None:
+        self.path = path
+        self.priority = priority
+        self.future: Future = Future()
+        self.queued_at = time.monotonic()
+        self.started_at: Optional[float] = None
+
+    def result(self, timeout: Optional[float] = None) -> ExtractedContent:
+        return self.future.result(timeout)
+
+    def done(self) -> bool:
+        return self.future.done()
+
+    def cancel(self) -> bool:
+        """Cancel the job; a running job's worker process is killed. False if already finished."""
+        return self.future.cancel()
+
+    def cancelled(self) -> bool:
+        return self.future.cancelled()
+
+
+@dataclass
+class PoolStats:
+    completed: int = 0
+    failed: int = 0
+    timed_out: int = 0
+    cancelled: int = 0
+    workers_restarted: int = 0
+    busy_seconds: Dict[str, float] = field(default_factory=dict)  # per extension
+
+
+class ExtractionPool:
+    """Bounded pool of extraction worker processes with a smallest-first queue.
+
+    Parameters
+    - max_workers: concurrent extractions (docs budget 2–3)
+    - timeout: seconds a job may run before its worker is killed
+    - memory_limit_mb: address-space cap per worker (RLIMIT_AS, Unix only)
+    - extractor: picklable callable run in the workers (default extract_content)
+    - mp_context: multiprocessing context or start method name (default
+      forkserver where available, else spawn: the pool's own threads make
+      fork unsafe)
+    """
+
+    def __init__(
+        self,
+        max_workers: int = 2,
+        *,
+        timeout: float = 60.0,
+        memory_limit_mb: Optional[int] = 1024,
+        extractor: Callable[[Path], Any] = extract_content,
+        mp_context: Any = None,
+    ) -> None:
+        if max_workers < 1:
+            raise ValueError("max_workers must be >= 1")
+        self._timeout = timeout
+        self._memory_limit = memory_limit_mb * 1024 * 1024 if memory_limit_mb else None
+        self._extractor = extractor
+        if mp_context is None:
+            mp_context = _DEFAULT_START_METHOD
+        self._ctx = multiprocessing.get_context(mp_context) if isinstance(mp_context, str) else mp_context
+        self._cond = threading.Condition()
+        self._queue: List[Tuple[int, int, ExtractionJob]] = []
+        self._seq = itertools.count()
+        self._closed = False
+        self.stats = PoolStats()
+        self._slots = [
+            threading.Thread(target=self._run_slot, name=f"extraction-{i}", daemon=True) for i in range(max_workers)
+        ]
+        for slot in self._slots:
+            slot.start()
+
+    def submit(self, path: Path | str, *, priority: Optional[int] = None) -> ExtractionJob:
+        """Queue a file; lower priority runs first (default: file size in bytes)."""
+        path = Path(path)
+        if priority is None:
+            try:
+                priority = path.stat().st_size
+            except OSError:
+                priority = 0
+        job = ExtractionJob(path, priority)
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("ExtractionPool is closed")
+            heapq.heappush(self._queue, (priority, next(self._seq), job))
+            self._cond.notify()
+        return job
+
+    def close(self, *, cancel_pending: bool = False) -> None:
+        """Stop accepting jobs, finish (or cancel) queued ones and stop the workers."""
+        with self._cond:
+            self._closed = True
+            if cancel_pending:
+                for _, _, job in self._queue:
+                    job.cancel()
+            self._cond.notify_all()
+        for slot in self._slots:
+            slot.join()
+
+    def __enter__(self) -> "ExtractionPool":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close(cancel_pending=exc[0] is not None)
+
+    def _next_job(self) -> Optional[ExtractionJob]:
+        with self._cond:
+            while True:
+                while self._queue:
+                    _, _, job = heapq.heappop(self._queue)
+                    if not job.future.cancelled():
+                        return job
+                    job.future.set_running_or_notify_cancel()  # wakes wait()/as_completed()
+                    self.stats.cancelled += 1
+                if self._closed:
+                    return None
+                self._cond.wait()
+
+    def _spawn(self) -> Tuple[Any, Any]:
+        parent, child = self._ctx.Pipe()
+        process = self._ctx.Process(
+            target=_worker_main, args=(child, self._memory_limit, self._extractor), daemon=True
+        )
+        process.start()
+        child.close()
+        return process, parent
+
+    def _run_slot(self) -> None:
+        worker: Optional[Tuple[Any, Any]] = None
+        try:
+            while True:
+                job = self._next_job()
+                if job is None:
+                    return
+                if worker is None:
+                    worker = self._spawn()
+                if not self._run_job(job, *worker):
+                    _kill(*worker)
+                    worker = None
+                    with self._cond:
+                        self.stats.workers_restarted += 1
+        finally:
+            if worker is not None:
+                process, conn = worker
+                try:
+                    conn.send(None)
+                except OSError:
+                    pass
+                process.join(1.0)
+                _kill(process, conn)
+
+    def _run_job(self, job: ExtractionJob, process: Any, conn: Any) -> bool:
+        """Run one job on a worker; returns False if the worker must be replaced."""
+        job.started_at = started = time.monotonic()
+        deadline = started + self._timeout
+        healthy = True
+        try:
+            conn.send(job.path)
+            while not conn.poll(min(0.05, max(0.0, deadline - time.monotonic()))):
+                if job.future.cancelled():
+                    job.future.set_running_or_notify_cancel()
+                    self._count("cancelled")
+                    return False
+                if time.monotonic() >= deadline:
+                    self._settle(job, "timed_out", ExtractionTimeout(f"Extraction of {job.path.name} timed out"))
+                    return False
+            ok, payload = conn.recv()
+        except (EOFError, OSError):
+            code = process.exitcode
+            self._settle(job, "failed", ExtractionError(f"Extraction worker died (exit code {code})"))
+            return False
+        if ok:
+            self._settle(job, "completed", result=payload)
+        else:
+            self._settle(job, "failed", ExtractionError(payload[1]))
+            healthy = payload[1] != "Memory limit exceeded during extraction"
+        with self._cond:
+            ext = job.path.suffix.lower()
+            self.stats.busy_seconds[ext] = self.stats.busy_seconds.get(ext, 0.0) + time.monotonic() - started
+        return healthy
+
+    def _settle(
+        self, job: ExtractionJob, outcome: str, error: Optional[BaseException] = None, result: Any = None
+    ) -> None:
+        """Complete ``job`` unless it was cancelled first, and count the outcome."""
+        try:
+            if error is not None:
+                job.future.set_exception(error)
+            else:
+                job.future.set_result(result)
+        except InvalidStateError:  # cancelled after the worker finished
+            job.future.set_running_or_notify_cancel()
+            outcome = "cancelled"
+        self._count(outcome)
+
+    def _count(self, name: str) -> None:
+        with self._cond:
+            setattr(self.stats, name, getattr(self.stats, name) + 1)
+
+
+def _kill(process: Any, conn: Any) -> None:
+    if process.is_alive():
+        process.kill()
+    process.join()
+    conn.close()
@@ -0,0 +1,226 @@
+"""Persistent cache of extracted file content.
+
+Side-effect free on import. Entries are keyed by
+``(sha256 of the file, EXTRACTOR_VERSION, options)``, so identical uploads
+share one entry and an extractor upgrade invalidates old results:
+
+- One zlib-compressed JSON file per entry under ``<dir>/<key[:2]>/``,
+  written atomically
+- LRU-by-bytes eviction over the compressed sizes; recency survives
+  restarts through file modification times
+- A hit returns the text, meta and preview without touching the parser;
+  stats report hit rate, source bytes not re-parsed and extraction time saved
+"""
+
+from __future__ import annotations
+
+import hashlib
+import inspect
+import json
+import os
+import tempfile
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Mapping, Optional
+
+from personal_chatbot.src.extraction import EXTRACTOR_VERSION, ExtractedContent, extract_content, make_preview
+from personal_chatbot.src.response_cache import cache_key
+
+ENTRY_SUFFIX = ".zjson"
+
+
+class CachedExtraction(ExtractedContent):
+    preview: str
+
+
+@dataclass
+class ExtractionCacheStats:
+    hits: int = 0
+    misses: int = 0
+    stores: int = 0
+    evictions: int = 0
+    bytes_on_disk: int = 0
+    source_bytes_saved: int = 0  # upload bytes whose parsing a hit avoided
+    seconds_saved: float = 0.0  # recorded extraction time of the entries hit
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+def extraction_key(sha256: str, options: Optional[Mapping[str, Any]] = None) -> str:
+    return cache_key({"sha256": sha256, "version": EXTRACTOR_VERSION, "options": dict(options or {})})
+
+
+def _check_options(extractor: Callable[..., ExtractedContent], options: Optional[Mapping[str, Any]]) -> None:
+    if not options:
+        return
+    try:
+        signature = inspect.signature(extractor)
+    except (TypeError, ValueError):  # no introspectable signature: let the call decide
+        return
+    try:
+        signature.bind(None, **options)
+    except TypeError as exc:
+        raise ValueError(f"Extractor does not accept options {sorted(options)}: {exc}") from None
+
+
+def file_sha256(path: Path | str, chunk_size: int = 1024 * 1024) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for chunk in iter(lambda: fh.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ExtractionCache:
+    """Disk cache of ExtractedContent plus preview, bounded by ``max_bytes`` on disk."""
+
+    def __init__(
+        self,
+        directory: Path | str,
+        *,
+        max_bytes: int = 256 * 1024 * 1024,
+        compress_level: int = 6,
+        preview_chars: int = 2000,
+    ) -> None:
+        self._dir = Path(directory)
+        self._max_bytes = max_bytes
+        self._level = compress_level
+        self._preview_chars = preview_chars
+        self._lock = threading.Lock()
+        self._sizes: "OrderedDict[str, int]" = OrderedDict()  # key -> compressed size, oldest first
+        self.stats = ExtractionCacheStats()
+        self._load_index()
+
+    def get(self, sha256: str, options: Optional[Mapping[str, Any]] = None) -> Optional[CachedExtraction]:
+        key = extraction_key(sha256, options)
+        path = self._path(key)
+        with self._lock:
+            known = key in self._sizes
+            if not known:
+                self.stats.misses += 1
+        if not known:
+            return None
+        try:  # read and decompress outside the lock, so hits do not queue on disk I/O
+            entry = json.loads(zlib.decompress(path.read_bytes()))
+            os.utime(path)
+        except FileNotFoundError:  # evicted or replaced meanwhile
+            with self._lock:
+                self.stats.misses += 1
+            return None
+        except (zlib.error, ValueError):  # torn or foreign file
+            with self._lock:
+                self._remove(key)
+                self.stats.misses += 1
+            return None
+        with self._lock:
+            if key in self._sizes:
+                self._sizes.move_to_end(key)
+            self.stats.hits += 1
+            self.stats.source_bytes_saved += entry.get("source_size", 0)
+            self.stats.seconds_saved += entry.get("duration", 0.0)
+            return CachedExtraction(text=entry["text"], meta=entry["meta"], preview=entry["preview"])
+
+    def put(
+        self,
+        sha256: str,
+        content: ExtractedContent,
+        *,
+        options: Optional[Mapping[str, Any]] = None,
+        source_size: int = 0,
+        duration: float = 0.0,
+        preview: Optional[str] = None,
+    ) -> CachedExtraction:
+        key = extraction_key(sha256, options)
+        if preview is None:
+            preview = make_preview(content["text"], self._preview_chars)
+        entry = {
+            "text": content["text"],
+            "meta": content["meta"],
+            "preview": preview,
+            "source_size": source_size,
+            "duration": duration,
+        }
+        body = zlib.compress(json.dumps(entry, separators=(",", ":"), ensure_ascii=False).encode("utf-8"), self._level)
+        with self._lock:
+            if len(body) <= self._max_bytes:
+                self._write(key, body)
+                self.stats.stores += 1
+                self._evict()
+        return CachedExtraction(text=content["text"], meta=content["meta"], preview=preview)
+
+    def get_or_extract(
+        self,
+        path: Path | str,
+        *,
+        sha256: Optional[str] = None,
+        options: Optional[Mapping[str, Any]] = None,
+        extractor: Callable[..., ExtractedContent] = extract_content,
+    ) -> CachedExtraction:
+        """Serve ``path`` from the cache, extracting and storing it on a miss.
+
+        Pass ``sha256`` (e.g. from SavedUpload) to skip hashing the file.
+        ``options`` are part of the key and are passed to ``extractor`` as
+        keyword arguments, so each cached variant was produced with them;
+        options the extractor does not accept raise ValueError up front.
+        """
+        _check_options(extractor, options)
+        path = Path(path)
+        digest = sha256 or file_sha256(path)
+        cached = self.get(digest, options)
+        if cached is not None:
+            return cached
+        started = time.perf_counter()
+        content = extractor(path, **(options or {}))
+        duration = time.perf_counter() - started
+        return self.put(digest, content, options=options, source_size=path.stat().st_size, duration=duration)
+
+    def _path(self, key: str) -> Path:
+        return self._dir / key[:2] / f"{key}{ENTRY_SUFFIX}"
+
+    def _load_index(self) -> None:
+        if not self._dir.exists():
+            return
+        found = []
+        for path in self._dir.glob(f"??/*{ENTRY_SUFFIX}"):
+            stat = path.stat()
+            found.append((stat.st_mtime_ns, path.name[: -len(ENTRY_SUFFIX)], stat.st_size))
+        for _, key, size in sorted(found):
+            self._sizes[key] = size
+            self.stats.bytes_on_disk += size
+        self._evict()
+
+    def _write(self, key: str, body: bytes) -> None:
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as fh:
+                fh.write(body)
+            os.replace(tmp, path)
+        except BaseException:
+            Path(tmp).unlink(missing_ok=True)
+            raise
+        self._forget(key)
+        self._sizes[key] = len(body)
+        self.stats.bytes_on_disk += len(body)
+
+    def _evict(self) -> None:
+        while self.stats.bytes_on_disk > self._max_bytes and self._sizes:
+            self._remove(next(iter(self._sizes)))
+            self.stats.evictions += 1
+
+    def _remove(self, key: str) -> None:
+        self._path(key).unlink(missing_ok=True)
+        self._forget(key)
+
+    def _forget(self, key: str) -> None:
+        size = self._sizes.pop(key, None)
+        if size is not None:
+            self.stats.bytes_on_disk -= size
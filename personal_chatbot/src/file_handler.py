@@ -5,20 +5,28 @@ Responsibilities:
 - Provide a traversal-safe join helper
 - Provide an extension allowlist check
 - Ensure runtime directories exist (idempotent)
+- Stream uploads to disk with incremental hashing and an early size cap
 
 Security notes:
 - safe_join prevents escaping the provided base directory by resolving
   absolute paths and verifying the final candidate remains within base.
 - is_extension_allowed performs a case-insensitive exact match on suffix.
+- save_upload writes to a hidden temp file in the destination directory and
+  only links it into place once the whole stream is accepted, so partial or
+  oversized uploads never appear under their final name.
 
 This module is intentionally side-effect free on import.
 """
 
 from __future__ import annotations
 
+import hashlib
 import os
+import re
+import tempfile
+from datetime import datetime, timezone
 from pathlib import Path
-from typing import Iterable, Sequence
+from typing import BinaryIO, Iterable, Optional, Sequence, TypedDict, Union
 
 # Module-level constants expected by tests
 UPLOADS_DIR = "uploads"
@@ -31,6 +39,28 @@ DEFAULT_EXPORTS_DIR = Path("personal_chatbot") / EXPORTS_DIR
 # Common default allowlist used by tests/utilities
 ALLOWED_EXTENSIONS: tuple[str, ...] = (".txt", ".md", ".pdf", ".json", ".png", ".jpg", ".jpeg")
 
+# Upload limits (spec default 50 MB) and streaming chunk size
+MAX_UPLOAD_BYTES = 50 * 1024 * 1024
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+_UNSAFE_FILENAME_CHARS = re.compile(r"[^\w.\- ]+")
+
+
+class UploadError(ValueError):
+    """Raised when an upload is rejected; nothing is left on disk."""
+
+
+class UploadTooLarge(UploadError):
+    """Raised as soon as an upload exceeds the size cap."""
+
+
+class SavedUpload(TypedDict):
+    filename: str
+    path: str  # relative to the uploads directory's parent (uploads/..)
+    ext: str
+    size: int
+    sha256: str
+
 
 def ensure_runtime_dirs(
     base_dir: Path | str | None = None,
@@ -103,4 +133,182 @@ def safe_join(base: Path | str, *parts: str) -> Path:
     if not cand_str.startswith(base_str + os.sep):
         raise ValueError("Path traversal detected")
 
-    return candidate
\ No newline at end of file
+    return candidate
+
+
+def safe_filename(filename: str) -> str:
+    """Reduce a client-supplied name to a plain, portable basename."""
+    name = Path(filename.replace("\\", "/")).name
+    name = _UNSAFE_FILENAME_CHARS.sub("_", name).strip(" .")
+    return name or "upload"
+
+
+def _chunks(stream: Union[BinaryIO, Iterable[bytes]], chunk_size: int) -> Iterable[memoryview]:
+    """Yield views over fixed-size chunks; file objects reuse one buffer."""
+    readinto = getattr(stream, "readinto", None)
+    if readinto is not None:
+        buffer = bytearray(chunk_size)
+        view = memoryview(buffer)
+        while True:
+            n = readinto(view)
+            if not n:
+                return
+            yield view[:n]
+    read = getattr(stream, "read", None)
+    if read is not None:
+        while True:
+            data = read(chunk_size)
+            if not data:
+                return
+            yield memoryview(data)
+    for data in stream:  # type: ignore[union-attr]
+        if data:
+            yield memoryview(data)
+
+
+def save_upload(
+    stream: Union[BinaryIO, Iterable[bytes]],
+    filename: str,
+    conversation_id: str,
+    *,
+    base_dir: Path | str | None = None,
+    max_bytes: int = MAX_UPLOAD_BYTES,
+    expected_size: Optional[int] = None,
+    chunk_size: int = UPLOAD_CHUNK_SIZE,
+    allowlist: Iterable[str] | Sequence[str] = ALLOWED_EXTENSIONS,
+    now: Optional[datetime] = None,
+) -> SavedUpload:
+    """Stream an upload into ``{base}/{conversation_id}/{yyyy-mm}/`` in constant memory.
+
+    - ``stream`` is a binary file object (``readinto``/``read``) or an iterable of bytes
+    - SHA-256 is computed while writing; the cap is checked per chunk and an
+      ``expected_size`` (e.g. Content-Length) above it is rejected before reading
+    - The temp file is linked into place without overwriting; name clashes get
+      a ``-1``, ``-2``… suffix
+    Raises UploadError/UploadTooLarge, or ValueError on path traversal.
+    """
+    check_upload(filename, conversation_id, allowlist=allowlist, max_bytes=max_bytes, expected_size=expected_size)
+    base = Path(UPLOADS_DIR if base_dir is None else base_dir).resolve()
+    dest_dir = conversation_upload_dir(conversation_id, base_dir=base, now=now)
+    tmp, size, sha256 = stream_to_temp(stream, dest_dir, max_bytes=max_bytes, chunk_size=chunk_size)
+    try:
+        dest = link_unique(tmp, dest_dir, safe_filename(filename))
+    finally:
+        tmp.unlink(missing_ok=True)
+
+    return SavedUpload(
+        filename=dest.name,
+        path=dest.relative_to(base.parent).as_posix(),
+        ext=dest.suffix.lower(),
+        size=size,
+        sha256=sha256,
+    )
+
+
+def check_upload(
+    filename: str,
+    conversation_id: str,
+    *,
+    allowlist: Iterable[str] | Sequence[str] = ALLOWED_EXTENSIONS,
+    max_bytes: int = MAX_UPLOAD_BYTES,
+    expected_size: Optional[int] = None,
+) -> None:
+    """Reject an upload from its metadata alone, before any bytes are read."""
+    if not is_extension_allowed(filename, allowlist=allowlist):
+        raise UploadError(f"File type not allowed: {Path(filename).suffix or filename!r}")
+    if expected_size is not None and expected_size > max_bytes:
+        raise UploadTooLarge(f"Upload exceeds {max_bytes} bytes")
+    check_conversation_id(conversation_id)
+
+
+def check_conversation_id(conversation_id: str) -> None:
+    """Conversation ids become one directory level: no separators, no dot-names."""
+    if not conversation_id or conversation_id.startswith(".") or re.search(r"[/\\]", conversation_id):
+        raise UploadError("Invalid conversation id")
+
+
+def conversation_upload_dir(
+    conversation_id: str,
+    *,
+    base_dir: Path | str | None = None,
+    now: Optional[datetime] = None,
+) -> Path:
+    """Return (creating it) ``{base}/{conversation_id}/{yyyy-mm}``, traversal-checked."""
+    base = Path(UPLOADS_DIR if base_dir is None else base_dir).resolve()
+    month = (now or datetime.now(timezone.utc)).strftime("%Y-%m")
+    dest_dir = safe_join(base, conversation_id, month)
+    dest_dir.mkdir(parents=True, exist_ok=True)
+    return dest_dir
+
+
+def hash_stream(
+    stream: Union[BinaryIO, Iterable[bytes]],
+    *,
+    max_bytes: int = MAX_UPLOAD_BYTES,
+    chunk_size: int = UPLOAD_CHUNK_SIZE,
+) -> tuple[int, str]:
+    """Read ``stream`` to the end without storing it; return (size, sha256).
+
+    Raises UploadTooLarge as soon as more than ``max_bytes`` have been read.
+    """
+    digest = hashlib.sha256()
+    size = 0
+    for chunk in _chunks(stream, chunk_size):
+        size += len(chunk)
+        if size > max_bytes:
+            raise UploadTooLarge(f"Upload exceeds {max_bytes} bytes")
+        digest.update(chunk)
+    return size, digest.hexdigest()
+
+
+def stream_to_temp(
+    stream: Union[BinaryIO, Iterable[bytes]],
+    directory: Path,
+    *,
+    max_bytes: int,
+    chunk_size: int,
+) -> tuple[Path, int, str]:
+    """Copy ``stream`` into a hidden temp file in ``directory``; return (path, size, sha256).
+
+    The temp file is removed if the stream fails or exceeds ``max_bytes``.
+    """
+    digest = hashlib.sha256()
+    size = 0
+    fd, tmp_name = tempfile.mkstemp(dir=directory, prefix=".upload-", suffix=".part")
+    try:
+        with os.fdopen(fd, "wb") as out:
+            for chunk in _chunks(stream, chunk_size):
+                size += len(chunk)
+                if size > max_bytes:
+                    raise UploadTooLarge(f"Upload exceeds {max_bytes} bytes")
+                digest.update(chunk)
+                out.write(chunk)
+            out.flush()
+            os.fsync(out.fileno())
+    except BaseException:
+        os.unlink(tmp_name)
+        raise
+    return Path(tmp_name), size, digest.hexdigest()
+
+
+def link_unique(tmp: Path, dest_dir: Path, name: str, *, move_fallback: bool = True) -> Path:
+    """Atomically publish ``tmp`` under ``name`` (or a suffixed variant) without clobbering.
+
+    Without hard-link support, ``tmp`` is moved into place if ``move_fallback``
+    is set; otherwise the OSError propagates.
+    """
+    stem, suffix = Path(name).stem, Path(name).suffix
+    for n in range(10_000):
+        candidate = safe_join(dest_dir, name if n == 0 else f"{stem}-{n}{suffix}")
+        try:
+            os.link(tmp, candidate)
+        except FileExistsError:
+            continue
+        except OSError:
+            if not move_fallback:
+                raise
+            if candidate.exists():  # no hard links on this filesystem
+                continue
+            os.replace(tmp, candidate)
+        return candidate
+    raise UploadError("Could not allocate a unique upload name")
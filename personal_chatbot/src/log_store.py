@@ -0,0 +1,505 @@
+"""Append-only segment log MemoryStore with memory-mapped reads.
+
+Side-effect free on import. Records live in numbered segment files
+(``segment-00000001.log``) under one directory. A write appends one
+length-prefixed, CRC-checked frame and never rewrites earlier bytes:
+
+- The active segment is preallocated and memory-mapped, so an append is a
+  copy into the map; records are decoded straight from the maps through
+  memoryviews, without read() calls or intermediate bytes
+- An in-memory index (record id -> segment, offset, length; per-user
+  insertion order as in InMemoryStore) is saved to ``index.bin`` on
+  ``close()`` and after compaction. Startup loads it and replays only the
+  log written after it, or replays every segment if it is missing or stale
+- ``delete`` appends a tombstone. A background thread rewrites sealed
+  segments whose dead bytes exceed ``compact_ratio`` of their size; record
+  order is preserved, so paging is unaffected
+- Frames reach the page cache on write (like SqliteStore's
+  ``synchronous=NORMAL``); ``sync=True`` or ``flush()`` also msyncs them
+
+Single process only: nothing guards the directory against a second writer.
+"""
+
+from __future__ import annotations
+
+import json
+import mmap
+import os
+import re
+import struct
+import threading
+import zlib
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from personal_chatbot.src.memory_manager import MemoryError, MemoryRecord, MemoryStore, UserRecordIndex
+
+SEGMENT_BYTES = 64 * 1024 * 1024
+INDEX_FILE = "index.bin"
+
+_SEGMENT_NAME = re.compile(r"segment-(\d{8})\.log")
+_SEGMENT_MAGIC = b"PCLOGSG1"
+_INDEX_MAGIC = b"PCLOGIX1"
+_PUT = 1
+_DEL = 2
+
+_SEGMENT_HEADER = struct.Struct("<8sI")  # magic, generation (bumped by each compaction)
+_FRAME = struct.Struct("<IIB")  # payload length, crc32(payload, kind), kind
+_PUT_HEAD = struct.Struct("<HHI")  # id, user_id, content byte lengths; metadata JSON follows
+_DEL_HEAD = struct.Struct("<II")  # segment and generation holding the deleted PUT; id follows
+_INDEX_HEAD = struct.Struct("<8sIIII")  # magic, active segment, end offset, segments, entries
+_INDEX_SEGMENT = struct.Struct("<II")  # number, generation
+_INDEX_ENTRY = struct.Struct("<IIIHH")  # segment, offset, frame length, id chars, user_id chars
+
+_Location = Tuple[int, int, int, str]  # segment, offset, frame length, user_id
+
+
+@dataclass
+class LogStoreStats:
+    segments: int = 0
+    live_records: int = 0
+    bytes_on_disk: int = 0  # logical segment sizes
+    dead_bytes: int = 0
+    compactions: int = 0
+    bytes_reclaimed: int = 0
+    replayed_frames: int = 0  # frames read from the log (not the index) at startup
+
+
+class _Segment:
+    __slots__ = ("number", "generation", "path", "file", "map", "view", "end", "dead")
+
+    def __init__(self, number: int, path: Path) -> None:
+        self.number = number
+        self.path = path
+        self.generation = 0
+        self.file = None
+        self.map: Optional[mmap.mmap] = None
+        self.view: Optional[memoryview] = None
+        self.end = _SEGMENT_HEADER.size
+        self.dead = 0
+
+    def open(self, capacity: Optional[int] = None) -> None:
+        """Map the segment read-only, or writable and grown to ``capacity``."""
+        self.file = open(self.path, "r+b")
+        if capacity is None:
+            self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        else:
+            self.file.truncate(self.end)  # zero whatever followed the last good frame
+            self.file.truncate(capacity)
+            self.map = mmap.mmap(self.file.fileno(), capacity, access=mmap.ACCESS_WRITE)
+        self.view = memoryview(self.map)
+
+    def close(self) -> None:
+        if self.view is not None:
+            self.view.release()
+        if self.map is not None:
+            self.map.close()
+        if self.file is not None:
+            self.file.close()
+        self.view = self.map = self.file = None
+
+    def frames(self, start: int = _SEGMENT_HEADER.size) -> Iterator[Tuple[int, int, int]]:
+        """(offset, frame length, kind) of each intact frame from ``start``."""
+        view, off, limit = self.view, start, len(self.map)
+        while off + _FRAME.size <= limit:
+            length, crc, kind = _FRAME.unpack_from(view, off)
+            end = off + _FRAME.size + length
+            if kind not in (_PUT, _DEL) or end > limit or zlib.crc32(view[off + _FRAME.size : end], kind) != crc:
+                return
+            yield off, end - off, kind
+            off = end
+
+
+def _segment_path(directory: Path, number: int) -> Path:
+    return directory / f"segment-{number:08d}.log"
+
+
+def _frame(kind: int, payload: List[bytes]) -> bytes:
+    body = b"".join(payload)
+    return _FRAME.pack(len(body), zlib.crc32(body, kind), kind) + body
+
+
+class LogStore(MemoryStore):
+    """Durable MemoryStore over an append-only segment log in ``directory``.
+
+    Parameters
+    - segment_bytes: size at which the active segment is sealed
+    - compact_ratio: dead fraction of a sealed segment that triggers a rewrite
+    - compact_interval: seconds between background compaction checks (None: only ``compact()``)
+    - sync: msync every write
+    """
+
+    def __init__(
+        self,
+        directory: Path | str,
+        *,
+        segment_bytes: int = SEGMENT_BYTES,
+        compact_ratio: float = 0.5,
+        compact_interval: Optional[float] = 30.0,
+        sync: bool = False,
+    ) -> None:
+        self._dir = Path(directory)
+        self._dir.mkdir(parents=True, exist_ok=True)
+        self._segment_bytes = segment_bytes
+        self._compact_ratio = compact_ratio
+        self._sync = sync
+        self._lock = threading.RLock()
+        self._compacting = threading.Lock()
+        self._loc: Dict[str, _Location] = {}
+        self._index = UserRecordIndex()
+        self._segments: Dict[int, _Segment] = {}
+        self._compactions = 0
+        self._reclaimed = 0
+        self._replayed = 0
+        self._open()
+        self._stop = threading.Event()
+        self._compactor: Optional[threading.Thread] = None
+        if compact_interval is not None:
+            self._compactor = threading.Thread(
+                target=self._compact_loop, args=(compact_interval,), name="log-store-compactor", daemon=True
+            )
+            self._compactor.start()
+
+    # -- MemoryStore ---------------------------------------------------------
+
+    def create(self, record: MemoryRecord) -> None:
+        rid = record.id.encode("utf-8")
+        user = record.user_id.encode("utf-8")
+        content = record.content.encode("utf-8")
+        view = record.metadata_view()
+        metadata = json.dumps(view, separators=(",", ":")).encode("utf-8") if view else b""
+        if len(rid) > 0xFFFF or len(user) > 0xFFFF:
+            raise MemoryError("Record id or user_id too long")
+        frame = _frame(_PUT, [_PUT_HEAD.pack(len(rid), len(user), len(content)), rid, user, content, metadata])
+        with self._lock:
+            if record.id in self._loc:
+                raise MemoryError("Record already exists")
+            segment, offset = self._append(frame)
+            self._add(record.id, (segment.number, offset, len(frame), record.user_id))
+
+    def get(self, record_id: str) -> Optional[MemoryRecord]:
+        with self._lock:
+            loc = self._loc.get(record_id)
+            return self._read(loc) if loc is not None else None
+
+    def list_by_user(
+        self,
+        user_id: str,
+        limit: int = 50,
+        *,
+        newest_first: bool = False,
+        cursor: Optional[str] = None,
+    ) -> List[MemoryRecord]:
+        """Same paging contract as InMemoryStore.list_by_user."""
+        with self._lock:
+            ids = self._index.page(user_id, limit, newest_first=newest_first, cursor=cursor)
+            return [self._read(self._loc[rid]) for rid in ids]
+
+    def delete(self, record_id: str) -> bool:
+        rid = record_id.encode("utf-8")
+        with self._lock:
+            loc = self._loc.get(record_id)
+            if loc is None:
+                return False
+            owner = self._segments[loc[0]]
+            frame = _frame(_DEL, [_DEL_HEAD.pack(owner.number, owner.generation), rid])
+            segment, _ = self._append(frame)
+            owner.dead += loc[2]
+            if segment is owner:
+                owner.dead += len(frame)  # dropped together with the PUT
+            self._remove(record_id)
+            return True
+
+    # -- lifecycle -----------------------------------------------------------
+
+    def flush(self) -> None:
+        """msync the active segment."""
+        with self._lock:
+            self._active.map.flush()
+
+    def compact(self) -> int:
+        """Rewrite sealed segments over ``compact_ratio`` dead; returns bytes reclaimed."""
+        reclaimed = 0
+        with self._compacting:
+            with self._lock:
+                due = [
+                    seg.number
+                    for seg in self._segments.values()
+                    if seg is not self._active
+                    and seg.dead > 0
+                    and seg.dead >= self._compact_ratio * (seg.end - _SEGMENT_HEADER.size)
+                ]
+            for number in sorted(due):
+                reclaimed += self._compact_segment(number)
+            if due:
+                self._save_index()
+        return reclaimed
+
+    def close(self) -> None:
+        """Stop compaction, save the index and release the maps."""
+        self._stop.set()
+        if self._compactor is not None:
+            self._compactor.join()
+        with self._compacting, self._lock:
+            if self._active.map is None:
+                return
+            self._active.map.flush()
+            self._save_index()
+            for segment in self._segments.values():
+                segment.close()
+            with open(self._active.path, "r+b") as fh:
+                fh.truncate(self._active.end)
+
+    def __enter__(self) -> "LogStore":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    # -- writing -------------------------------------------------------------
+
+    def _append(self, frame: bytes) -> Tuple[_Segment, int]:
+        segment = self._active
+        if segment.end + len(frame) > len(segment.map):
+            segment = self._roll(len(frame))
+        offset = segment.end
+        segment.map[offset : offset + len(frame)] = frame
+        segment.end += len(frame)
+        if self._sync:
+            start = offset - offset % mmap.PAGESIZE
+            segment.map.flush(start, segment.end - start)
+        return segment, offset
+
+    def _roll(self, needed: int) -> _Segment:
+        """Seal the active segment and start the next one."""
+        sealed = self._active
+        sealed.map.flush()
+        sealed.close()
+        with open(sealed.path, "r+b") as fh:
+            fh.truncate(sealed.end)
+        sealed.open()
+        return self._new_segment(sealed.number + 1, max(self._segment_bytes, _SEGMENT_HEADER.size + needed))
+
+    def _new_segment(self, number: int, capacity: int) -> _Segment:
+        segment = _Segment(number, _segment_path(self._dir, number))
+        with open(segment.path, "wb") as fh:
+            fh.write(_SEGMENT_HEADER.pack(_SEGMENT_MAGIC, 0))
+        segment.open(capacity)
+        self._segments[number] = segment
+        self._active = segment
+        return segment
+
+    def _add(self, record_id: str, loc: _Location) -> None:
+        self._loc[record_id] = loc
+        self._index.add(loc[3], record_id)
+
+    def _remove(self, record_id: str) -> None:
+        self._index.remove(self._loc.pop(record_id)[3], record_id)
+
+    # -- reading -------------------------------------------------------------
+
+    def _read(self, loc: _Location) -> MemoryRecord:
+        view = self._segments[loc[0]].view
+        pos = loc[1] + _FRAME.size
+        id_len, user_len, content_len = _PUT_HEAD.unpack_from(view, pos)
+        pos += _PUT_HEAD.size
+        record_id = str(view[pos : pos + id_len], "utf-8")
+        pos += id_len + user_len
+        content = str(view[pos : pos + content_len], "utf-8")
+        pos += content_len
+        end = loc[1] + loc[2]
+        metadata = json.loads(str(view[pos:end], "utf-8")) if end > pos else {}
+        return MemoryRecord(id=record_id, user_id=loc[3], content=content, metadata=metadata)
+
+    def _decode_key(self, segment: _Segment, offset: int, kind: int) -> Tuple[str, str, int, int]:
+        """(record id, user_id or "", tombstone segment, tombstone generation) of a frame."""
+        view = segment.view
+        pos = offset + _FRAME.size
+        if kind == _PUT:
+            id_len, user_len, _ = _PUT_HEAD.unpack_from(view, pos)
+            pos += _PUT_HEAD.size
+            record_id = str(view[pos : pos + id_len], "utf-8")
+            return record_id, str(view[pos + id_len : pos + id_len + user_len], "utf-8"), 0, 0
+        length = _FRAME.unpack_from(view, offset)[0]
+        owner, generation = _DEL_HEAD.unpack_from(view, pos)
+        start = pos + _DEL_HEAD.size
+        return str(view[start : offset + _FRAME.size + length], "utf-8"), "", owner, generation
+
+    # -- startup -------------------------------------------------------------
+
+    def _open(self) -> None:
+        numbers = sorted(int(m.group(1)) for p in self._dir.iterdir() if (m := _SEGMENT_NAME.fullmatch(p.name)))
+        for number in numbers:
+            segment = _Segment(number, _segment_path(self._dir, number))
+            with open(segment.path, "rb") as fh:
+                magic, segment.generation = _SEGMENT_HEADER.unpack(fh.read(_SEGMENT_HEADER.size))
+            if magic != _SEGMENT_MAGIC:
+                raise MemoryError(f"Not a log segment: {segment.path.name}")
+            segment.open()
+            self._segments[number] = segment
+        if not numbers:
+            self._new_segment(1, self._segment_bytes)
+            return
+        resume = self._load_index()
+        if resume is None:
+            self._loc.clear()
+            self._index.clear()
+            resume = (numbers[0], _SEGMENT_HEADER.size)
+        for number in numbers:
+            if number >= resume[0]:
+                self._replay(self._segments[number], resume[1] if number == resume[0] else _SEGMENT_HEADER.size)
+        for segment in self._segments.values():
+            segment.dead = segment.end - _SEGMENT_HEADER.size
+        for _, (number, _, length, _) in self._loc.items():
+            self._segments[number].dead -= length
+        last = self._segments[numbers[-1]]
+        last.close()
+        last.open(max(self._segment_bytes, last.end))
+        self._active = last
+
+    def _replay(self, segment: _Segment, start: int) -> None:
+        end = start
+        for offset, length, kind in segment.frames(start):
+            record_id, user_id, _, _ = self._decode_key(segment, offset, kind)
+            if record_id in self._loc:
+                self._remove(record_id)
+            if kind == _PUT:
+                self._add(record_id, (segment.number, offset, length, user_id))
+            end = offset + length
+            self._replayed += 1
+        segment.end = end
+
+    def _load_index(self) -> Optional[Tuple[int, int]]:
+        """Load index.bin into the index; the (segment, offset) to replay from, or None if unusable."""
+        try:
+            data = (self._dir / INDEX_FILE).read_bytes()
+            magic, active, end, n_segments, n_entries = _INDEX_HEAD.unpack_from(data)
+        except (FileNotFoundError, struct.error):
+            return None
+        if magic != _INDEX_MAGIC:
+            return None
+        pos = _INDEX_HEAD.size
+        seen = set()
+        for number, generation in _INDEX_SEGMENT.iter_unpack(data[pos : pos + n_segments * _INDEX_SEGMENT.size]):
+            segment = self._segments.get(number)
+            if segment is None or segment.generation != generation:
+                return None
+            seen.add(number)
+            segment.end = len(segment.map) if number != active else end
+        if any(number <= active and number not in seen for number in self._segments) or active not in seen:
+            return None
+        if end > len(self._segments[active].map):
+            return None
+        pos += n_segments * _INDEX_SEGMENT.size
+        table_end = pos + n_entries * _INDEX_ENTRY.size
+        try:
+            names = data[table_end:].decode("utf-8")
+        except UnicodeDecodeError:
+            return None
+        users: Dict[str, str] = {}
+        cursor = 0
+        for number, offset, length, id_chars, user_chars in _INDEX_ENTRY.iter_unpack(data[pos:table_end]):
+            record_id = names[cursor : cursor + id_chars]
+            cursor += id_chars
+            user_id = names[cursor : cursor + user_chars]
+            cursor += user_chars
+            self._add(record_id, (number, offset, length, users.setdefault(user_id, user_id)))
+        return active, end
+
+    def _save_index(self) -> None:
+        with self._lock:
+            entries = sorted(self._loc.items(), key=lambda item: item[1][:2])
+            segments = [(seg.number, seg.generation) for seg in self._segments.values()]
+            active, end = self._active.number, self._active.end
+        parts = [_INDEX_HEAD.pack(_INDEX_MAGIC, active, end, len(segments), len(entries))]
+        parts.extend(_INDEX_SEGMENT.pack(number, generation) for number, generation in segments)
+        names: List[str] = []
+        for record_id, (number, offset, length, user_id) in entries:
+            parts.append(_INDEX_ENTRY.pack(number, offset, length, len(record_id), len(user_id)))
+            names.append(record_id)
+            names.append(user_id)
+        parts.append("".join(names).encode("utf-8"))
+        path = self._dir / INDEX_FILE
+        tmp = path.with_name(INDEX_FILE + ".tmp")
+        with open(tmp, "wb") as fh:
+            fh.write(b"".join(parts))
+            fh.flush()
+            os.fsync(fh.fileno())
+        os.replace(tmp, path)
+
+    # -- compaction ----------------------------------------------------------
+
+    def _compact_loop(self, interval: float) -> None:
+        while not self._stop.wait(interval):
+            self.compact()
+
+    def _compact_segment(self, number: int) -> int:
+        """Copy a sealed segment's live frames into its next generation."""
+        with self._lock:
+            segment = self._segments[number]
+            live = {loc[1]: record_id for record_id, loc in self._loc.items() if loc[0] == number}
+            generations = {seg.number: seg.generation for seg in self._segments.values()}
+            before = segment.end
+        # Sealed segments are immutable, so copying needs no lock.
+        tmp = segment.path.with_name(segment.path.name + ".compact")
+        moved: Dict[int, int] = {}
+        with open(tmp, "wb") as out:
+            out.write(_SEGMENT_HEADER.pack(_SEGMENT_MAGIC, segment.generation + 1))
+            for offset, length, kind in segment.frames():
+                if kind == _PUT:
+                    keep = offset in live
+                else:
+                    _, _, owner, generation = self._decode_key(segment, offset, kind)
+                    keep = owner != number and generations.get(owner) == generation  # its PUT may still exist
+                if keep:
+                    moved[offset] = out.tell()
+                    out.write(segment.view[offset : offset + length])
+            out.flush()
+            os.fsync(out.fileno())
+            after = out.tell()
+        with self._lock:
+            kept: Dict[int, str] = {}
+            dead = 0
+            with open(tmp, "ab") as out:
+                for offset, record_id in live.items():
+                    loc = self._loc.get(record_id)
+                    if loc is not None and loc[:2] == (number, offset):
+                        kept[offset] = record_id
+                        continue
+                    # Deleted while copying (and perhaps re-created since): the copied PUT needs a
+                    # tombstone for the new generation. It goes into this segment, right after the
+                    # PUT, so a replay applies it before anything appended after the delete.
+                    head = _DEL_HEAD.pack(number, segment.generation + 1)
+                    tombstone = _frame(_DEL, [head, record_id.encode("utf-8")])
+                    out.write(tombstone)
+                    dead += _FRAME.size + _FRAME.unpack_from(segment.view, offset)[0] + len(tombstone)
+                if dead:
+                    out.flush()
+                    os.fsync(out.fileno())
+                after = out.tell()
+            segment.close()
+            os.replace(tmp, segment.path)
+            segment.generation += 1
+            segment.end = after
+            segment.open()
+            segment.dead = dead
+            for offset, record_id in kept.items():
+                loc = self._loc[record_id]
+                self._loc[record_id] = (number, moved[offset], loc[2], loc[3])
+            self._compactions += 1
+            self._reclaimed += before - after
+        return before - after
+
+    @property
+    def stats(self) -> LogStoreStats:
+        with self._lock:
+            return LogStoreStats(
+                segments=len(self._segments),
+                live_records=len(self._loc),
+                bytes_on_disk=sum(seg.end for seg in self._segments.values()),
+                dead_bytes=sum(seg.dead for seg in self._segments.values()),
+                compactions=self._compactions,
+                bytes_reclaimed=self._reclaimed,
+                replayed_frames=self._replayed,
+            )
@@ -6,52 +6,610 @@ A Supabase-backed adapter will be added later per integration-architecture.
 
 from __future__ import annotations
 
+import bisect
+import json
+import re
+import sqlite3
+import sys
+import threading
+import time
+from array import array
+from contextlib import contextmanager
 from dataclasses import dataclass
-from typing import Any, Dict, List, Optional, Protocol
+from pathlib import Path
+from types import MappingProxyType
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Protocol, Tuple
 
 
 class MemoryError(Exception):
     """Base error for memory operations."""
 
 
-@dataclass
+_WORD = re.compile(r"\w+")
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased word tokens; shared by the in-process and FTS5 search paths."""
+    return _WORD.findall(text.lower())
+
+
+def iter_words(text: str) -> Iterator["re.Match[str]"]:
+    """The words ``tokenize`` would return, as matches with their positions (original case)."""
+    return _WORD.finditer(text)
+
+
+_NO_METADATA: Mapping[str, Any] = MappingProxyType({})
+
+
+def _intern(value: Any) -> Any:
+    return sys.intern(value) if type(value) is str else value
+
+
 class MemoryRecord:
-    id: str
-    user_id: str
-    content: str
-    metadata: Dict[str, Any]
+    """One stored message; constructed, compared and printed like a dataclass.
+
+    Slotted, and ``user_id`` and ``metadata["role"]`` are interned, so large
+    caches share those strings. Empty metadata is held as ``None`` and a dict
+    is only allocated when ``metadata`` is accessed; readers that do not
+    mutate use ``metadata_view()``, which never allocates.
+
+    Unlike the dataclass it replaces, ``dataclasses.replace``/``asdict``/
+    ``fields`` do not apply, and an assigned metadata dict is copied: the
+    record owns its metadata (mutate it through ``record.metadata``), and
+    the caller's dict is never modified.
+    """
+
+    __slots__ = ("id", "user_id", "content", "_metadata")
+    __match_args__ = ("id", "user_id", "content", "metadata")
+    __hash__ = None  # type: ignore[assignment]  # mutable and compared by value
+
+    def __init__(self, id: str, user_id: str, content: str, metadata: Dict[str, Any]) -> None:
+        self.id = id
+        self.user_id = _intern(user_id)
+        self.content = content
+        self.metadata = metadata
+
+    @property
+    def metadata(self) -> Dict[str, Any]:
+        metadata = self._metadata
+        if metadata is None:
+            metadata = self._metadata = {}
+        return metadata
+
+    @metadata.setter
+    def metadata(self, value: Dict[str, Any]) -> None:
+        if type(value) is dict:
+            if not value:
+                self._metadata = None
+                return
+            value = dict(value)
+            role = value.get("role")
+            if type(role) is str:
+                value["role"] = sys.intern(role)
+        self._metadata = value
+
+    def metadata_view(self) -> Mapping[str, Any]:
+        """The metadata for reading only; empty metadata is a shared read-only mapping."""
+        return self._metadata if self._metadata is not None else _NO_METADATA
+
+    def __eq__(self, other: object) -> bool:
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return (
+            self.id == other.id  # type: ignore[attr-defined]
+            and self.user_id == other.user_id  # type: ignore[attr-defined]
+            and self.content == other.content  # type: ignore[attr-defined]
+            and self.metadata_view() == other.metadata_view()  # type: ignore[attr-defined]
+        )
+
+    def __repr__(self) -> str:
+        return (
+            f"MemoryRecord(id={self.id!r}, user_id={self.user_id!r}, "
+            f"content={self.content!r}, metadata={self._metadata or {}!r})"
+        )
+
+
+class RecordColumns:
+    """Column-wise container for a window of records (e.g. a cached history page).
+
+    Ids and contents are plain lists; user ids and roles are small integer
+    codes in arrays; metadata is only stored per row when it is something
+    other than ``{}`` or ``{"role": ...}``, as a copy. Rows come back as
+    MemoryRecord (a new object with its own metadata each time), and
+    ``role``/``content`` read single fields without building one.
+    """
+
+    __slots__ = ("ids", "contents", "_users", "_user_table", "_user_codes", "_roles", "_role_table",
+                 "_role_codes", "_extra")
+
+    def __init__(self, records: Iterable[MemoryRecord] = ()) -> None:
+        self.ids: List[str] = []
+        self.contents: List[str] = []
+        self._users = array("I")
+        self._user_table: List[str] = []
+        self._user_codes: Dict[str, int] = {}
+        self._roles = array("B")
+        self._role_table: List[Optional[str]] = [None]  # code 0: no role
+        self._role_codes: Dict[str, int] = {}
+        self._extra: Dict[int, Dict[str, Any]] = {}  # row -> metadata kept as is
+        self.extend(records)
+
+    def append(self, record: MemoryRecord) -> None:
+        row = len(self.ids)
+        self.ids.append(record.id)
+        self.contents.append(record.content)
+        code = self._user_codes.get(record.user_id)
+        if code is None:
+            code = self._user_codes[record.user_id] = len(self._user_table)
+            self._user_table.append(record.user_id)
+        self._users.append(code)
+        metadata = record.metadata_view()
+        role_code = 0
+        if len(metadata) == 1 and type(metadata.get("role")) is str:
+            role_code = self._role_code(metadata["role"])
+        if role_code == 0 and metadata:
+            self._extra[row] = dict(metadata)
+        self._roles.append(role_code)
+
+    def extend(self, records: Iterable[MemoryRecord]) -> None:
+        for record in records:
+            self.append(record)
+
+    def role(self, index: int) -> Optional[str]:
+        row = range(len(self.ids))[index]
+        extra = self._extra.get(row)
+        return extra.get("role") if extra is not None else self._role_table[self._roles[row]]
+
+    def content(self, index: int) -> str:
+        return self.contents[index]
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __getitem__(self, index: int) -> MemoryRecord:
+        row = range(len(self.ids))[index]
+        metadata = self._extra.get(row)  # MemoryRecord copies it
+        if metadata is None:
+            role = self._role_table[self._roles[row]]
+            metadata = {"role": role} if role is not None else {}
+        return MemoryRecord(self.ids[row], self._user_table[self._users[row]], self.contents[row], metadata)
+
+    def __iter__(self) -> Iterator[MemoryRecord]:
+        for row in range(len(self.ids)):
+            yield self[row]
+
+    def _role_code(self, role: str) -> int:
+        code = self._role_codes.get(role)
+        if code is None:
+            if len(self._role_table) > 0xFF:
+                return 0  # out of codes: the row keeps its metadata dict
+            code = self._role_codes[role] = len(self._role_table)
+            self._role_table.append(role)
+        return code
+
+
+@dataclass(frozen=True)
+class SearchHit:
+    """One ranked full-text match; higher ``score`` is more relevant (BM25)."""
+
+    record_id: str
+    score: float
+    snippet: str
+
+
+CHANGE_CREATE = "create"
+CHANGE_DELETE = "delete"
+
+
+@dataclass(frozen=True)
+class Change:
+    """One entry of a conversation's change log; ``seq`` only ever increases."""
+
+    seq: int
+    op: str  # CHANGE_CREATE | CHANGE_DELETE
+    record_id: str
 
 
 class MemoryStore(Protocol):  # pragma: no cover - interface
     def create(self, record: MemoryRecord) -> None: ...
     def get(self, record_id: str) -> Optional[MemoryRecord]: ...
-    def list_by_user(self, user_id: str, limit: int = 50) -> List[MemoryRecord]: ...
+    def list_by_user(
+        self,
+        user_id: str,
+        limit: int = 50,
+        *,
+        newest_first: bool = False,
+        cursor: Optional[str] = None,
+    ) -> List[MemoryRecord]: ...
     def delete(self, record_id: str) -> bool: ...
 
 
+class SearchableStore(MemoryStore, Protocol):  # pragma: no cover - interface
+    def search(self, user_id: str, query: str, limit: int = 10) -> List[SearchHit]: ...
+
+
+class ChangeTrackingStore(MemoryStore, Protocol):  # pragma: no cover - interface
+    def last_change(self, user_id: str) -> int: ...
+    def changes_since(self, user_id: str, after: int = 0, limit: int = 1000) -> List[Change]: ...
+
+
+class _UserIds:
+    """Insertion-ordered record ids for one user; deletions leave ``None``."""
+
+    __slots__ = ("ids", "live")
+
+    def __init__(self) -> None:
+        self.ids: List[Optional[str]] = []
+        self.live = 0
+
+
+class UserRecordIndex:
+    """Per-user insertion order of record ids with O(limit) cursor paging.
+
+    The listing index behind InMemoryStore and LogStore: the store keeps the
+    records, this keeps their order. Deleted ids leave a ``None`` tombstone
+    so the slots of later records stay valid; a user's list is compacted
+    once tombstones outnumber live entries. Not thread-safe.
+    """
+
+    # Compaction is skipped for small lists; rebuilding them buys nothing.
+    _COMPACT_MIN_TOMBSTONES = 32
+
+    def __init__(self) -> None:
+        self._users: Dict[str, _UserIds] = {}
+        self._slot: Dict[str, int] = {}
+
+    def add(self, user_id: str, record_id: str) -> None:
+        index = self._users.get(user_id)
+        if index is None:
+            index = self._users[user_id] = _UserIds()
+        self._slot[record_id] = len(index.ids)
+        index.ids.append(record_id)
+        index.live += 1
+
+    def remove(self, user_id: str, record_id: str) -> None:
+        index = self._users[user_id]
+        index.ids[self._slot.pop(record_id)] = None
+        index.live -= 1
+        if index.live == 0:
+            del self._users[user_id]
+            return
+        tombstones = len(index.ids) - index.live
+        if tombstones >= self._COMPACT_MIN_TOMBSTONES and tombstones > index.live:
+            index.ids = [rid for rid in index.ids if rid is not None]
+            for slot, rid in enumerate(index.ids):
+                self._slot[rid] = slot
+
+    def page(
+        self,
+        user_id: str,
+        limit: int,
+        *,
+        newest_first: bool = False,
+        cursor: Optional[str] = None,
+    ) -> List[str]:
+        """Up to ``limit`` of the user's record ids, paged as in ``list_by_user``.
+
+        Raises MemoryError when the cursor does not name a live record of this user.
+        """
+        index = self._users.get(user_id)
+        if cursor is not None:
+            slot = self._slot.get(cursor)
+            if slot is None or index is None or slot >= len(index.ids) or index.ids[slot] != cursor:
+                raise MemoryError("Unknown cursor")
+        if index is None or limit <= 0:
+            return []
+        ids = index.ids
+        step = -1 if newest_first else 1
+        if cursor is None:
+            pos = len(ids) - 1 if newest_first else 0
+        else:
+            pos = self._slot[cursor] + step
+        page: List[str] = []
+        while 0 <= pos < len(ids) and len(page) < limit:
+            record_id = ids[pos]
+            if record_id is not None:
+                page.append(record_id)
+            pos += step
+        return page
+
+    def clear(self) -> None:
+        self._users.clear()
+        self._slot.clear()
+
+
 class InMemoryStore(MemoryStore):
-    """Minimal in-memory implementation for testing."""
+    """Minimal in-memory implementation for testing.
+
+    Keeps a per-user secondary index (UserRecordIndex) so ``list_by_user``
+    costs O(limit) regardless of how many records other users hold, and a
+    per-user change log of ``(seq, op, record_id)`` tuples for ``changes_since``.
+    """
 
     def __init__(self) -> None:
         self._store: Dict[str, MemoryRecord] = {}
+        self._index = UserRecordIndex()
+        self._seq = 0
+        self._changes: Dict[str, List[Tuple[int, str, str]]] = {}
 
     def create(self, record: MemoryRecord) -> None:
         if record.id in self._store:
             raise MemoryError("Record already exists")
         self._store[record.id] = record
+        self._log(record.user_id, CHANGE_CREATE, record.id)
+        self._index.add(record.user_id, record.id)
 
     def get(self, record_id: str) -> Optional[MemoryRecord]:
         return self._store.get(record_id)
 
-    def list_by_user(self, user_id: str, limit: int = 50) -> List[MemoryRecord]:
-        results = [r for r in self._store.values() if r.user_id == user_id]
-        return results[:limit]
+    def list_by_user(
+        self,
+        user_id: str,
+        limit: int = 50,
+        *,
+        newest_first: bool = False,
+        cursor: Optional[str] = None,
+    ) -> List[MemoryRecord]:
+        """Return up to ``limit`` records for ``user_id`` in insertion order.
+
+        - newest_first: walk the history from the most recent record backwards
+        - cursor: id of the last record of the previous page; results resume
+          strictly after it in the chosen direction
+        Raises MemoryError when the cursor does not name a live record of this user.
+        """
+        store = self._store
+        return [store[rid] for rid in self._index.page(user_id, limit, newest_first=newest_first, cursor=cursor)]
 
     def delete(self, record_id: str) -> bool:
-        return self._store.pop(record_id, None) is not None
+        record = self._store.pop(record_id, None)
+        if record is None:
+            return False
+        self._log(record.user_id, CHANGE_DELETE, record_id)
+        self._index.remove(record.user_id, record_id)
+        return True
+
+    def last_change(self, user_id: str) -> int:
+        """Sequence number of the user's latest create/delete (0 if none)."""
+        log = self._changes.get(user_id)
+        return log[-1][0] if log else 0
+
+    def changes_since(self, user_id: str, after: int = 0, limit: int = 1000) -> List[Change]:
+        """Up to ``limit`` of the user's changes with ``seq > after``, oldest first."""
+        log = self._changes.get(user_id)
+        if not log or limit <= 0:
+            return []
+        start = bisect.bisect_right(log, after, key=lambda entry: entry[0])
+        return [Change(*entry) for entry in log[start : start + limit]]
+
+    def _log(self, user_id: str, op: str, record_id: str) -> None:
+        self._seq += 1
+        self._changes.setdefault(user_id, []).append((self._seq, op, record_id))
+
+
+class SqliteStore(MemoryStore):
+    """Durable local store backed by SQLite in WAL mode.
+
+    - Statements are fixed strings so sqlite3's statement cache reuses the
+      prepared form on every call.
+    - Each write outside ``batch()`` commits on its own; writes inside a
+      ``batch()`` block share a single transaction (one WAL sync).
+    - A single connection is shared across threads and guarded by a lock.
+    - An FTS5 index over ``content`` is maintained by triggers, so ``search``
+      reflects every create/delete without a separate indexing step.
+    - The ``memory_changes`` log is also filled by triggers; records stored
+      before it existed have no entries.
+    """
+
+    _SCHEMA = (
+        """
+        CREATE TABLE IF NOT EXISTS memory_records (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            id TEXT NOT NULL UNIQUE,
+            user_id TEXT NOT NULL,
+            content TEXT NOT NULL,
+            metadata TEXT NOT NULL,
+            created_at REAL NOT NULL
+        )
+        """,
+        # Paging follows insertion order (seq), never the wall clock.
+        "DROP INDEX IF EXISTS idx_memory_records_user_created",
+        "CREATE INDEX IF NOT EXISTS idx_memory_records_user_seq ON memory_records (user_id, seq)",
+        """
+        CREATE TABLE IF NOT EXISTS memory_changes (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id TEXT NOT NULL,
+            op TEXT NOT NULL,
+            record_id TEXT NOT NULL
+        )
+        """,
+        "CREATE INDEX IF NOT EXISTS idx_memory_changes_user ON memory_changes (user_id, seq)",
+        "CREATE TRIGGER IF NOT EXISTS memory_changes_ai AFTER INSERT ON memory_records BEGIN "
+        "INSERT INTO memory_changes (user_id, op, record_id) VALUES (new.user_id, 'create', new.id); END",
+        "CREATE TRIGGER IF NOT EXISTS memory_changes_ad AFTER DELETE ON memory_records BEGIN "
+        "INSERT INTO memory_changes (user_id, op, record_id) VALUES (old.user_id, 'delete', old.id); END",
+    )
+    _INSERT = (
+        "INSERT INTO memory_records (id, user_id, content, metadata, created_at) "
+        "VALUES (?, ?, ?, ?, ?)"
+    )
+    _SELECT_ONE = "SELECT id, user_id, content, metadata FROM memory_records WHERE id = ?"
+    _SELECT_POSITION = "SELECT user_id, seq FROM memory_records WHERE id = ?"
+    _LIST_ASC = (
+        "SELECT id, user_id, content, metadata FROM memory_records "
+        "WHERE user_id = ? AND seq > ? ORDER BY seq LIMIT ?"
+    )
+    _LIST_DESC = (
+        "SELECT id, user_id, content, metadata FROM memory_records "
+        "WHERE user_id = ? AND seq < ? ORDER BY seq DESC LIMIT ?"
+    )
+    _DELETE = "DELETE FROM memory_records WHERE id = ?"
+    _MAX_SEQ = (1 << 63) - 1  # largest SQLite INTEGER
+    _LAST_CHANGE = "SELECT MAX(seq) FROM memory_changes WHERE user_id = ?"
+    _CHANGES_SINCE = (
+        "SELECT seq, op, record_id FROM memory_changes WHERE user_id = ? AND seq > ? ORDER BY seq LIMIT ?"
+    )
+    _FTS_SCHEMA = (
+        "CREATE VIRTUAL TABLE memory_records_fts USING fts5("
+        "content, content='memory_records', content_rowid='seq')",
+        "CREATE TRIGGER IF NOT EXISTS memory_records_ai AFTER INSERT ON memory_records BEGIN "
+        "INSERT INTO memory_records_fts (rowid, content) VALUES (new.seq, new.content); END",
+        "CREATE TRIGGER IF NOT EXISTS memory_records_ad AFTER DELETE ON memory_records BEGIN "
+        "INSERT INTO memory_records_fts (memory_records_fts, rowid, content) "
+        "VALUES ('delete', old.seq, old.content); END",
+        "INSERT INTO memory_records_fts (memory_records_fts) VALUES ('rebuild')",
+    )
+    _SEARCH = (
+        "SELECT r.id, -bm25(memory_records_fts), "
+        "snippet(memory_records_fts, 0, '[', ']', '…', 12) "
+        "FROM memory_records_fts JOIN memory_records r ON r.seq = memory_records_fts.rowid "
+        "WHERE memory_records_fts MATCH ? AND r.user_id = ? "
+        "ORDER BY bm25(memory_records_fts) LIMIT ?"
+    )
+
+    def __init__(self, path: Path | str = ":memory:", *, cached_statements: int = 64) -> None:
+        self._conn = sqlite3.connect(
+            str(path),
+            isolation_level=None,  # explicit BEGIN/COMMIT for group commit
+            check_same_thread=False,
+            cached_statements=cached_statements,
+        )
+        self._lock = threading.RLock()
+        self._batch_depth = 0
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        for statement in self._SCHEMA:
+            self._conn.execute(statement)
+        self._fts = self._ensure_fts()
+
+    def create(self, record: MemoryRecord) -> None:
+        metadata = record.metadata_view()
+        params = (
+            record.id,
+            record.user_id,
+            record.content,
+            json.dumps(metadata, separators=(",", ":")) if metadata else "{}",
+            time.time(),
+        )
+        with self._lock:
+            try:
+                self._conn.execute(self._INSERT, params)
+            except sqlite3.IntegrityError as exc:
+                raise MemoryError("Record already exists") from exc
+
+    def get(self, record_id: str) -> Optional[MemoryRecord]:
+        with self._lock:
+            row = self._conn.execute(self._SELECT_ONE, (record_id,)).fetchone()
+        return self._to_record(row) if row is not None else None
+
+    def list_by_user(
+        self,
+        user_id: str,
+        limit: int = 50,
+        *,
+        newest_first: bool = False,
+        cursor: Optional[str] = None,
+    ) -> List[MemoryRecord]:
+        """Return up to ``limit`` records for ``user_id`` in insertion order.
+
+        Same paging contract as InMemoryStore.list_by_user; served from the
+        (user_id, seq) index, so ``created_at`` never affects the order.
+        """
+        with self._lock:
+            if cursor is not None:
+                pos = self._conn.execute(self._SELECT_POSITION, (cursor,)).fetchone()
+                if pos is None or pos[0] != user_id:
+                    raise MemoryError("Unknown cursor")
+                seq = pos[1]
+            elif newest_first:
+                seq = self._MAX_SEQ
+            else:
+                seq = 0
+            if limit <= 0:
+                return []
+            sql = self._LIST_DESC if newest_first else self._LIST_ASC
+            rows = self._conn.execute(sql, (user_id, seq, limit)).fetchall()
+        return [self._to_record(row) for row in rows]
+
+    def delete(self, record_id: str) -> bool:
+        with self._lock:
+            return self._conn.execute(self._DELETE, (record_id,)).rowcount > 0
+
+    def last_change(self, user_id: str) -> int:
+        with self._lock:
+            row = self._conn.execute(self._LAST_CHANGE, (user_id,)).fetchone()
+        return row[0] or 0
+
+    def changes_since(self, user_id: str, after: int = 0, limit: int = 1000) -> List[Change]:
+        if limit <= 0:
+            return []
+        with self._lock:
+            rows = self._conn.execute(self._CHANGES_SINCE, (user_id, after, limit)).fetchall()
+        return [Change(*row) for row in rows]
+
+    def search(self, user_id: str, query: str, limit: int = 10) -> List[SearchHit]:
+        """Rank this user's records against ``query`` with FTS5 BM25.
+
+        Query words are matched as plain terms (any word may match); FTS5
+        operators in user input are not interpreted.
+        Raises MemoryError when the SQLite build lacks FTS5.
+        """
+        if not self._fts:
+            raise MemoryError("Full-text search unavailable (SQLite built without FTS5)")
+        terms = tokenize(query)
+        if not terms or limit <= 0:
+            return []
+        match = " OR ".join(f'"{t}"' for t in dict.fromkeys(terms))
+        with self._lock:
+            rows = self._conn.execute(self._SEARCH, (match, user_id, limit)).fetchall()
+        return [SearchHit(record_id=row[0], score=row[1], snippet=row[2]) for row in rows]
+
+    def _ensure_fts(self) -> bool:
+        exists = self._conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'memory_records_fts'"
+        ).fetchone()
+        if exists:
+            return True
+        try:
+            with self.batch():
+                for statement in self._FTS_SCHEMA:
+                    self._conn.execute(statement)
+        except sqlite3.OperationalError:
+            return False
+        return True
+
+    @contextmanager
+    def batch(self) -> Iterator["SqliteStore"]:
+        """Group writes into one transaction; rolled back if the block raises.
+
+        Nested blocks join the outermost transaction. The store lock is held
+        for the duration so other threads cannot interleave partial batches.
+        """
+        with self._lock:
+            outermost = self._batch_depth == 0
+            if outermost:
+                self._conn.execute("BEGIN")
+            self._batch_depth += 1
+            try:
+                yield self
+            except BaseException:
+                self._batch_depth -= 1
+                if outermost:
+                    self._conn.execute("ROLLBACK")
+                raise
+            self._batch_depth -= 1
+            if outermost:
+                self._conn.execute("COMMIT")
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    @staticmethod
+    def _to_record(row: tuple) -> MemoryRecord:
+        return MemoryRecord(id=row[0], user_id=row[1], content=row[2], metadata=json.loads(row[3]))
 
 
 class SupabaseStore(MemoryStore):  # pragma: no cover - stub for future implementation
     """Placeholder for Supabase adapter wired during integration."""
     def __init__(self) -> None:
-        raise NotImplementedError("SupabaseStore not implemented in scaffolding")
\ No newline at end of file
+        raise NotImplementedError("SupabaseStore not implemented in scaffolding")
@@ -6,8 +6,19 @@ Configuration is sourced from environment variables in later phases.
 
 from __future__ import annotations
 
+import asyncio
+import json as _json
+import os
+import random
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from contextlib import ExitStack, nullcontext
 from dataclasses import dataclass
-from typing import Any, Dict, Optional, Protocol
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterable, Iterator, List, Optional, Protocol
+
+if TYPE_CHECKING:  # pragma: no cover - typing only
+    from personal_chatbot.src.rate_limiter import RateLimiter
 
 
 class OpenRouterError(Exception):
@@ -22,11 +33,39 @@ class OpenRouterAuthError(OpenRouterError):
     """Raised when authentication fails."""
 
 
+class OpenRouterHTTPError(OpenRouterError):
+    """Raised for non-success HTTP statuses other than authentication failures."""
+
+    def __init__(self, status_code: int, *, retry_after: Optional[float] = None) -> None:
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
+class OpenRouterCircuitOpen(OpenRouterError):
+    """Raised without contacting the provider while the circuit breaker is open."""
+
+
+class OpenRouterRateLimited(OpenRouterError):
+    """Raised by a client-side RateLimiter when a request cannot be admitted before its deadline."""
+
+
 class Transport(Protocol):  # pragma: no cover - interface
     def post(self, path: str, json: Dict[str, Any], timeout: float) -> Dict[str, Any]:
         ...
 
 
+class StreamingTransport(Protocol):  # pragma: no cover - interface
+    def stream(self, path: str, json: Dict[str, Any], timeout: float) -> Iterable[bytes]:
+        """Yield the raw SSE response body in arbitrarily sized chunks."""
+        ...
+
+
+class AsyncTransport(Protocol):  # pragma: no cover - interface
+    async def post(self, path: str, json: Dict[str, Any], timeout: float) -> Dict[str, Any]:
+        ...
+
+
 @dataclass(frozen=True)
 class OpenRouterConfig:
     base_url: str
@@ -35,16 +74,705 @@ class OpenRouterConfig:
     model: Optional[str] = None
 
 
+class SSEParser:
+    """Incremental server-sent events parser.
+
+    Bytes are scanned once: ``feed`` only searches the newly appended data for
+    line breaks and drops consumed lines, so a partial line carried between
+    chunks is never re-scanned. Returns the ``data`` payload of each completed
+    event; comment lines (``:``) and other fields are ignored.
+    """
+
+    def __init__(self) -> None:
+        self._buf = bytearray()
+        self._scan = 0
+        self._data: List[str] = []
+
+    def feed(self, chunk: bytes) -> List[str]:
+        buf = self._buf
+        buf += chunk
+        events: List[str] = []
+        start = 0
+        while True:
+            nl = buf.find(b"\n", self._scan)
+            if nl < 0:
+                break
+            end = nl - 1 if nl > start and buf[nl - 1] == 0x0D else nl
+            self._line(bytes(buf[start:end]), events)
+            start = self._scan = nl + 1
+        if start:
+            del buf[:start]
+        self._scan = len(buf)
+        return events
+
+    def close(self) -> List[str]:
+        """Flush a trailing event not terminated by a blank line."""
+        events: List[str] = []
+        if self._buf:
+            self._line(bytes(self._buf).rstrip(b"\r"), events)
+            self._buf.clear()
+            self._scan = 0
+        self._line(b"", events)
+        return events
+
+    def _line(self, line: bytes, events: List[str]) -> None:
+        if not line:
+            if self._data:
+                events.append("\n".join(self._data))
+                self._data = []
+            return
+        if line.startswith(b":"):
+            return
+        field, _, value = line.partition(b":")
+        if field == b"data":
+            if value.startswith(b" "):
+                value = value[1:]
+            self._data.append(value.decode("utf-8"))
+
+
+@dataclass
+class StreamStats:
+    """Per-call streaming metrics (seconds, measured from request start)."""
+
+    time_to_first_token: Optional[float] = None
+    duration: float = 0.0
+    tokens: int = 0
+    chars: int = 0
+
+    @property
+    def tokens_per_second(self) -> float:
+        """Generation rate after the first token arrived."""
+        if self.time_to_first_token is None:
+            return 0.0
+        window = self.duration - self.time_to_first_token
+        return self.tokens / window if window > 0 else 0.0
+
+
+class ChatStream:
+    """Iterator of content deltas for one streamed completion.
+
+    ``stats`` is updated as deltas are consumed. ``tokens`` counts deltas
+    unless the provider reports ``usage.completion_tokens`` in the stream.
+    ``on_close`` is called once when the stream ends, with the exception that
+    ended it: None when it completed, GeneratorExit when closed early.
+    """
+
+    def __init__(
+        self,
+        chunks: Iterable[bytes],
+        *,
+        on_close: Optional[Callable[[Optional[BaseException]], None]] = None,
+    ) -> None:
+        self.stats = StreamStats()
+        self._started = time.perf_counter()
+        self._source = chunks
+        self._on_close = on_close
+        self._iterating = False
+        self._closed = False
+        self._deltas = self._iter_deltas(chunks)
+
+    def __iter__(self) -> "ChatStream":
+        return self
+
+    def __next__(self) -> str:
+        self._iterating = True
+        return next(self._deltas)
+
+    def close(self) -> None:
+        """Stop consuming the stream (closes the underlying transport iterator).
+
+        Also closes a stream that was never iterated, whose delta generator
+        would otherwise never reach its cleanup.
+        """
+        self._deltas.close()
+        if not self._iterating:
+            self._finish(self._source, GeneratorExit())
+
+    def __del__(self) -> None:
+        if not getattr(self, "_iterating", True):
+            self.close()
+
+    def _finish(self, source: Any, error: Optional[BaseException]) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            for target in (source,) if source is self._source else (source, self._source):
+                close = getattr(target, "close", None)
+                if close is not None:
+                    close()
+        finally:
+            if self._on_close is not None:
+                self._on_close(error)
+
+    def _iter_deltas(self, chunks: Iterable[bytes]) -> Iterator[str]:
+        parser = SSEParser()
+        stats = self.stats
+        usage_tokens: Optional[int] = None
+        error: Optional[BaseException] = None
+        source = iter(chunks)
+        try:
+            for events in _parsed(source, parser):
+                for data in events:
+                    if data == "[DONE]":
+                        return
+                    event = _json.loads(data)
+                    if "error" in event:
+                        raise OpenRouterError(f"Stream error: {event['error']}")
+                    usage = event.get("usage")
+                    if usage and usage.get("completion_tokens") is not None:
+                        usage_tokens = int(usage["completion_tokens"])
+                    for choice in event.get("choices") or ():
+                        content = (choice.get("delta") or {}).get("content")
+                        if not content:
+                            continue
+                        now = time.perf_counter() - self._started
+                        if stats.time_to_first_token is None:
+                            stats.time_to_first_token = now
+                        stats.tokens += 1
+                        stats.chars += len(content)
+                        stats.duration = now
+                        yield content
+        except BaseException as exc:
+            error = exc
+            raise
+        finally:
+            stats.duration = time.perf_counter() - self._started
+            if usage_tokens is not None:
+                stats.tokens = usage_tokens
+            self._finish(source, error)
+
+
+def _parsed(source: Iterator[bytes], parser: SSEParser) -> Iterator[List[str]]:
+    for chunk in source:
+        events = parser.feed(chunk)
+        if events:
+            yield events
+    yield parser.close()
+
+
+def is_retryable(exc: BaseException) -> bool:
+    """Timeouts, 429/5xx responses and connection failures are retried; nothing else is."""
+    if isinstance(exc, OpenRouterTimeout):
+        return True
+    if isinstance(exc, OpenRouterHTTPError):
+        return exc.status_code == 429 or exc.status_code >= 500
+    return isinstance(exc, (ConnectionError, TimeoutError))
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """Jittered exponential backoff (defaults match the documented 0.5s, 1.0s).
+
+    ``retries`` counts attempts after the first. Each delay is
+    ``min(max_delay, base_delay * multiplier**n)`` scaled by a uniform factor
+    in ``[1 - jitter, 1 + jitter]``; a provider ``Retry-After`` takes precedence.
+    """
+
+    retries: int = 2
+    base_delay: float = 0.5
+    multiplier: float = 2.0
+    max_delay: float = 8.0
+    jitter: float = 0.2
+
+    def delay(self, retry_number: int, rng: random.Random) -> float:
+        raw = min(self.max_delay, self.base_delay * self.multiplier ** retry_number)
+        return raw * rng.uniform(1.0 - self.jitter, 1.0 + self.jitter)
+
+
+@dataclass
+class ResilienceStats:
+    """Counters for retries and circuit-breaker activity on one client."""
+
+    calls: int = 0
+    retries: int = 0
+    deadline_exhausted: int = 0
+    breaker_trips: int = 0
+    fast_failures: int = 0
+    saved_seconds: float = 0.0
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker (closed -> open -> half-open).
+
+    After ``failure_threshold`` consecutive retryable failures the breaker
+    opens and calls fail fast for ``reset_timeout`` seconds. Then a single
+    probe call is let through: success closes the breaker, failure re-opens it.
+    Thread-safe.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        *,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._threshold = failure_threshold
+        self._reset_timeout = reset_timeout
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == self.OPEN and self._clock() - self._opened_at >= self._reset_timeout:
+                return self.HALF_OPEN
+            return self._state
+
+    def allow(self) -> bool:
+        """Admit a call, or return False to fail fast."""
+        with self._lock:
+            if self._state == self.CLOSED:
+                return True
+            if self._state == self.OPEN:
+                if self._clock() - self._opened_at < self._reset_timeout:
+                    return False
+                self._state = self.HALF_OPEN
+                self._probe_in_flight = False
+            if self._probe_in_flight:
+                return False
+            self._probe_in_flight = True
+            return True
+
+    def release(self) -> None:
+        """Give back an admission that produced no outcome (e.g. it was never sent)."""
+        with self._lock:
+            self._probe_in_flight = False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._state = self.CLOSED
+            self._failures = 0
+            self._probe_in_flight = False
+
+    def record_failure(self) -> bool:
+        """Count a failure; returns True when this failure tripped the breaker open."""
+        with self._lock:
+            self._failures += 1
+            tripped = self._state == self.HALF_OPEN or (
+                self._state == self.CLOSED and self._failures >= self._threshold
+            )
+            if tripped:
+                self._state = self.OPEN
+                self._opened_at = self._clock()
+            self._probe_in_flight = False
+            return tripped
+
+
+@dataclass(frozen=True)
+class HedgePolicy:
+    """Hedged requests and ordered model fallback for ``chat_complete``.
+
+    - delay: seconds to wait for the in-flight attempt before launching the next
+    - fallback_models: models raced after the primary, in order; when empty
+      the hedge duplicates the primary request
+    - max_attempts: cap on attempts per call (hedges plus failure fallbacks)
+    - budget_fraction: share of calls allowed to launch a latency hedge, so
+      hedging cannot double provider cost; failure-driven fallbacks are free
+    """
+
+    delay: float = 1.0
+    fallback_models: tuple[str, ...] = ()
+    max_attempts: int = 2
+    budget_fraction: float = 0.1
+
+
+@dataclass
+class HedgeStats:
+    calls: int = 0
+    hedges: int = 0
+    hedge_wins: int = 0
+    hedges_suppressed: int = 0
+    fallbacks: int = 0
+    cancelled: int = 0
+
+
 class OpenRouterClient:
-    """Typed placeholder client exposing a minimal chat API."""
+    """Typed placeholder client exposing a minimal chat API.
+
+    ``chat_complete`` applies the optional RetryPolicy and CircuitBreaker.
+    All attempts and backoff sleeps share one deadline of
+    ``request_timeout_seconds``; a retry is only attempted if its backoff
+    fits in the remaining budget. Streams are not retried.
+
+    With a HedgePolicy, calls race attempts on a thread pool sized to the
+    limiter's concurrency cap (or ``_HEDGE_WORKERS`` without one) and the
+    first success wins. Queued losers are cancelled; losers already running
+    cannot be interrupted and their results are discarded.
+
+    With a RateLimiter, every provider attempt (retries and hedges included)
+    is admitted against its remaining deadline and 429s feed back into the
+    limiter's rates. A stream holds its admission until it ends.
+    """
 
-    def __init__(self, config: OpenRouterConfig, transport: Optional[Transport] = None) -> None:
+    # Hedge pool size when no limiter governs concurrency; threads start lazily.
+    _HEDGE_WORKERS = 64
+
+    def __init__(
+        self,
+        config: OpenRouterConfig,
+        transport: Optional[Transport] = None,
+        *,
+        retry: Optional[RetryPolicy] = None,
+        breaker: Optional[CircuitBreaker] = None,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+        rng: Optional[random.Random] = None,
+        hedge: Optional[HedgePolicy] = None,
+        limiter: Optional["RateLimiter"] = None,
+    ) -> None:
         self._config = config
+        self._hedge = hedge
+        self._limiter = limiter
+        self._hedge_pool: Optional[ThreadPoolExecutor] = None
+        self._hedge_lock = threading.Lock()
+        self.hedge_stats = HedgeStats()
         self._transport = transport  # Real transport wired later
+        self._retry = retry
+        self._breaker = breaker
+        self._clock = clock
+        self._sleep = sleep
+        self._rng = rng or random.Random()
+        self._failed_call_seconds = 0.0  # EWMA of failed call cost, for saved_seconds
+        self._stats_lock = threading.Lock()  # attempts run on hedge pool threads
+        self.stats = ResilienceStats()
 
     def chat_complete(self, messages: list[dict[str, str]], *, model: Optional[str] = None) -> dict:
         """Placeholder for chat completion; raises if no transport is provided."""
         if self._transport is None:
             raise OpenRouterError("Transport not configured")
         payload = {"model": model or self._config.model, "messages": messages}
-        return self._transport.post("/chat/completions", json=payload, timeout=self._config.request_timeout_seconds)
\ No newline at end of file
+        if self._hedge is not None:
+            return self._race("/chat/completions", payload)
+        return self._post_with_retries("/chat/completions", payload)
+
+    def close(self) -> None:
+        """Release the hedging thread pool, if one was started."""
+        with self._hedge_lock:
+            pool, self._hedge_pool = self._hedge_pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    def _race(self, path: str, primary: Dict[str, Any]) -> dict:
+        policy = self._hedge
+        assert policy is not None
+        stats = self.hedge_stats
+        with self._hedge_lock:
+            stats.calls += 1
+            if self._hedge_pool is None:
+                cap = self._limiter.max_concurrency if self._limiter is not None else None
+                self._hedge_pool = ThreadPoolExecutor(
+                    max_workers=max(2, cap or self._HEDGE_WORKERS), thread_name_prefix="openrouter-hedge"
+                )
+            pool = self._hedge_pool
+        models = [primary["model"], *policy.fallback_models]
+        deadline = self._clock() + self._config.request_timeout_seconds
+        pending: Dict[Future, int] = {}
+        launched = 0
+        last_error: Optional[BaseException] = None
+
+        def launch() -> None:
+            nonlocal launched
+            payload = dict(primary, model=models[launched % len(models)])
+            pending[pool.submit(self._post_with_retries, path, payload)] = launched
+            launched += 1
+
+        launch()
+        hedging = True
+        try:
+            while pending:
+                remaining = deadline - self._clock()
+                if remaining <= 0:
+                    raise OpenRouterTimeout("Request timed out")
+                can_hedge = hedging and launched < policy.max_attempts
+                done, _ = wait(
+                    list(pending),
+                    timeout=min(policy.delay, remaining) if can_hedge else remaining,
+                    return_when=FIRST_COMPLETED,
+                )
+                if not done:
+                    if can_hedge and self._take_hedge_budget(policy):
+                        launch()
+                    elif can_hedge:
+                        hedging = False
+                    continue
+                for future in done:
+                    index = pending.pop(future)
+                    error = future.exception()
+                    if error is None:
+                        if index > 0:
+                            with self._hedge_lock:
+                                stats.hedge_wins += 1
+                        return future.result()
+                    last_error = error
+                    if not is_retryable(error):
+                        raise error
+                if not pending and launched < policy.max_attempts:
+                    with self._hedge_lock:
+                        stats.fallbacks += 1
+                    launch()
+            assert last_error is not None
+            raise last_error
+        finally:
+            cancelled = sum(1 for future in pending if future.cancel())
+            if cancelled:
+                with self._hedge_lock:
+                    stats.cancelled += cancelled
+
+    def _take_hedge_budget(self, policy: HedgePolicy) -> bool:
+        """Reserve one hedge if hedges stay within ``budget_fraction`` of calls."""
+        with self._hedge_lock:
+            stats = self.hedge_stats
+            if stats.hedges < policy.budget_fraction * stats.calls:
+                stats.hedges += 1
+                return True
+            stats.hedges_suppressed += 1
+            return False
+
+    def _post_with_retries(self, path: str, payload: Dict[str, Any]) -> dict:
+        stats = self.stats
+        with self._stats_lock:
+            stats.calls += 1
+        timeout = self._config.request_timeout_seconds
+        deadline = self._clock() + timeout
+        retries = self._retry.retries if self._retry is not None else 0
+        attempt = 0
+        while True:
+            if self._breaker is not None and not self._breaker.allow():
+                with self._stats_lock:
+                    stats.fast_failures += 1
+                    stats.saved_seconds += self._failed_call_seconds
+                raise OpenRouterCircuitOpen("Provider circuit open; failing fast")
+            limiter = self._limiter
+            if limiter is None:
+                admission = nullcontext()
+            else:
+                admission = limiter.acquire(
+                    limiter.request_cost(payload), timeout=max(0.0, deadline - self._clock())
+                )
+            error: Optional[Exception] = None
+            try:
+                with admission:
+                    started = self._clock()
+                    attempt_timeout = timeout if attempt == 0 and limiter is None else max(0.0, deadline - started)
+                    try:
+                        response = self._transport.post(path, json=payload, timeout=attempt_timeout)  # type: ignore[union-attr]
+                    except Exception as exc:
+                        error = exc
+            except BaseException:
+                if self._breaker is not None:
+                    self._breaker.release()  # not admitted by the limiter: no outcome to record
+                raise
+            if error is None:
+                if self._breaker is not None:
+                    self._breaker.record_success()
+                if limiter is not None:
+                    limiter.on_success()
+                return response
+            if not is_retryable(error):
+                if self._breaker is not None:
+                    self._breaker.release()  # neither a health failure nor proof of recovery
+                raise error
+            if limiter is not None and getattr(error, "status_code", None) == 429:
+                limiter.on_throttled(getattr(error, "retry_after", None))
+            elapsed = self._clock() - started
+            tripped = self._breaker is not None and self._breaker.record_failure()
+            with self._stats_lock:
+                self._failed_call_seconds = elapsed if not self._failed_call_seconds else (
+                    0.8 * self._failed_call_seconds + 0.2 * elapsed
+                )
+                if tripped:
+                    stats.breaker_trips += 1
+            if attempt >= retries:
+                raise error
+            retry_after = getattr(error, "retry_after", None)
+            delay = retry_after if retry_after is not None else self._retry.delay(attempt, self._rng)  # type: ignore[union-attr]
+            if self._clock() + delay >= deadline:
+                with self._stats_lock:
+                    stats.deadline_exhausted += 1
+                raise error
+            self._sleep(delay)
+            attempt += 1
+            with self._stats_lock:
+                stats.retries += 1
+
+    def chat_stream(self, messages: list[dict[str, str]], *, model: Optional[str] = None) -> ChatStream:
+        """Stream a chat completion, yielding content deltas as they arrive.
+
+        Requires a transport that also implements ``StreamingTransport``.
+        The returned ChatStream exposes time-to-first-token and tokens/sec.
+        With a RateLimiter, admission happens here (OpenRouterRateLimited past
+        the deadline) and the slot is held until the stream is exhausted or closed.
+        """
+        if self._transport is None:
+            raise OpenRouterError("Transport not configured")
+        stream = getattr(self._transport, "stream", None)
+        if stream is None:
+            raise OpenRouterError("Transport does not support streaming")
+        payload = {"model": model or self._config.model, "messages": messages, "stream": True}
+        timeout = self._config.request_timeout_seconds
+        limiter = self._limiter
+        if limiter is None:
+            return ChatStream(stream("/chat/completions", json=payload, timeout=timeout))
+        deadline = self._clock() + timeout
+        admission = ExitStack()
+        admission.enter_context(limiter.acquire(limiter.request_cost(payload), timeout=timeout))
+
+        def release(error: Optional[BaseException]) -> None:
+            admission.close()
+            if error is None:
+                limiter.on_success()
+            elif getattr(error, "status_code", None) == 429:
+                limiter.on_throttled(getattr(error, "retry_after", None))
+
+        try:
+            chunks = stream("/chat/completions", json=payload, timeout=max(0.0, deadline - self._clock()))
+        except BaseException as exc:
+            release(exc)
+            raise
+        return ChatStream(chunks, on_close=release)
+
+
+@dataclass(frozen=True)
+class PoolLimits:
+    """Keep-alive pool bounds for one upstream host.
+
+    Requests beyond ``max_connections`` wait for a free connection (bounded by
+    the request timeout) instead of opening new sockets.
+    """
+
+    max_connections: int = 20
+    max_keepalive_connections: int = 10
+    keepalive_expiry: float = 30.0
+
+
+class HttpxAsyncTransport:
+    """AsyncTransport over a pooled ``httpx.AsyncClient`` bound to ``config.base_url``.
+
+    The transport talks to a single host, so ``PoolLimits`` apply per host.
+    Connect/read/pool timeouts all derive from ``request_timeout_seconds``.
+    httpx is imported lazily to keep module import side-effect free.
+
+    Admission is gated by a semaphore sized to the pool: httpcore rescans its
+    whole wait queue on every connection release, so letting thousands of
+    requests queue inside the pool turns into quadratic work.
+    """
+
+    def __init__(self, config: OpenRouterConfig, *, limits: PoolLimits = PoolLimits(), **client_kwargs: Any) -> None:
+        import httpx
+
+        self._httpx = httpx
+        headers = {"HTTP-Referer": "http://localhost", "X-Title": "Personal Assistant"}
+        api_key = os.getenv(config.api_key_env)
+        if api_key:
+            headers["Authorization"] = f"Bearer {api_key}"
+        self._client = httpx.AsyncClient(
+            base_url=config.base_url,
+            headers=headers,
+            limits=httpx.Limits(
+                max_connections=limits.max_connections,
+                max_keepalive_connections=limits.max_keepalive_connections,
+                keepalive_expiry=limits.keepalive_expiry,
+            ),
+            timeout=httpx.Timeout(config.request_timeout_seconds),
+            **client_kwargs,
+        )
+        self._slots = asyncio.Semaphore(limits.max_connections)
+
+    async def post(self, path: str, json: Dict[str, Any], timeout: float) -> Dict[str, Any]:
+        httpx = self._httpx
+        try:
+            async with self._slots:
+                response = await self._client.post(path, json=json, timeout=httpx.Timeout(timeout))
+        except httpx.TimeoutException as exc:
+            raise OpenRouterTimeout("Request timed out") from exc
+        except httpx.HTTPError as exc:
+            raise OpenRouterError(f"Transport error: {type(exc).__name__}") from exc
+        if response.status_code in (401, 403):
+            raise OpenRouterAuthError(f"Authentication failed (HTTP {response.status_code})")
+        if response.status_code >= 400:
+            retry_after = response.headers.get("Retry-After")
+            raise OpenRouterHTTPError(
+                response.status_code,
+                retry_after=float(retry_after) if retry_after and retry_after.isdigit() else None,
+            )
+        return response.json()
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
+
+
+class AsyncOpenRouterClient:
+    """Asyncio counterpart of OpenRouterClient.
+
+    Many calls can be in flight on one event loop; connection reuse and
+    admission are delegated to the transport's pool. Each call is bounded by
+    ``request_timeout_seconds`` end to end, including time spent queued.
+    """
+
+    def __init__(
+        self,
+        config: OpenRouterConfig,
+        transport: Optional[AsyncTransport] = None,
+        *,
+        limiter: Optional["RateLimiter"] = None,
+    ) -> None:
+        self._config = config
+        self._transport = transport
+        self._limiter = limiter
+
+    @classmethod
+    def pooled(
+        cls,
+        config: OpenRouterConfig,
+        *,
+        limits: PoolLimits = PoolLimits(),
+        limiter: Optional["RateLimiter"] = None,
+    ) -> "AsyncOpenRouterClient":
+        """Build a client over an HttpxAsyncTransport keep-alive pool."""
+        return cls(config, HttpxAsyncTransport(config, limits=limits), limiter=limiter)
+
+    async def chat_complete(self, messages: list[dict[str, str]], *, model: Optional[str] = None) -> dict:
+        if self._transport is None:
+            raise OpenRouterError("Transport not configured")
+        payload = {"model": model or self._config.model, "messages": messages}
+        timeout = self._config.request_timeout_seconds
+        try:
+            return await asyncio.wait_for(self._admitted_post(payload, timeout), timeout)
+        except asyncio.TimeoutError as exc:
+            raise OpenRouterTimeout("Request timed out") from exc
+
+    async def _admitted_post(self, payload: Dict[str, Any], timeout: float) -> dict:
+        assert self._transport is not None
+        limiter = self._limiter
+        if limiter is None:
+            return await self._transport.post("/chat/completions", json=payload, timeout=timeout)
+        async with limiter.acquire_async(limiter.request_cost(payload), timeout=timeout):
+            try:
+                response = await self._transport.post("/chat/completions", json=payload, timeout=timeout)
+            except OpenRouterHTTPError as exc:
+                if exc.status_code == 429:
+                    limiter.on_throttled(exc.retry_after)
+                raise
+        limiter.on_success()
+        return response
+
+    async def aclose(self) -> None:
+        close = getattr(self._transport, "aclose", None)
+        if close is not None:
+            await close()
+
+    async def __aenter__(self) -> "AsyncOpenRouterClient":
+        return self
+
+    async def __aexit__(self, *exc: Any) -> None:
+        await self.aclose()
@@ -0,0 +1,282 @@
+"""Client-side admission control for OpenRouter requests.
+
+Side-effect free on import. One ``RateLimiter`` can be shared by sync and
+async clients (and across threads/event loops):
+
+- Two token buckets, requests/min and tokens/min, using reservations: a
+  caller learns immediately how long it must wait, so requests that cannot be
+  admitted within their deadline fail fast instead of queueing.
+- A concurrency governor bounding in-flight requests; waiters are served FIFO
+  whether they block a thread or await on an event loop.
+- AIMD adaptation: a 429 halves the effective rates (and honours
+  ``Retry-After`` by pausing admissions); successes restore them gradually.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Callable, Deque, Dict, Iterator, Optional, Union
+
+from personal_chatbot.src.openrouter_client import OpenRouterRateLimited
+
+
+class TokenBucket:
+    """Continuously refilling bucket; ``rate`` units per second up to ``capacity``.
+
+    The level may go negative: a reservation borrows against future refill,
+    which keeps admissions ordered without a queue.
+    """
+
+    def __init__(self, rate: float, capacity: float, now: float) -> None:
+        self.rate = rate
+        self.capacity = capacity
+        self._level = capacity
+        self._updated = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        """Seconds until ``amount`` could be taken (0 if available now)."""
+        level = self._refilled(now)
+        if level >= amount:
+            return 0.0
+        return (amount - level) / self.rate
+
+    def take(self, amount: float, now: float) -> None:
+        self._level = self._refilled(now) - amount
+        self._updated = now
+
+    def give_back(self, amount: float, now: float) -> None:
+        self._level = min(self.capacity, self._refilled(now) + amount)
+        self._updated = now
+
+    def _refilled(self, now: float) -> float:
+        return min(self.capacity, self._level + (now - self._updated) * self.rate)
+
+
+@dataclass
+class LimiterStats:
+    admitted: int = 0
+    rejected: int = 0
+    throttled: int = 0
+    waited_seconds: float = 0.0
+
+
+class _Waiter:
+    __slots__ = ("event", "loop", "future", "granted")
+
+    def __init__(self, loop: Optional[asyncio.AbstractEventLoop] = None) -> None:
+        self.loop = loop
+        self.event = threading.Event() if loop is None else None
+        self.future: Optional[asyncio.Future] = loop.create_future() if loop is not None else None
+        self.granted = False
+
+
+class RateLimiter:
+    """Token-bucket rate limiter plus bounded-concurrency governor.
+
+    Parameters
+    - requests_per_minute / tokens_per_minute: sustained limits (None disables)
+    - max_concurrency: in-flight cap (None disables)
+    - burst_seconds: bucket capacity expressed as seconds of sustained rate
+    - min_rate_fraction: floor for 429-driven rate reductions
+    - clock/sleep: injectable for deterministic tests (sync path)
+    """
+
+    def __init__(
+        self,
+        *,
+        requests_per_minute: Optional[float] = None,
+        tokens_per_minute: Optional[float] = None,
+        max_concurrency: Optional[int] = None,
+        burst_seconds: float = 1.0,
+        min_rate_fraction: float = 0.1,
+        recovery_step: float = 0.05,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        self._clock = clock
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        now = clock()
+        self._buckets: list[tuple[TokenBucket, float, bool]] = []  # (bucket, base rate/s, counts tokens)
+        if requests_per_minute:
+            rate = requests_per_minute / 60.0
+            self._buckets.append((TokenBucket(rate, max(1.0, rate * burst_seconds), now), rate, False))
+        if tokens_per_minute:
+            rate = tokens_per_minute / 60.0
+            self._buckets.append((TokenBucket(rate, max(1.0, rate * burst_seconds), now), rate, True))
+        self._max_concurrency = max_concurrency
+        self._active = 0
+        self._waiters: Deque[_Waiter] = deque()
+        self._scale = 1.0
+        self._min_scale = min_rate_fraction
+        self._recovery_step = recovery_step
+        self._paused_until = 0.0
+        self.stats = LimiterStats()
+
+    @property
+    def rate_scale(self) -> float:
+        """Current fraction of the configured rates (1.0 when not throttled)."""
+        return self._scale
+
+    @property
+    def max_concurrency(self) -> Optional[int]:
+        """In-flight cap enforced by the concurrency governor (None: unbounded)."""
+        return self._max_concurrency
+
+    @staticmethod
+    def request_cost(payload: Dict[str, Any]) -> int:
+        """Rough token cost of a chat payload (~4 chars/token) for tokens/min budgeting."""
+        messages = payload.get("messages") or []
+        chars = sum(len(m.get("content") or "") for m in messages)
+        return chars // 4 + 4 * len(messages) + int(payload.get("max_tokens") or 0)
+
+    # Rate buckets
+
+    def reserve(self, tokens: int = 0, *, timeout: float) -> float:
+        """Reserve capacity for one request; return the seconds to wait before sending.
+
+        Raises OpenRouterRateLimited without reserving when the wait exceeds ``timeout``.
+        """
+        with self._lock:
+            now = self._clock()
+            wait = max(0.0, self._paused_until - now)
+            for bucket, _, counts_tokens in self._buckets:
+                amount = min(tokens, bucket.capacity) if counts_tokens else 1
+                wait = max(wait, bucket.wait_time(amount, now))
+            if wait > timeout:
+                self.stats.rejected += 1
+                raise OpenRouterRateLimited(f"Rate limit: admission needs {wait:.2f}s, deadline allows {timeout:.2f}s")
+            for bucket, _, counts_tokens in self._buckets:
+                bucket.take(min(tokens, bucket.capacity) if counts_tokens else 1, now)
+            self.stats.admitted += 1
+            self.stats.waited_seconds += wait
+            return wait
+
+    def refund(self, tokens: int = 0) -> None:
+        """Return a reservation whose request was never sent (e.g. no concurrency slot in time)."""
+        with self._lock:
+            now = self._clock()
+            for bucket, _, counts_tokens in self._buckets:
+                bucket.give_back(min(tokens, bucket.capacity) if counts_tokens else 1, now)
+            self.stats.admitted -= 1
+
+    def on_throttled(self, retry_after: Optional[float] = None) -> None:
+        """Provider returned 429: halve rates and pause admissions for ``retry_after``."""
+        with self._lock:
+            self.stats.throttled += 1
+            self._set_scale(max(self._min_scale, self._scale / 2))
+            if retry_after:
+                self._paused_until = max(self._paused_until, self._clock() + retry_after)
+
+    def on_success(self) -> None:
+        """Additive recovery toward the configured rates."""
+        with self._lock:
+            if self._scale < 1.0:
+                self._set_scale(min(1.0, self._scale + self._recovery_step))
+
+    def _set_scale(self, scale: float) -> None:
+        now = self._clock()
+        self._scale = scale
+        for bucket, base_rate, _ in self._buckets:
+            bucket.take(0, now)  # settle refill at the old rate first
+            bucket.rate = base_rate * scale
+
+    # Concurrency governor
+
+    def _try_enter(self, waiter_factory: Callable[[], _Waiter]) -> Optional[_Waiter]:
+        with self._lock:
+            if self._max_concurrency is None or (self._active < self._max_concurrency and not self._waiters):
+                self._active += 1
+                return None
+            waiter = waiter_factory()
+            self._waiters.append(waiter)
+            return waiter
+
+    def _abandon(self, waiter: _Waiter) -> bool:
+        """Withdraw a timed-out waiter; returns True if it was granted meanwhile."""
+        with self._lock:
+            if waiter.granted:
+                return True
+            self._waiters.remove(waiter)
+            self.stats.rejected += 1
+            return False
+
+    def _exit(self) -> None:
+        with self._lock:
+            if self._max_concurrency is None:
+                self._active -= 1
+                return
+            while self._waiters:
+                waiter = self._waiters.popleft()
+                waiter.granted = True
+                if waiter.event is not None:
+                    waiter.event.set()
+                    return
+                if waiter.loop is not None and not waiter.loop.is_closed():
+                    waiter.loop.call_soon_threadsafe(_resolve, waiter.future)
+                    return
+            self._active -= 1
+
+    @contextmanager
+    def acquire(self, tokens: int = 0, *, timeout: float) -> Iterator[None]:
+        """Blocking admission: rate reservation, then a concurrency slot, within ``timeout``.
+
+        The reservation is refunded if no slot frees up before the deadline.
+        """
+        deadline = self._clock() + timeout
+        wait = self.reserve(tokens, timeout=timeout)
+        try:
+            if wait > 0:
+                self._sleep(wait)
+            waiter = self._try_enter(_Waiter)
+            if waiter is not None:
+                assert waiter.event is not None
+                if not waiter.event.wait(max(0.0, deadline - self._clock())) and not self._abandon(waiter):
+                    raise OpenRouterRateLimited("Concurrency limit: no slot before deadline")
+        except BaseException:
+            self.refund(tokens)
+            raise
+        try:
+            yield
+        finally:
+            self._exit()
+
+    @asynccontextmanager
+    async def acquire_async(self, tokens: int = 0, *, timeout: float) -> AsyncIterator[None]:
+        """Awaitable admission with the same semantics as ``acquire``."""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        wait = self.reserve(tokens, timeout=timeout)
+        try:
+            if wait > 0:
+                await asyncio.sleep(wait)
+            waiter = self._try_enter(lambda: _Waiter(loop))
+            if waiter is not None:
+                assert waiter.future is not None
+                try:
+                    await asyncio.wait_for(asyncio.shield(waiter.future), max(0.0, deadline - loop.time()))
+                except asyncio.TimeoutError:
+                    if not self._abandon(waiter):
+                        raise OpenRouterRateLimited("Concurrency limit: no slot before deadline") from None
+                except asyncio.CancelledError:
+                    if self._abandon(waiter):
+                        self._exit()  # granted while being cancelled; hand the slot on
+                    raise
+        except BaseException:
+            self.refund(tokens)
+            raise
+        try:
+            yield
+        finally:
+            self._exit()
+
+
+def _resolve(future: Union[asyncio.Future, None]) -> None:
+    if future is not None and not future.done():
+        future.set_result(None)
+
@@ -0,0 +1,304 @@
+"""Opt-in response cache for deterministic OpenRouter requests.
+
+Side-effect free on import. ``CachingTransport`` wraps any Transport (real
+or mocked) and serves repeated non-streaming payloads from a ``ResponseCache``:
+
+- Keys are the SHA-256 of the canonical JSON payload ({model, messages, params})
+- Memory tier: LRU bounded by the serialized size of cached responses
+- Optional disk tier: one JSON file per key, written atomically, with its own
+  LRU-by-bytes bound (recency survives restarts through modification times)
+- Entries expire after ``ttl_seconds``; expired files are swept on open and
+  by ``sweep()``
+- Only payloads with an explicit ``temperature`` of 0 are cached by default
+- Errors (raised or returned) and streaming calls are never cached
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+
+def cache_key(payload: Dict[str, Any]) -> str:
+    """Canonical hash of a request payload; key order and whitespace do not matter."""
+    canonical = json.dumps(payload, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def is_deterministic(payload: Dict[str, Any]) -> bool:
+    """Default cacheability rule: non-streaming with an explicit ``temperature`` of 0.
+
+    An unset temperature means the provider default (about 1.0), i.e. a
+    sampled completion; pass a custom ``cacheable`` to opt such requests in.
+    """
+    return not payload.get("stream") and payload.get("temperature", None) == 0
+
+
+def is_cacheable_response(response: Any) -> bool:
+    """Only complete, successful completions are cached."""
+    if not isinstance(response, dict) or "error" in response:
+        return False
+    choices = response.get("choices")
+    return isinstance(choices, list) and bool(choices)
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    memory_hits: int = 0
+    disk_hits: int = 0
+    stores: int = 0
+    evictions: int = 0
+    expirations: int = 0
+    bytes_in_memory: int = 0
+    disk_evictions: int = 0
+    bytes_on_disk: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+class ResponseCache:
+    """Two-tier (memory LRU + optional disk) cache of JSON responses.
+
+    Values are stored serialized, so the byte bound is exact and callers
+    always receive a fresh copy they may mutate. The disk tier is bounded by
+    ``disk_max_bytes`` (default: ``max_bytes``) and evicts least recently
+    used files first. Safe to share across threads: the LRUs and stats are
+    guarded by a lock, disk I/O runs outside it.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_bytes: int = 16 * 1024 * 1024,
+        ttl_seconds: Optional[float] = 3600.0,
+        disk_dir: Path | str | None = None,
+        disk_max_bytes: Optional[int] = None,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self._max_bytes = max_bytes
+        self._ttl = ttl_seconds
+        self._disk = Path(disk_dir) if disk_dir is not None else None
+        self._disk_max_bytes = disk_max_bytes if disk_max_bytes is not None else max_bytes
+        self._clock = clock
+        self._entries: "OrderedDict[str, Tuple[float, bytes]]" = OrderedDict()
+        self._disk_sizes: "OrderedDict[str, int]" = OrderedDict()  # key -> file size, oldest first
+        self._lock = threading.Lock()
+        self.stats = CacheStats()
+        if self._disk is not None:
+            self._load_disk_index()
+            self.sweep()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        now = self._clock()
+        body: Optional[bytes] = None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] > now:
+                    self._entries.move_to_end(key)
+                    self.stats.hits += 1
+                    self.stats.memory_hits += 1
+                    body = entry[1]
+                else:
+                    self._drop(key)
+                    self.stats.expirations += 1
+        if body is not None:
+            return json.loads(body)
+        if self._disk is not None:
+            loaded = self._read_disk(key, now)
+            if loaded is not None:
+                expires_at, body = loaded
+                with self._lock:
+                    self._remember(key, expires_at, body)
+                    self.stats.hits += 1
+                    self.stats.disk_hits += 1
+                return json.loads(body)
+        with self._lock:
+            self.stats.misses += 1
+        return None
+
+    def put(self, key: str, response: Dict[str, Any]) -> None:
+        body = json.dumps(response, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+        expires_at = self._clock() + self._ttl if self._ttl is not None else float("inf")
+        with self._lock:
+            self._remember(key, expires_at, body)
+            self.stats.stores += 1
+        if self._disk is not None:
+            self._write_disk(key, expires_at, body)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.stats.bytes_in_memory = 0
+
+    def sweep(self) -> int:
+        """Delete expired or unreadable disk entries; returns how many were removed."""
+        if self._disk is None:
+            return 0
+        now = self._clock()
+        with self._lock:
+            keys = list(self._disk_sizes)
+        removed = 0
+        for key in keys:
+            path = self._path(key)
+            try:
+                with open(path, "rb") as fh:
+                    expires_at = float(fh.readline())
+            except (FileNotFoundError, ValueError):  # gone or torn: forget it
+                expires_at = now
+            if expires_at <= now:
+                path.unlink(missing_ok=True)
+                with self._lock:
+                    self._forget_disk(key)
+                removed += 1
+        return removed
+
+    def _remember(self, key: str, expires_at: float, body: bytes) -> None:
+        if len(body) > self._max_bytes:
+            return
+        if key in self._entries:
+            self._drop(key)
+        self._entries[key] = (expires_at, body)
+        self.stats.bytes_in_memory += len(body)
+        while self.stats.bytes_in_memory > self._max_bytes:
+            oldest = next(iter(self._entries))
+            self._drop(oldest)
+            self.stats.evictions += 1
+
+    def _drop(self, key: str) -> None:
+        _, body = self._entries.pop(key)
+        self.stats.bytes_in_memory -= len(body)
+
+    def _path(self, key: str) -> Path:
+        assert self._disk is not None
+        return self._disk / key[:2] / f"{key}.json"
+
+    def _load_disk_index(self) -> None:
+        assert self._disk is not None
+        found = []
+        for path in self._disk.glob("??/*.json"):
+            stat = path.stat()
+            found.append((stat.st_mtime_ns, path.stem, stat.st_size))
+        for _, key, size in sorted(found):
+            self._disk_sizes[key] = size
+            self.stats.bytes_on_disk += size
+        self._unlink(self._evict_disk())
+
+    def _read_disk(self, key: str, now: float) -> Optional[Tuple[float, bytes]]:
+        path = self._path(key)
+        try:
+            raw = path.read_bytes()
+        except FileNotFoundError:
+            with self._lock:
+                self._forget_disk(key)
+            return None
+        header, _, body = raw.partition(b"\n")
+        try:
+            expires_at = float(header)
+        except ValueError:
+            return None
+        if expires_at <= now:
+            path.unlink(missing_ok=True)
+            with self._lock:
+                self._forget_disk(key)
+                self.stats.expirations += 1
+            return None
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            pass
+        with self._lock:
+            if key in self._disk_sizes:
+                self._disk_sizes.move_to_end(key)
+        return expires_at, body
+
+    def _write_disk(self, key: str, expires_at: float, body: bytes) -> None:
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        data = repr(expires_at).encode("ascii") + b"\n" + body
+        if len(data) > self._disk_max_bytes:
+            return
+        fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as fh:
+                fh.write(data)
+            os.replace(tmp, path)
+        except BaseException:
+            Path(tmp).unlink(missing_ok=True)
+            raise
+        with self._lock:
+            self._forget_disk(key)
+            self._disk_sizes[key] = len(data)
+            self.stats.bytes_on_disk += len(data)
+            victims = self._evict_disk()
+        self._unlink(victims)
+
+    def _evict_disk(self) -> List[str]:
+        """Drop least recently used keys over the disk budget; caller holds the lock."""
+        victims = []
+        while self.stats.bytes_on_disk > self._disk_max_bytes and self._disk_sizes:
+            key = next(iter(self._disk_sizes))
+            self._forget_disk(key)
+            self.stats.disk_evictions += 1
+            victims.append(key)
+        return victims
+
+    def _forget_disk(self, key: str) -> None:
+        size = self._disk_sizes.pop(key, None)
+        if size is not None:
+            self.stats.bytes_on_disk -= size
+
+    def _unlink(self, keys: Iterable[str]) -> None:
+        for key in keys:
+            self._path(key).unlink(missing_ok=True)
+
+
+class CachingTransport:
+    """Transport wrapper that answers repeated deterministic requests from a cache.
+
+    ``stream`` is only present when the wrapped transport has it; calls pass
+    straight through and are never cached.
+    """
+
+    def __init__(
+        self,
+        transport: Any,
+        cache: ResponseCache,
+        *,
+        cacheable: Callable[[Dict[str, Any]], bool] = is_deterministic,
+    ) -> None:
+        self._transport = transport
+        self._cache = cache
+        self._cacheable = cacheable
+        stream = getattr(transport, "stream", None)
+        if stream is not None:
+            self.stream = stream
+
+    @property
+    def stats(self) -> CacheStats:
+        return self._cache.stats
+
+    def post(self, path: str, json: Dict[str, Any], timeout: float) -> Dict[str, Any]:
+        if not self._cacheable(json):
+            return self._transport.post(path, json=json, timeout=timeout)
+        key = cache_key({"path": path, "payload": json})
+        cached = self._cache.get(key)
+        if cached is not None:
+            return cached
+        response = self._transport.post(path, json=json, timeout=timeout)
+        if is_cacheable_response(response):
+            self._cache.put(key, response)
+        return response
@@ -0,0 +1,174 @@
+"""In-process full-text search over stored messages.
+
+Side-effect free on import. ``InvertedIndex`` keeps per-user posting lists
+(term -> {record_id: term frequency}) and ranks matches with Okapi BM25, so
+a query only touches the postings of its own terms for one user.
+``IndexedStore`` wraps any MemoryStore and keeps the index in step with
+``create``/``delete``. Durable stores can use ``SqliteStore.search`` (FTS5)
+instead.
+"""
+
+from __future__ import annotations
+
+import heapq
+import math
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional
+
+from personal_chatbot.src.memory_manager import MemoryRecord, MemoryStore, SearchHit, iter_words, tokenize
+
+
+@dataclass
+class _UserPostings:
+    postings: Dict[str, Dict[str, int]] = field(default_factory=dict)
+    doc_len: Dict[str, int] = field(default_factory=dict)
+    total_len: int = 0
+
+
+def make_snippet(content: str, terms: set[str], *, width: int = 12) -> str:
+    """Window of about ``width`` words around the first matching term, matches in [brackets]."""
+    words = list(iter_words(content))
+    if not words:
+        return content[:80]
+    first = next((i for i, m in enumerate(words) if m.group().lower() in terms), 0)
+    lo = max(0, first - width // 3)
+    hi = min(len(words), lo + width)
+    start, end = words[lo].start(), words[hi - 1].end()
+    parts: List[str] = ["…" if start > 0 else ""]
+    cursor = start
+    for m in words[lo:hi]:
+        if m.group().lower() in terms:
+            parts.append(content[cursor:m.start()])
+            parts.append(f"[{m.group()}]")
+            cursor = m.end()
+    parts.append(content[cursor:end])
+    parts.append("…" if end < len(content) else "")
+    return "".join(parts)
+
+
+class InvertedIndex:
+    """Per-user BM25 inverted index updated incrementally."""
+
+    def __init__(self, *, k1: float = 1.2, b: float = 0.75) -> None:
+        self._k1 = k1
+        self._b = b
+        self._users: Dict[str, _UserPostings] = {}
+
+    def add(self, record: MemoryRecord) -> None:
+        counts = Counter(tokenize(record.content))
+        user = self._users.get(record.user_id)
+        if user is None:
+            user = self._users[record.user_id] = _UserPostings()
+        for term, tf in counts.items():
+            docs = user.postings.get(term)
+            if docs is None:
+                docs = user.postings[term] = {}
+            docs[record.id] = tf
+        length = sum(counts.values())
+        user.doc_len[record.id] = length
+        user.total_len += length
+
+    def remove(self, record: MemoryRecord) -> None:
+        user = self._users.get(record.user_id)
+        if user is None or record.id not in user.doc_len:
+            return
+        for term in set(tokenize(record.content)):
+            docs = user.postings.get(term)
+            if docs is not None:
+                docs.pop(record.id, None)
+                if not docs:
+                    del user.postings[term]
+        user.total_len -= user.doc_len.pop(record.id)
+        if not user.doc_len:
+            del self._users[record.user_id]
+
+    def search(
+        self,
+        user_id: str,
+        query: str,
+        limit: int = 10,
+        *,
+        content_of: Optional[Callable[[str], Optional[str]]] = None,
+    ) -> List[SearchHit]:
+        """Top ``limit`` records by BM25; snippets are built only for the hits returned."""
+        user = self._users.get(user_id)
+        terms = set(tokenize(query))
+        if user is None or not terms or limit <= 0:
+            return []
+        n_docs = len(user.doc_len)
+        avgdl = user.total_len / n_docs if n_docs else 0.0
+        k1, b = self._k1, self._b
+        norm = k1 * (1 - b)
+        scale = k1 * b / avgdl if avgdl else 0.0
+        doc_len = user.doc_len
+        scores: Dict[str, float] = {}
+        for term in terms:
+            docs = user.postings.get(term)
+            if not docs:
+                continue
+            idf = _idf(n_docs, len(docs))
+            for record_id, tf in docs.items():
+                denom = tf + norm + scale * doc_len[record_id]
+                scores[record_id] = scores.get(record_id, 0.0) + idf * tf * (k1 + 1) / denom
+        top = heapq.nlargest(limit, scores.items(), key=lambda item: item[1])
+        hits: List[SearchHit] = []
+        for record_id, score in top:
+            content = content_of(record_id) if content_of is not None else None
+            snippet = make_snippet(content, terms) if content else ""
+            hits.append(SearchHit(record_id=record_id, score=score, snippet=snippet))
+        return hits
+
+
+def _idf(n_docs: int, df: int) -> float:
+    # BM25 idf with the +1 inside the log (as in Lucene) so frequent terms never score negative
+    return math.log(1 + (n_docs - df + 0.5) / (df + 0.5))
+
+
+class IndexedStore(MemoryStore):
+    """MemoryStore wrapper adding ``search`` via an in-process InvertedIndex.
+
+    Records written before wrapping are not indexed until ``reindex(user_id)``.
+    """
+
+    def __init__(self, store: MemoryStore, index: Optional[InvertedIndex] = None) -> None:
+        self._inner = store
+        self._index = index or InvertedIndex()
+
+    def create(self, record: MemoryRecord) -> None:
+        self._inner.create(record)
+        self._index.add(record)
+
+    def get(self, record_id: str) -> Optional[MemoryRecord]:
+        return self._inner.get(record_id)
+
+    def list_by_user(self, user_id: str, limit: int = 50, **kwargs) -> List[MemoryRecord]:
+        return self._inner.list_by_user(user_id, limit, **kwargs)
+
+    def delete(self, record_id: str) -> bool:
+        record = self._inner.get(record_id)
+        deleted = self._inner.delete(record_id)
+        if deleted and record is not None:
+            self._index.remove(record)
+        return deleted
+
+    def search(self, user_id: str, query: str, limit: int = 10) -> List[SearchHit]:
+        return self._index.search(user_id, query, limit, content_of=self._content_of)
+
+    def reindex(self, user_id: str, *, page_size: int = 500) -> int:
+        """Index (or re-index) all of ``user_id``'s records; returns the count."""
+        count = 0
+        cursor: Optional[str] = None
+        while True:
+            page = self._inner.list_by_user(user_id, limit=page_size, cursor=cursor)
+            for record in page:
+                self._index.remove(record)
+                self._index.add(record)
+            count += len(page)
+            if len(page) < page_size:
+                return count
+            cursor = page[-1].id
+
+    def _content_of(self, record_id: str) -> Optional[str]:
+        record = self._inner.get(record_id)
+        return record.content if record is not None else None
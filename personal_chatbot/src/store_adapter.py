@@ -0,0 +1,129 @@
+"""Uniform write path over heterogeneous memory stores.
+
+Side-effect free on import. ``adapt(store)`` inspects the store's type once,
+caches the matching write strategy per type, and returns a StoreAdapter whose
+``write(user_id, role, content)`` calls the store directly with no per-message
+probing, imports or TypeError retries.
+
+Supported shapes, in priority order:
+- ``create(record)`` taking a MemoryRecord (MemoryStore protocol)
+- ``create_message`` / ``add_message`` / ``append`` taking ``(user_id, message)``
+- ``create`` / ``write`` taking ``(user_id, message)``
+- ``write`` taking a single message dict
+
+Strategies are keyed by type, so stores whose methods vary per instance
+should be wrapped explicitly with ``StoreAdapter``.
+"""
+
+from __future__ import annotations
+
+import inspect
+from typing import Any, Callable, Dict, Optional
+
+from personal_chatbot.src.ids import new_id
+from personal_chatbot.src.memory_manager import MemoryRecord
+
+# (store, user_id, message, record_id, metadata) -> None
+_Strategy = Callable[[Any, str, Dict[str, str], Optional[str], Optional[Dict[str, Any]]], None]
+
+
+def _record_strategy(store: Any, user_id: str, message: Dict[str, str], record_id: Optional[str],
+                     metadata: Optional[Dict[str, Any]]) -> None:
+    store.create(MemoryRecord(
+        id=record_id if record_id is not None else new_id(),
+        user_id=user_id,
+        content=message["content"],
+        metadata={"role": message["role"], **(metadata or {})},
+    ))
+
+
+def _pair_strategy(method_name: str) -> _Strategy:
+    def write(store: Any, user_id: str, message: Dict[str, str], record_id: Optional[str],
+              metadata: Optional[Dict[str, Any]]) -> None:
+        getattr(store, method_name)(user_id, message)
+    return write
+
+
+def _single_strategy(method_name: str) -> _Strategy:
+    def write(store: Any, user_id: str, message: Dict[str, str], record_id: Optional[str],
+              metadata: Optional[Dict[str, Any]]) -> None:
+        getattr(store, method_name)(message)
+    return write
+
+
+def _accepts(method: Any, count: int) -> bool:
+    """True when ``method`` can be called with exactly ``count`` positional arguments."""
+    try:
+        params = inspect.signature(method).parameters.values()
+    except (TypeError, ValueError):
+        return False
+    required = maximum = 0
+    variadic = False
+    for p in params:
+        if p.kind is p.VAR_POSITIONAL:
+            variadic = True
+        elif p.kind in (p.POSITIONAL_ONLY, p.POSITIONAL_OR_KEYWORD):
+            maximum += 1
+            if p.default is p.empty:
+                required += 1
+        elif p.kind is p.KEYWORD_ONLY and p.default is p.empty:
+            return False
+    return required <= count and (variadic or count <= maximum)
+
+
+def _resolve(store: Any) -> _Strategy:
+    """Pick the write strategy for ``type(store)`` by inspecting its methods once."""
+    create = getattr(store, "create", None)
+    if create is not None and _accepts(create, 1):
+        return _record_strategy
+    for name in ("create_message", "add_message", "append"):
+        if hasattr(store, name):
+            return _pair_strategy(name)
+    for name in ("create", "write"):
+        method = getattr(store, name, None)
+        if method is not None and _accepts(method, 2):
+            return _pair_strategy(name)
+    write = getattr(store, "write", None)
+    if write is not None and _accepts(write, 1):
+        return _single_strategy("write")
+    raise AttributeError("Unsupported memory_store interface for writing messages")
+
+
+_STRATEGIES: Dict[type, _Strategy] = {}
+
+
+class StoreAdapter:
+    """A store paired with its cached write strategy."""
+
+    __slots__ = ("store", "_strategy")
+
+    def __init__(self, store: Any, strategy: _Strategy) -> None:
+        self.store = store
+        self._strategy = strategy
+
+    def write(
+        self,
+        user_id: str,
+        role: str,
+        content: str,
+        *,
+        record_id: Optional[str] = None,
+        metadata: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        """Persist one message.
+
+        ``record_id`` (default: a fresh ``ids.new_id()``) and ``metadata`` apply
+        to record-based stores only.
+        """
+        self._strategy(self.store, user_id, {"role": role, "content": content}, record_id, metadata)
+
+
+def adapt(store: Any) -> StoreAdapter:
+    """Return a StoreAdapter for ``store``; strategy resolution is cached per type."""
+    if isinstance(store, StoreAdapter):
+        return store
+    store_type = type(store)
+    strategy = _STRATEGIES.get(store_type)
+    if strategy is None:
+        strategy = _STRATEGIES[store_type] = _resolve(store)
+    return StoreAdapter(store, strategy)
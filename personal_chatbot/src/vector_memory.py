@@ -0,0 +1,250 @@
+"""Optional semantic recall over stored messages (requires NumPy).
+
+Side-effect free on import. ``VectorMemory`` keeps L2-normalised float32
+embeddings in one contiguous row-major matrix and answers top-k cosine
+queries with a single matrix-vector product plus ``np.argpartition``.
+
+When given a directory, the matrix lives in a memory-mapped file
+(``vectors.f32``) next to an append-only row log (``rows.tsv``; tabs, line
+breaks and backslashes in ids are backslash-escaped), so a restart maps the
+existing vectors instead of re-embedding history. Capacity grows by doubling
+the file in place.
+
+Embedders are pluggable (see ``Embedder``); ``HashingEmbedder`` is a
+dependency-free local embedder suitable for tests and offline use.
+At 256 dimensions a million vectors occupy ~1 GB of mapped memory.
+"""
+
+from __future__ import annotations
+
+import json
+import re
+import zlib
+from pathlib import Path
+from typing import Dict, List, Optional, Protocol, Sequence, Tuple
+
+import numpy as np
+
+from personal_chatbot.src.memory_manager import MemoryRecord, tokenize
+
+_ESCAPES = str.maketrans({"\\": "\\\\", "\t": "\\t", "\n": "\\n", "\r": "\\r"})
+_ESCAPED = re.compile(r"\\(.)")
+_UNESCAPES = {"t": "\t", "n": "\n", "r": "\r"}
+
+
+class Embedder(Protocol):  # pragma: no cover - interface
+    dim: int
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        """Return an (n, dim) float32 array; rows need not be normalised."""
+        ...
+
+
+class HashingEmbedder:
+    """Signed feature hashing of word unigrams and bigrams (deterministic across processes)."""
+
+    def __init__(self, dim: int = 256) -> None:
+        self.dim = dim
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        out = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            words = tokenize(text)
+            features = words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+            for feature in features:
+                h = zlib.crc32(feature.encode("utf-8"))
+                out[row, h % self.dim] += 1.0 if h & 0x80000000 else -1.0
+        return out
+
+
+class VectorMemory:
+    """Top-k cosine recall over record embeddings, scoped per user.
+
+    Not thread-safe; callers serialise writes. Deleted rows are zeroed and
+    masked out rather than compacted.
+    """
+
+    _INITIAL_CAPACITY = 1024
+
+    def __init__(self, embedder: Embedder, path: Path | str | None = None) -> None:
+        self._embedder = embedder
+        self._dim = embedder.dim
+        self._dir = Path(path) if path is not None else None
+        self._ids: List[str] = []
+        self._row_of: Dict[str, int] = {}
+        self._user_codes: Dict[str, int] = {}
+        self._codes = np.empty(0, dtype=np.int32)
+        self._rows_log = None
+        if self._dir is not None:
+            self._dir.mkdir(parents=True, exist_ok=True)
+            self._open_disk()
+        else:
+            self._matrix = np.zeros((self._INITIAL_CAPACITY, self._dim), dtype=np.float32)
+            self._codes = np.full(self._INITIAL_CAPACITY, -1, dtype=np.int32)
+
+    def __len__(self) -> int:
+        return len(self._row_of)
+
+    def add(self, record: MemoryRecord) -> None:
+        self.add_many([record])
+
+    def add_many(self, records: Sequence[MemoryRecord]) -> None:
+        """Embed records in one batch and append them; re-adding an id replaces it.
+
+        An id repeated within ``records`` is added once, from its last occurrence.
+        """
+        last = {record.id: record for record in records}
+        if len(last) < len(records):
+            records = list(last.values())
+        if not records:
+            return
+        vectors = _normalise(self._embedder.embed([r.content for r in records]))
+        for record in records:
+            if record.id in self._row_of:
+                self.remove(record.id)
+        start = len(self._ids)
+        self._reserve(start + len(records))
+        self._matrix[start:start + len(records)] = vectors
+        lines = []
+        codes = []
+        for row, record in enumerate(records, start):
+            self._ids.append(record.id)
+            self._row_of[record.id] = row
+            codes.append(self._code(record.user_id))
+            lines.append(f"+\t{_escape(record.id)}\t{_escape(record.user_id)}\n")
+        self._codes[start:start + len(records)] = codes
+        self._log("".join(lines))
+
+    def remove(self, record_id: str) -> bool:
+        row = self._row_of.pop(record_id, None)
+        if row is None:
+            return False
+        self._matrix[row] = 0.0
+        self._codes[row] = -1
+        self._log(f"-\t{_escape(record_id)}\n")
+        return True
+
+    def search(self, user_id: str, query: str | np.ndarray, k: int = 5) -> List[Tuple[str, float]]:
+        """Return up to ``k`` (record_id, cosine similarity) pairs for ``user_id``, best first."""
+        code = self._user_codes.get(user_id)
+        count = len(self._ids)
+        if code is None or k <= 0 or count == 0:
+            return []
+        if isinstance(query, str):
+            query = self._embedder.embed([query])
+        q = _normalise(np.asarray(query, dtype=np.float32).reshape(1, -1))[0]
+        scores = self._matrix[:count] @ q
+        scores[self._codes[:count] != code] = -np.inf
+        k = min(k, count)
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return [(self._ids[i], float(scores[i])) for i in top if scores[i] != -np.inf]
+
+    def flush(self) -> None:
+        """Persist mapped vectors and the row log (no-op for in-memory indexes)."""
+        if isinstance(self._matrix, np.memmap):
+            self._matrix.flush()
+        if self._rows_log is not None:
+            self._rows_log.flush()
+
+    def close(self) -> None:
+        self.flush()
+        if self._rows_log is not None:
+            self._rows_log.close()
+            self._rows_log = None
+
+    # Storage
+
+    def _code(self, user_id: str) -> int:
+        code = self._user_codes.get(user_id)
+        if code is None:
+            code = self._user_codes[user_id] = len(self._user_codes)
+        return code
+
+    def _reserve(self, rows: int) -> None:
+        capacity = self._matrix.shape[0]
+        if rows <= capacity:
+            return
+        while capacity < rows:
+            capacity *= 2
+        codes = np.full(capacity, -1, dtype=np.int32)
+        codes[: len(self._codes)] = self._codes
+        self._codes = codes
+        if self._dir is None:
+            matrix = np.zeros((capacity, self._dim), dtype=np.float32)
+            matrix[: self._matrix.shape[0]] = self._matrix
+            self._matrix = matrix
+        else:
+            self._matrix.flush()
+            del self._matrix
+            self._matrix = self._map(capacity)
+
+    def _map(self, capacity: int) -> np.memmap:
+        path = self._dir / "vectors.f32"
+        size = capacity * self._dim * 4
+        with open(path, "ab") as fh:
+            if fh.tell() < size:
+                fh.truncate(size)
+        return np.memmap(path, dtype=np.float32, mode="r+", shape=(capacity, self._dim))
+
+    def _open_disk(self) -> None:
+        meta_path = self._dir / "index.json"
+        if meta_path.exists():
+            meta = json.loads(meta_path.read_text(encoding="utf-8"))
+            if meta.get("dim") != self._dim:
+                raise ValueError(f"Index dimension {meta.get('dim')} does not match embedder dimension {self._dim}")
+        else:
+            meta_path.write_text(json.dumps({"dim": self._dim}), encoding="utf-8")
+
+        rows_path = self._dir / "rows.tsv"
+        users: List[str] = []
+        if rows_path.exists():
+            valid = 0
+            with open(rows_path, "rb") as fh:
+                for raw in fh:
+                    if not raw.endswith(b"\n"):
+                        break  # torn final write; dropped below
+                    valid += len(raw)
+                    fields = [_unescape(field) for field in raw[:-1].decode("utf-8").split("\t")]
+                    if fields[0] == "+":
+                        self._row_of[fields[1]] = len(self._ids)
+                        self._ids.append(fields[1])
+                        users.append(fields[2])
+                    else:
+                        self._row_of.pop(fields[1], None)
+            if valid < rows_path.stat().st_size:
+                with open(rows_path, "r+b") as fh:
+                    fh.truncate(valid)
+        vectors_path = self._dir / "vectors.f32"
+        existing = vectors_path.stat().st_size // (self._dim * 4) if vectors_path.exists() else 0
+        capacity = max(self._INITIAL_CAPACITY, existing)
+        while capacity < len(self._ids):
+            capacity *= 2
+        self._matrix = self._map(capacity)
+        self._codes = np.full(capacity, -1, dtype=np.int32)
+        # Rows superseded by a later re-add or deletion stay masked out.
+        for row, (record_id, user_id) in enumerate(zip(self._ids, users)):
+            if self._row_of.get(record_id) == row:
+                self._codes[row] = self._code(user_id)
+        self._rows_log = open(rows_path, "a", encoding="utf-8", newline="\n")
+
+    def _log(self, text: str) -> None:
+        if self._rows_log is not None:
+            self._rows_log.write(text)
+
+
+def _escape(field: str) -> str:
+    return field.translate(_ESCAPES)
+
+
+def _unescape(field: str) -> str:
+    if "\\" not in field:
+        return field
+    return _ESCAPED.sub(lambda m: _UNESCAPES.get(m.group(1), m.group(1)), field)
+
+
+def _normalise(vectors: np.ndarray) -> np.ndarray:
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
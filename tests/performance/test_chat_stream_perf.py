@@ -0,0 +1,50 @@
+"""Flush cadence and per-token overhead of chat_ui.respond_stream."""
+
+from personal_chatbot.src import chat_ui as ui
+from personal_chatbot.src.memory_manager import InMemoryStore
+
+DELTAS = 100_000
+
+
+class _Client:
+    def __init__(self, clock=None, step: float = 0.0):
+        self._clock = clock
+        self._step = step
+
+    def chat_stream(self, messages):
+        for _ in range(DELTAS):
+            if self._clock is not None:
+                self._clock.now += self._step
+            yield "tok "
+
+
+class _Clock:
+    now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_respond_stream_overhead_per_token(perf_timer):
+    stream = ui.respond_stream("bench", "u1", InMemoryStore(), _Client())
+    with perf_timer() as t:
+        for _ in stream:
+            pass
+    per_token_us = stream.stats.overhead_per_token * 1e6
+    print(f"respond_stream deltas={DELTAS} wall={t.duration:.1f}ms "
+          f"buffering overhead={per_token_us:.2f} us/token flushes={stream.stats.flushes}")
+    assert stream.stats.tokens == DELTAS
+    assert per_token_us < 50.0
+
+
+def test_respond_stream_flush_cadence_tracks_interval():
+    # Simulate a provider emitting one token per 2ms (~500 tok/s)
+    clock = _Clock()
+    stream = ui.respond_stream("bench", "u1", InMemoryStore(), _Client(clock, step=0.002),
+                               flush_interval=0.08, max_buffer_chars=1 << 20, clock=clock)
+    for _ in stream:
+        pass
+    stats = stream.stats
+    print(f"respond_stream flushes={stats.flushes} mean interval={stats.mean_flush_interval * 1000:.1f}ms "
+          f"({stats.tokens / stats.flushes:.0f} tokens/flush)")
+    assert 0.05 <= stats.mean_flush_interval <= 0.15
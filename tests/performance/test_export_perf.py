@@ -0,0 +1,88 @@
+"""Markdown export throughput for a 100k-message conversation, and flat memory.
+
+Messages are ~300 chars of mixed prose. Throughput is measured without
+tracing; peak Python allocations are then compared between a 10k and a 100k
+message export of the same store type and must not grow with the transcript.
+The incremental benchmark times re-exporting after one new message against
+a full re-render.
+"""
+
+import random
+import time
+import tracemalloc
+
+import pytest
+
+from personal_chatbot.src.exporter import ConversationInfo, export_conversation, export_incremental
+from personal_chatbot.src.ids import new_id
+from personal_chatbot.src.memory_manager import InMemoryStore, MemoryRecord, SqliteStore
+
+WORDS = "the a memory export stream buffer record message model token reply context file".split()
+
+
+def _fill(store, n, conversation="conv"):
+    rng = random.Random(5)
+    records = [
+        MemoryRecord(
+            new_id(),
+            conversation,
+            " ".join(rng.choice(WORDS) for _ in range(50)),
+            {"role": "user" if i % 2 == 0 else "assistant"},
+        )
+        for i in range(n)
+    ]
+    if isinstance(store, SqliteStore):
+        with store.batch():
+            for record in records:
+                store.create(record)
+    else:
+        for record in records:
+            store.create(record)
+    return store
+
+
+def _peak_kib(store, tmp_path):
+    tracemalloc.start()
+    export_conversation(store, ConversationInfo("conv", title="peak"), exports_dir=tmp_path)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak / 1024
+
+
+@pytest.mark.parametrize("store_type", [InMemoryStore, SqliteStore], ids=["memory", "sqlite"])
+def test_export_throughput_and_flat_memory(tmp_path, store_type):
+    big = _fill(store_type(), 100_000)
+    t0 = time.perf_counter()
+    result = export_conversation(big, ConversationInfo("conv", title="long chat"), exports_dir=tmp_path)
+    elapsed = time.perf_counter() - t0
+    small_peak = _peak_kib(_fill(store_type(), 10_000), tmp_path)
+    big_peak = _peak_kib(big, tmp_path)
+    print(
+        f"{store_type.__name__}: {result.messages} messages {result.bytes_written / 1e6:.1f}MB in {elapsed:.2f}s "
+        f"-> {result.bytes_written / elapsed / 1e6:.1f}MB/s; peak 10k={small_peak:.0f}KiB 100k={big_peak:.0f}KiB"
+    )
+    assert result.messages == 100_000
+    assert big_peak < small_peak * 1.5 + 256
+
+
+@pytest.mark.parametrize("store_type", [InMemoryStore, SqliteStore], ids=["memory", "sqlite"])
+def test_incremental_export_costs_only_new_messages(tmp_path, store_type):
+    store = _fill(store_type(), 50_000)
+    info = ConversationInfo("conv", title="long chat")
+    t0 = time.perf_counter()
+    export_incremental(store, info, exports_dir=tmp_path)
+    full = time.perf_counter() - t0
+
+    appends = []
+    for _ in range(20):
+        store.create(MemoryRecord(new_id(), "conv", "one more message", {"role": "user"}))
+        t0 = time.perf_counter()
+        result = export_incremental(store, info, exports_dir=tmp_path)
+        appends.append(time.perf_counter() - t0)
+        assert result.incremental and result.messages == 1
+    append = sorted(appends)[len(appends) // 2]
+    print(
+        f"{store_type.__name__}: full export of 50k messages {full * 1000:.0f}ms, "
+        f"append of 1 message {append * 1000:.2f}ms (median of 20) -> {full / append:.0f}x"
+    )
+    assert append * 20 < full
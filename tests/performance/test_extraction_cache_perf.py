@@ -0,0 +1,49 @@
+"""Extraction cache: cold parse vs warm hit, and hit rate on a re-attach workload.
+
+Ten generated documents are attached 100 times with a skewed (80/20)
+popularity; every repeat attachment should be served from disk.
+"""
+
+import random
+import time
+
+import pytest
+
+from personal_chatbot.src.extraction_cache import ExtractionCache, file_sha256
+
+
+def _documents(tmp_path):
+    fitz = pytest.importorskip("fitz")
+    paths = []
+    for d in range(10):
+        pdf = fitz.open()
+        for i in range(20):
+            page = pdf.new_page()
+            for j in range(30):
+                page.insert_text((40, 40 + j * 18), f"doc {d} page {i} line {j} lorem ipsum dolor sit amet")
+        path = tmp_path / f"doc{d}.pdf"
+        pdf.save(path)
+        paths.append(path)
+    return paths
+
+
+def test_cache_hit_latency_and_hit_rate(tmp_path):
+    paths = _documents(tmp_path)
+    hashes = {path: file_sha256(path) for path in paths}
+    cache = ExtractionCache(tmp_path / "cache")
+    rng = random.Random(3)
+    cold, warm = [], []
+    for _ in range(100):
+        path = paths[rng.randrange(2)] if rng.random() < 0.8 else rng.choice(paths)
+        t0 = time.perf_counter()
+        hits = cache.stats.hits
+        cache.get_or_extract(path, sha256=hashes[path])
+        (warm if cache.stats.hits > hits else cold).append((time.perf_counter() - t0) * 1000.0)
+    stats = cache.stats
+    print(
+        f"hit rate={stats.hit_rate:.0%} cold={sum(cold) / len(cold):.1f}ms warm={sum(warm) / len(warm):.2f}ms "
+        f"parsed bytes saved={stats.source_bytes_saved / 1e6:.1f}MB time saved={stats.seconds_saved:.2f}s "
+        f"on disk={stats.bytes_on_disk / 1024:.0f}KiB"
+    )
+    assert stats.misses <= len(paths)
+    assert sum(warm) / len(warm) < sum(cold) / len(cold) / 5
@@ -0,0 +1,51 @@
+"""Tail latency with and without hedged requests under a heavy-tailed provider.
+
+The local transport answers in ~2ms, except 5% of requests which stall for
+150ms; hedging after 10ms with a 10% traffic budget should cut the p99.
+"""
+
+import random
+import threading
+import time
+
+from personal_chatbot.src.openrouter_client import HedgePolicy, OpenRouterClient, OpenRouterConfig
+
+REQUESTS = 200
+
+
+class _TailTransport:
+    def __init__(self, seed: int):
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.calls = 0
+
+    def post(self, path, json, timeout):
+        with self._lock:
+            self.calls += 1
+            stall = self._rng.random() < 0.05
+        time.sleep(0.15 if stall else 0.002)
+        return {"choices": [{"message": {"role": "assistant", "content": "ok"}}]}
+
+
+def _run(hedge):
+    transport = _TailTransport(seed=7)
+    config = OpenRouterConfig(base_url="https://openrouter.ai/api/v1", model="m", request_timeout_seconds=5.0)
+    client = OpenRouterClient(config, transport=transport, hedge=hedge)
+    latencies = []
+    for _ in range(REQUESTS):
+        t0 = time.perf_counter()
+        client.chat_complete([])
+        latencies.append((time.perf_counter() - t0) * 1000.0)
+    client.close()
+    latencies.sort()
+    return latencies[len(latencies) // 2], latencies[int(len(latencies) * 0.99) - 1], transport.calls
+
+
+def test_hedging_reduces_p99_within_budget():
+    base_p50, base_p99, base_calls = _run(None)
+    hedge_p50, hedge_p99, hedge_calls = _run(HedgePolicy(delay=0.01, budget_fraction=0.1))
+    print(f"no hedge  p50={base_p50:.1f}ms p99={base_p99:.1f}ms provider calls={base_calls}")
+    print(f"hedged    p50={hedge_p50:.1f}ms p99={hedge_p99:.1f}ms provider calls={hedge_calls}")
+
+    assert hedge_calls <= REQUESTS * 1.1 + 1
+    assert hedge_p99 < base_p99
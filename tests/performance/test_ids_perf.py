@@ -0,0 +1,32 @@
+"""Throughput of lock-free time-ordered ID generation."""
+
+import threading
+
+from personal_chatbot.src.ids import new_id
+
+COUNT = 200_000
+
+
+def test_new_id_throughput(perf_timer):
+    with perf_timer() as t:
+        for _ in range(COUNT):
+            new_id()
+    rate = COUNT / (t.duration / 1000.0)
+    print(f"ids.new_id single thread {rate:,.0f} ids/s")
+    assert rate > 50_000
+
+
+def test_new_id_throughput_contended(perf_timer):
+    per_thread = COUNT // 4
+
+    def worker():
+        for _ in range(per_thread):
+            new_id()
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    with perf_timer() as t:
+        for th in threads:
+            th.start()
+        for th in threads:
+            th.join()
+    print(f"ids.new_id 4 threads     {COUNT / (t.duration / 1000.0):,.0f} ids/s")
@@ -0,0 +1,63 @@
+"""Preview cost of lazy extraction vs full extraction for large documents.
+
+A 2,000-char preview of a 300-page PDF or a 20,000-row XLSX should parse
+only the first page or row chunk: time and peak Python allocations must be
+a small fraction of extracting the whole document. (XLSX previews still load
+the workbook's shared-strings table, which grows with the document.)
+"""
+
+import time
+import tracemalloc
+
+import pytest
+
+from personal_chatbot.src.extraction import extract_content, extract_partial
+
+
+def _measure(fn):
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    result = fn()
+    elapsed = (time.perf_counter() - t0) * 1000.0
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak / 1024
+
+
+def _pdf(tmp_path):
+    fitz = pytest.importorskip("fitz")
+    pdf = fitz.open()
+    for i in range(300):
+        page = pdf.new_page()
+        for j in range(40):
+            page.insert_text((40, 40 + j * 18), f"Page {i} line {j}: the quick brown fox jumps over the lazy dog")
+    path = tmp_path / "big.pdf"
+    pdf.save(path)
+    return path
+
+
+def _xlsx(tmp_path):
+    openpyxl = pytest.importorskip("openpyxl")
+    # Normal mode writes the <dimension> element Excel emits; without it
+    # openpyxl's read-only loader scans the whole sheet just to size it.
+    workbook = openpyxl.Workbook()
+    sheet = workbook.active
+    for i in range(20_000):
+        sheet.append([i, f"name{i}", i * 0.5, "some note text"])
+    path = tmp_path / "big.xlsx"
+    workbook.save(path)
+    return path
+
+
+@pytest.mark.parametrize("make", [_pdf, _xlsx], ids=["pdf", "xlsx"])
+def test_preview_is_bounded_by_chunk_not_document(tmp_path, make):
+    path = make(tmp_path)
+    full, full_ms, full_kib = _measure(lambda: extract_content(path))
+    preview, lazy_ms, lazy_kib = _measure(lambda: extract_partial(path, max_chars=2000, rows_per_chunk=200))
+    print(
+        f"{path.suffix}: full {full['meta']['chars']} chars {full_ms:.0f}ms peak {full_kib:.0f}KiB | "
+        f"preview {preview.content['meta']['chars']} chars {lazy_ms:.1f}ms peak {lazy_kib:.0f}KiB"
+    )
+    assert preview.content["text"] == full["text"][:2000]
+    assert lazy_ms < full_ms / 5
+    assert lazy_kib < full_kib / 2
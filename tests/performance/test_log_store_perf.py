@@ -0,0 +1,76 @@
+"""LogStore against InMemoryStore and SqliteStore: writes/sec and cold start.
+
+100k records of ~70 chars across 50 users. Cold start is the time to open
+the store and serve one ``list_by_user`` page: for LogStore with the saved
+index, and with the index removed (full log replay); SqliteStore opens
+lazily, so its index cost is paid by the first query instead.
+"""
+
+import os
+
+from personal_chatbot.src.log_store import INDEX_FILE, LogStore
+from personal_chatbot.src.memory_manager import InMemoryStore, MemoryRecord, SqliteStore
+
+RECORDS = 100_000
+
+
+def _records():
+    return [
+        MemoryRecord(id=f"m{i:07d}", user_id=f"user-{i % 50}", content="message " * 8, metadata={"role": "user"})
+        for i in range(RECORDS)
+    ]
+
+
+def _write_rate(store, records, perf_timer, *, batched=False):
+    with perf_timer() as t:
+        if batched:
+            with store.batch():
+                for record in records:
+                    store.create(record)
+        else:
+            for record in records:
+                store.create(record)
+    return RECORDS / (t.duration / 1000.0)
+
+
+def _cold_start(open_store, perf_timer):
+    with perf_timer() as t:
+        store = open_store()
+        page = store.list_by_user("user-7", limit=20, newest_first=True)
+    assert len(page) == 20
+    store.close()
+    return t.duration
+
+
+def test_log_store_writes_and_cold_start(tmp_path, perf_timer):
+    records = _records()
+    rates = {
+        "InMemoryStore": _write_rate(InMemoryStore(), records, perf_timer),
+        "SqliteStore (per-write)": _write_rate(SqliteStore(tmp_path / "single.db"), records, perf_timer),
+    }
+    grouped = SqliteStore(tmp_path / "grouped.db")
+    rates["SqliteStore (batch)"] = _write_rate(grouped, records, perf_timer, batched=True)
+    grouped.close()
+    log = LogStore(tmp_path / "log", compact_interval=None)
+    rates["LogStore"] = _write_rate(log, records, perf_timer)
+    with perf_timer() as t:
+        for i in range(2000):
+            log.list_by_user(f"user-{i % 50}", limit=20, newest_first=True)
+    list_us = t.duration * 1000 / 2000
+    log.close()
+
+    cold = {
+        "SqliteStore": _cold_start(lambda: SqliteStore(tmp_path / "grouped.db"), perf_timer),
+        "LogStore (index)": _cold_start(lambda: LogStore(tmp_path / "log", compact_interval=None), perf_timer),
+    }
+    os.remove(tmp_path / "log" / INDEX_FILE)
+    cold["LogStore (replay)"] = _cold_start(lambda: LogStore(tmp_path / "log", compact_interval=None), perf_timer)
+
+    for name, rate in rates.items():
+        print(f"{name:<24} {rate:12,.0f} writes/s")
+    print(f"LogStore.list_by_user    {list_us:12.2f} us/call (limit=20)")
+    for name, ms in cold.items():
+        print(f"cold start {name:<18} {ms:10.1f} ms ({RECORDS} records)")
+
+    assert rates["LogStore"] > rates["SqliteStore (per-write)"]
+    assert cold["LogStore (index)"] < cold["LogStore (replay)"]
@@ -0,0 +1,67 @@
+"""Micro-benchmarks for MemoryStore adapters.
+
+Timings are printed (run with ``-s``) and asserted only on scaling ratios,
+which keeps the checks stable across machines.
+"""
+
+from personal_chatbot.src.memory_manager import InMemoryStore, MemoryRecord, SqliteStore
+
+RECORDS_PER_USER = 5
+LOOKUPS = 2000
+WRITES = 5000
+
+
+def _populate(store: InMemoryStore, users: int) -> None:
+    for u in range(users):
+        for i in range(RECORDS_PER_USER):
+            store.create(MemoryRecord(id=f"{u}:{i}", user_id=f"user-{u}", content="x", metadata={}))
+
+
+def test_list_by_user_cost_is_flat_as_user_count_grows(perf_timer):
+    timings = {}
+    for users in (100, 1_000, 20_000):
+        store = InMemoryStore()
+        _populate(store, users)
+        target = f"user-{users // 2}"
+        with perf_timer() as t:
+            for _ in range(LOOKUPS):
+                store.list_by_user(target, limit=RECORDS_PER_USER)
+        timings[users] = t.duration
+        print(f"InMemoryStore.list_by_user users={users:>6} records={users * RECORDS_PER_USER:>7} "
+              f"{t.duration * 1000 / LOOKUPS:8.2f} us/call")
+
+    # A full scan would grow ~200x between the smallest and largest store.
+    assert timings[20_000] < timings[100] * 5 + 5.0
+
+
+def _write_rate(store, perf_timer, *, batched: bool) -> float:
+    records = [MemoryRecord(id=str(i), user_id=f"user-{i % 50}", content="message " * 8, metadata={"role": "user"})
+               for i in range(WRITES)]
+    with perf_timer() as t:
+        if batched:
+            with store.batch():
+                for rec in records:
+                    store.create(rec)
+        else:
+            for rec in records:
+                store.create(rec)
+    return WRITES / (t.duration / 1000.0)
+
+
+def test_sqlite_store_throughput_vs_in_memory(tmp_path, perf_timer):
+    in_memory = _write_rate(InMemoryStore(), perf_timer, batched=False)
+    per_write = _write_rate(SqliteStore(tmp_path / "single.db"), perf_timer, batched=False)
+    grouped_store = SqliteStore(tmp_path / "grouped.db")
+    grouped = _write_rate(grouped_store, perf_timer, batched=True)
+
+    with perf_timer() as t:
+        for i in range(LOOKUPS):
+            grouped_store.list_by_user(f"user-{i % 50}", limit=20, newest_first=True)
+    list_us = t.duration * 1000 / LOOKUPS
+
+    print(f"InMemoryStore.create          {in_memory:12,.0f} writes/s")
+    print(f"SqliteStore.create (per-write) {per_write:12,.0f} writes/s")
+    print(f"SqliteStore.create (batch)     {grouped:12,.0f} writes/s")
+    print(f"SqliteStore.list_by_user       {list_us:12.2f} us/call (limit=20)")
+
+    assert grouped > per_write
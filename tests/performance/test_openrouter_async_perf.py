@@ -0,0 +1,73 @@
+"""Benchmark AsyncOpenRouterClient against a local keep-alive HTTP stub.
+
+The stub counts accepted TCP connections so the test can verify that
+thousands of concurrent requests are multiplexed over a bounded pool.
+"""
+
+import asyncio
+import json
+import time
+
+import pytest
+
+from personal_chatbot.src.openrouter_client import AsyncOpenRouterClient, OpenRouterConfig, PoolLimits
+
+pytest.importorskip("httpx")
+
+REQUESTS = 2000
+BODY = json.dumps({"choices": [{"message": {"role": "assistant", "content": "ok"}}]}).encode()
+
+
+class _StubServer:
+    def __init__(self, latency: float = 0.002):
+        self.connections = 0
+        self.requests = 0
+        self._latency = latency
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.connections += 1
+        try:
+            while True:
+                head = await reader.readuntil(b"\r\n\r\n")
+                length = 0
+                for line in head.split(b"\r\n"):
+                    if line.lower().startswith(b"content-length:"):
+                        length = int(line.split(b":", 1)[1])
+                await reader.readexactly(length)
+                self.requests += 1
+                await asyncio.sleep(self._latency)
+                writer.write(
+                    b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+                    b"Content-Length: " + str(len(BODY)).encode() + b"\r\n\r\n" + BODY
+                )
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionResetError):
+            pass
+        finally:
+            writer.close()
+
+
+async def _run(limits: PoolLimits):
+    stub = _StubServer()
+    server = await asyncio.start_server(stub.handle, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    config = OpenRouterConfig(base_url=f"http://127.0.0.1:{port}", model="bench", request_timeout_seconds=30.0)
+    async with server:
+        async with AsyncOpenRouterClient.pooled(config, limits=limits) as client:
+            start = time.perf_counter()
+            results = await asyncio.gather(
+                *(client.chat_complete([{"role": "user", "content": str(i)}]) for i in range(REQUESTS))
+            )
+            elapsed = time.perf_counter() - start
+    return stub, results, elapsed
+
+
+def test_async_client_multiplexes_thousands_of_requests_over_bounded_pool():
+    limits = PoolLimits(max_connections=16, max_keepalive_connections=16)
+    stub, results, elapsed = asyncio.run(_run(limits))
+    print(f"AsyncOpenRouterClient in-flight={REQUESTS} pool={limits.max_connections} "
+          f"connections={stub.connections} {REQUESTS / elapsed:,.0f} req/s")
+
+    assert len(results) == REQUESTS
+    assert stub.requests == REQUESTS
+    assert stub.connections <= limits.max_connections
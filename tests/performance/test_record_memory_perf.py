@@ -0,0 +1,55 @@
+"""Bytes per cached record: the former dataclass vs MemoryRecord vs RecordColumns.
+
+100k records are read back from SQLite the way a cache fills (every row
+brings fresh strings and a decoded metadata dict), 1 in 10 with empty
+metadata. Reported sizes are traced Python allocations per record,
+including the id and content strings shared by all three layouts.
+"""
+
+import json
+import tracemalloc
+from dataclasses import dataclass
+from typing import Any, Dict
+
+from personal_chatbot.src.memory_manager import MemoryRecord, RecordColumns, SqliteStore
+
+RECORDS = 100_000
+
+
+@dataclass
+class LegacyRecord:  # MemoryRecord before it was slotted
+    id: str
+    user_id: str
+    content: str
+    metadata: Dict[str, Any]
+
+
+def _store():
+    store = SqliteStore()
+    with store.batch():
+        for i in range(RECORDS):
+            metadata = {} if i % 10 == 0 else {"role": "user" if i % 2 else "assistant"}
+            store.create(MemoryRecord(f"m{i:07d}", f"conversation-{i % 40}", "short reply", metadata))
+    return store
+
+
+def _bytes_per_record(store, build):
+    rows = store._conn.execute("SELECT id, user_id, content, metadata FROM memory_records ORDER BY seq")
+    tracemalloc.start()
+    kept = build((row[0], row[1], row[2], json.loads(row[3])) for row in rows)
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    assert len(kept) == RECORDS
+    return size / RECORDS
+
+
+def test_bytes_per_record():
+    store = _store()
+    legacy = _bytes_per_record(store, lambda rows: [LegacyRecord(*row) for row in rows])
+    compact = _bytes_per_record(store, lambda rows: [MemoryRecord(*row) for row in rows])
+    columns = _bytes_per_record(store, lambda rows: RecordColumns(MemoryRecord(*row) for row in rows))
+    print(f"dataclass record   {legacy:8.1f} B/record")
+    print(f"slotted record     {compact:8.1f} B/record ({1 - compact / legacy:.0%} less)")
+    print(f"RecordColumns      {columns:8.1f} B/record ({1 - columns / legacy:.0%} less)")
+    assert compact < legacy * 0.8
+    assert columns < compact
@@ -0,0 +1,68 @@
+"""Full-text search latency over a synthetic 100k-message corpus.
+
+Words follow a Zipf-like distribution so queries mix rare and very common
+terms; p50/p99 are reported for the in-process index and SQLite FTS5.
+"""
+
+import itertools
+import random
+import time
+
+import pytest
+
+from personal_chatbot.src.memory_manager import InMemoryStore, MemoryRecord, SqliteStore
+from personal_chatbot.src.search_index import IndexedStore
+
+MESSAGES = 100_000
+QUERIES = 300
+VOCAB = [f"term{i}" for i in range(5_000)]
+CUM_WEIGHTS = list(itertools.accumulate(1.0 / (rank + 1) for rank in range(len(VOCAB))))
+
+
+@pytest.fixture(scope="module")
+def corpus():
+    rng = random.Random(42)
+    records = []
+    for i in range(MESSAGES):
+        words = rng.choices(VOCAB, cum_weights=CUM_WEIGHTS, k=rng.randint(5, 25))
+        records.append(MemoryRecord(id=f"m{i}", user_id=f"u{i % 4}", content=" ".join(words), metadata={}))
+    queries = [" ".join(rng.choices(VOCAB, cum_weights=CUM_WEIGHTS, k=rng.randint(1, 3))) for _ in range(QUERIES)]
+    return records, queries
+
+
+def _percentiles(samples):
+    ordered = sorted(samples)
+    return ordered[len(ordered) // 2], ordered[int(len(ordered) * 0.99) - 1]
+
+
+def _measure(label, store, records, queries):
+    start = time.perf_counter()
+    if hasattr(store, "batch"):
+        with store.batch():
+            for rec in records:
+                store.create(rec)
+    else:
+        for rec in records:
+            store.create(rec)
+    build_s = time.perf_counter() - start
+
+    latencies = []
+    for i, q in enumerate(queries):
+        t0 = time.perf_counter()
+        store.search(f"u{i % 4}", q, limit=10)
+        latencies.append((time.perf_counter() - t0) * 1000.0)
+    p50, p99 = _percentiles(latencies)
+    print(f"{label:<10} messages={len(records):,} build={build_s:.2f}s p50={p50:.2f}ms p99={p99:.2f}ms")
+    return p50, p99
+
+
+def test_in_process_index_latency(corpus):
+    records, queries = corpus
+    p50, p99 = _measure("inverted", IndexedStore(InMemoryStore()), records, queries)
+    assert p99 < 500.0
+
+
+def test_sqlite_fts5_latency(corpus, tmp_path):
+    records, queries = corpus
+    p50, p99 = _measure("fts5", SqliteStore(tmp_path / "search.db"), records, queries)
+    assert p99 < 500.0
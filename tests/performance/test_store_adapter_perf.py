@@ -0,0 +1,93 @@
+"""Per-turn persistence overhead: legacy per-message probing vs cached adapter.
+
+``_legacy_write`` reproduces the pre-adapter chat_ui path: an import and
+MemoryRecord construction per message, hasattr probes, and TypeError
+retries for stores that do not take records.
+"""
+
+from typing import Any
+
+from personal_chatbot.src.memory_manager import InMemoryStore
+from personal_chatbot.src.store_adapter import adapt
+
+TURNS = 20_000
+
+
+class _AddMessageStore:
+    def add_message(self, user_id, message):
+        pass
+
+
+class _PairCreateStore:
+    def create(self, user_id, message):
+        pass
+
+
+class _DictWriteStore:
+    def write(self, message):
+        pass
+
+
+def _legacy_probe(store: Any, user_id: str, message: dict) -> None:
+    for name in ("create_message", "add_message", "append"):
+        if hasattr(store, name):
+            getattr(store, name)(user_id, message)
+            return
+    try:
+        from personal_chatbot.src.memory_manager import MemoryRecord
+        rec = MemoryRecord(user_id=user_id, role=message.get("role"), content=message.get("content"))  # type: ignore[call-arg]
+        store.create(rec)
+        return
+    except Exception:
+        pass
+    for name in ("create", "write"):
+        if hasattr(store, name):
+            method = getattr(store, name)
+            try:
+                method(user_id, message)
+                return
+            except TypeError:
+                pass
+            try:
+                method(message)
+                return
+            except TypeError:
+                pass
+
+
+def _legacy_write(store: Any, user_id: str, message: dict, record_id: str) -> None:
+    try:
+        from personal_chatbot.src.memory_manager import MemoryRecord
+        rec = MemoryRecord(id=record_id, user_id=user_id, content=message["content"], metadata={})
+        if hasattr(store, "create"):
+            store.create(rec)
+        else:
+            _legacy_probe(store, user_id, message)
+    except Exception:
+        _legacy_probe(store, user_id, message)
+
+
+def test_adapter_reduces_per_turn_overhead(perf_timer):
+    shapes = {
+        "InMemoryStore": InMemoryStore,
+        "add_message(user_id, msg)": _AddMessageStore,
+        "create(user_id, msg)": _PairCreateStore,
+        "write(msg)": _DictWriteStore,
+    }
+    for label, factory in shapes.items():
+        legacy_store, adapted_store = factory(), factory()
+        with perf_timer() as before:
+            for i in range(TURNS):
+                _legacy_write(legacy_store, "u1", {"role": "user", "content": "hi"}, f"u:{i}")
+                _legacy_write(legacy_store, "u1", {"role": "assistant", "content": "yo"}, f"a:{i}")
+        with perf_timer() as after:
+            for i in range(TURNS):
+                store = adapt(adapted_store)
+                store.write("u1", "user", "hi", record_id=f"u:{i}")
+                store.write("u1", "assistant", "yo", record_id=f"a:{i}")
+        before_us = before.duration * 1000 / TURNS
+        after_us = after.duration * 1000 / TURNS
+        print(f"{label:<28} before={before_us:6.2f} us/turn after={after_us:6.2f} us/turn")
+        if label != "InMemoryStore":
+            # Probe chains with TypeError retries are the slow path the adapter removes
+            assert after.duration < before.duration
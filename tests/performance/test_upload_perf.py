@@ -0,0 +1,47 @@
+"""Throughput and peak memory of streaming uploads.
+
+Peak Python allocations while saving must not grow with the upload size:
+a 48 MB upload should need no more than a 4 MB one (one chunk buffer).
+"""
+
+import time
+import tracemalloc
+
+from personal_chatbot.src import file_handler as fh
+
+CHUNK = 1024 * 1024
+
+
+class _GeneratedStream:
+    """Readable stream producing ``size`` bytes without holding them in memory."""
+
+    def __init__(self, size: int):
+        self._remaining = size
+        self._block = bytes(range(256)) * (CHUNK // 256)
+
+    def readinto(self, buffer) -> int:
+        n = min(len(buffer), self._remaining, len(self._block))
+        buffer[:n] = self._block[:n]
+        self._remaining -= n
+        return n
+
+
+def _save(tmp_path, size):
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    saved = fh.save_upload(_GeneratedStream(size), "blob.txt", "perf", base_dir=tmp_path / "uploads", chunk_size=CHUNK)
+    elapsed = time.perf_counter() - t0
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    assert saved["size"] == size
+    return peak, size / elapsed / 1e6
+
+
+def test_upload_peak_memory_is_constant(tmp_path):
+    small_peak, small_rate = _save(tmp_path, 4 * CHUNK)
+    large_peak, large_rate = _save(tmp_path, 48 * CHUNK)
+    print(f"4MB upload:  peak={small_peak / 1024:.0f}KiB {small_rate:.0f}MB/s")
+    print(f"48MB upload: peak={large_peak / 1024:.0f}KiB {large_rate:.0f}MB/s")
+
+    assert large_peak < 2 * CHUNK + 256 * 1024
+    assert large_peak < small_peak * 1.5 + 64 * 1024
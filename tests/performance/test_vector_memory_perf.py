@@ -0,0 +1,58 @@
+"""Top-k cosine query latency for VectorMemory at one million vectors (CPU only).
+
+A random-vector embedder isolates query cost from embedding cost.
+"""
+
+import time
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from personal_chatbot.src.memory_manager import MemoryRecord
+from personal_chatbot.src.vector_memory import VectorMemory
+
+VECTORS = 1_000_000
+DIM = 128
+QUERIES = 20
+BLOCK = 100_000
+
+
+class _RandomEmbedder:
+    dim = DIM
+
+    def __init__(self):
+        self._rng = np.random.default_rng(0)
+
+    def embed(self, texts):
+        return self._rng.standard_normal((len(texts), DIM), dtype=np.float32)
+
+
+def test_topk_query_latency_at_one_million_vectors(tmp_path):
+    memory = VectorMemory(_RandomEmbedder(), tmp_path / "vec")
+    t0 = time.perf_counter()
+    for start in range(0, VECTORS, BLOCK):
+        memory.add_many([MemoryRecord(id=str(i), user_id="u1", content="", metadata={})
+                         for i in range(start, start + BLOCK)])
+    memory.flush()
+    load_s = time.perf_counter() - t0
+
+    target = np.array(memory._matrix[123_456])
+    latencies = []
+    for _ in range(QUERIES):
+        t0 = time.perf_counter()
+        hits = memory.search("u1", target, k=10)
+        latencies.append((time.perf_counter() - t0) * 1000.0)
+    latencies.sort()
+
+    t0 = time.perf_counter()
+    memory.close()
+    reopened = VectorMemory(_RandomEmbedder(), tmp_path / "vec")
+    reopen_s = time.perf_counter() - t0
+
+    print(f"VectorMemory vectors={VECTORS:,} dim={DIM} add={load_s:.1f}s reopen={reopen_s:.2f}s "
+          f"query p50={latencies[len(latencies) // 2]:.1f}ms max={latencies[-1]:.1f}ms")
+
+    assert hits[0][0] == "123456"
+    assert hits[0][1] == pytest.approx(1.0, abs=1e-5)
+    assert len(reopened) == VECTORS
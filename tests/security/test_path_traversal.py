@@ -22,4 +22,32 @@ def test_safe_join_blocks_absolute_and_traversal(tmp_path):
     # Valid relative path within base succeeds
     p = fh.safe_join(base, "nested/file.txt")
     assert str(p).startswith(str(base))
-    assert p.parent.name == "nested"
\ No newline at end of file
+    assert p.parent.name == "nested"
+
+@pytest.mark.parametrize("conversation_id", ["..", "../x", "a/b", "a\\b", ""])
+def test_save_upload_rejects_unsafe_conversation_ids(tmp_path, conversation_id):
+    with pytest.raises(ValueError):
+        fh.save_upload([b"data"], "a.txt", conversation_id, base_dir=tmp_path / "uploads")
+    assert not (tmp_path / "uploads").exists() or not any((tmp_path / "uploads").rglob("*"))
+
+
+def test_save_upload_strips_directory_components_from_filename(tmp_path):
+    saved = fh.save_upload([b"data"], "../../../etc/passwd.txt", "c", base_dir=tmp_path / "uploads")
+    assert saved["filename"] == "passwd.txt"
+    assert (tmp_path / saved["path"]).parent.parent.parent == tmp_path / "uploads"
+
+
+def test_blob_store_paths_stay_within_uploads(tmp_path):
+    from personal_chatbot.src.blob_store import BlobStore
+
+    store = BlobStore(tmp_path / "uploads")
+    for bad_hash in ("../" + "a" * 61, "A" * 64, "a" * 63):
+        with pytest.raises(ValueError):
+            store.blob_path(bad_hash)
+    for bad_conversation in ("..", "../x", "a/b"):
+        with pytest.raises(ValueError):
+            store.put([b"x"], "a.txt", bad_conversation)
+    with pytest.raises(ValueError):
+        store.release({"path": "uploads/../../etc/passwd", "sha256": "a" * 64})
+    saved = store.put([b"x"], "../../evil.txt", "c1")
+    assert (tmp_path / saved["path"]).resolve().is_relative_to((tmp_path / "uploads").resolve())
@@ -0,0 +1,128 @@
+import threading
+import time
+
+import pytest
+
+from personal_chatbot.src.batch_queue import (
+    BACKGROUND,
+    INTERACTIVE,
+    BatchQueue,
+    DelayHistogram,
+    PriorityClient,
+    per_item,
+)
+from personal_chatbot.src.chat_ui import respond_once
+from personal_chatbot.src.memory_manager import InMemoryStore
+
+
+def test_background_jobs_are_coalesced_into_batches():
+    seen = []
+
+    def handler(items):
+        seen.append(list(items))
+        return [item * 2 for item in items]
+
+    with BatchQueue(max_workers=2, max_batch_size=4, max_wait=0.05) as queue:
+        futures = [queue.submit(handler, i) for i in range(10)]
+        assert [f.result(timeout=2) for f in futures] == [i * 2 for i in range(10)]
+    assert sorted(x for batch in seen for x in batch) == list(range(10))
+    assert all(len(batch) <= 4 for batch in seen)
+    assert queue.stats.batches < 10
+    assert queue.stats.completed == 10
+
+
+def test_partial_batch_is_flushed_after_max_wait():
+    with BatchQueue(max_workers=2, max_batch_size=100, max_wait=0.02) as queue:
+        t0 = time.monotonic()
+        assert queue.submit(per_item(str.upper), "a").result(timeout=2) == "A"
+        assert time.monotonic() - t0 >= 0.015
+
+
+def test_handler_errors_propagate_to_every_future_in_the_batch():
+    def boom(items):
+        raise RuntimeError("provider down")
+
+    with BatchQueue(max_workers=2, max_batch_size=2, max_wait=1.0) as queue:
+        futures = [queue.submit(boom, i) for i in range(2)]
+        for future in futures:
+            with pytest.raises(RuntimeError, match="provider down"):
+                future.result(timeout=2)
+    assert queue.stats.failed == 2
+
+
+def test_result_count_mismatch_is_an_error():
+    with BatchQueue(max_workers=2, max_batch_size=1) as queue:
+        with pytest.raises(ValueError):
+            queue.submit(lambda items: [], "x").result(timeout=2)
+
+
+def test_interactive_job_preempts_saturated_batch_work():
+    release = threading.Event()
+    started = threading.Event()
+
+    def slow_batch(items):
+        started.set()
+        release.wait(5)
+        return items
+
+    queue = BatchQueue(max_workers=2, max_batch_size=1, max_wait=0.0, interactive_reserve=1)
+    try:
+        background = [queue.submit(slow_batch, i) for i in range(3)]
+        assert started.wait(2)
+        # The only batch slot is blocked, yet interactive work runs immediately.
+        assert queue.submit(per_item(lambda x: x + 1), 1, priority=INTERACTIVE).result(timeout=1) == 2
+        assert not any(f.done() for f in background)
+        release.set()
+        assert [f.result(timeout=2) for f in background] == [0, 1, 2]
+    finally:
+        release.set()
+        queue.close()
+    assert queue.stats.delay_percentile(INTERACTIVE, 0.5) < queue.stats.delay_percentile(BACKGROUND, 0.99)
+
+
+def test_close_flushes_pending_and_rejects_new_work():
+    queue = BatchQueue(max_workers=2, max_batch_size=100, max_wait=60.0)
+    future = queue.submit(per_item(len), "abc")
+    queue.close()
+    assert future.result(timeout=0) == 3
+    with pytest.raises(RuntimeError):
+        queue.submit(per_item(len), "x")
+
+
+def test_invalid_configuration():
+    with pytest.raises(ValueError):
+        BatchQueue(max_workers=1, interactive_reserve=1)
+
+
+class _EchoClient:
+    def __init__(self):
+        self.calls = []
+
+    def chat_complete(self, messages, *, model=None):
+        self.calls.append(messages)
+        return {"choices": [{"message": {"role": "assistant", "content": "reply:" + messages[-1]["content"]}}]}
+
+
+def test_priority_client_drives_respond_once_and_background_titles():
+    inner = _EchoClient()
+    with BatchQueue(max_workers=2, max_batch_size=8, max_wait=0.01) as queue:
+        client = PriorityClient(inner, queue)
+        store = InMemoryStore()
+        assert respond_once("hi", "u1", store, client) == "reply:hi"
+        title = client.chat_complete_later([{"role": "user", "content": "title please"}])
+        assert title.result(timeout=2)["choices"][0]["message"]["content"] == "reply:title please"
+    assert len(inner.calls) == 2
+
+
+def test_delay_histogram_is_bounded_and_close_to_exact():
+    histogram = DelayHistogram()
+    delays = [i / 1000.0 for i in range(1, 100_001)]  # 1 ms .. 100 s
+    for delay in delays:
+        histogram.add(delay)
+    assert histogram.total == len(delays) and len(histogram.counts) == DelayHistogram.BUCKETS
+    for q in (0.5, 0.95, 0.99):
+        exact = delays[int(q * len(delays))]
+        assert exact <= histogram.percentile(q) < exact * 1.1
+    histogram.add(1e9)
+    assert histogram.percentile(1.0) < 1e3
+    assert DelayHistogram().percentile(0.5) == 0.0
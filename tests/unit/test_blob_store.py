@@ -0,0 +1,105 @@
+import hashlib
+import io
+from datetime import datetime, timezone
+
+import pytest
+
+from personal_chatbot.src.blob_store import BlobStore
+from personal_chatbot.src.file_handler import UploadError, UploadTooLarge
+
+NOW = datetime(2025, 3, 9, tzinfo=timezone.utc)
+
+
+def test_identical_uploads_share_one_blob(tmp_path):
+    store = BlobStore(tmp_path / "uploads")
+    data = b"%PDF-1.4 same bytes" * 100
+    first = store.put(io.BytesIO(data), "report.pdf", "c1", now=NOW)
+    second = store.put(io.BytesIO(data), "copy.pdf", "c2", now=NOW)
+
+    sha = hashlib.sha256(data).hexdigest()
+    assert first["sha256"] == second["sha256"] == sha
+    assert first["path"] == "uploads/c1/2025-03/report.pdf" and not first["deduplicated"]
+    assert second["path"] == "uploads/c2/2025-03/copy.pdf" and second["deduplicated"]
+    assert store.refcount(sha) == 2
+    a, b = tmp_path / first["path"], tmp_path / second["path"]
+    assert a.read_bytes() == data and a.stat().st_ino == b.stat().st_ino == store.blob_path(sha).stat().st_ino
+    assert store.stats.bytes_written == len(data) and store.stats.bytes_saved == len(data)
+    assert [p.name for p in (tmp_path / "uploads" / "blobs").rglob("*") if p.is_file()] == [sha]
+
+
+def test_attach_is_metadata_only(tmp_path):
+    store = BlobStore(tmp_path)
+    saved = store.put([b"hello"], "a.txt", "c1", now=NOW)
+    attached = store.attach(saved["sha256"], "b.txt", "c2", now=NOW)
+    assert attached["size"] == 5 and attached["deduplicated"]
+    assert store.refcount(saved["sha256"]) == 2
+    with pytest.raises(KeyError):
+        store.attach("0" * 64, "c.txt", "c2")
+
+
+def test_same_name_and_bytes_in_a_conversation_is_idempotent(tmp_path):
+    store = BlobStore(tmp_path)
+    first = store.put([b"x"], "a.txt", "c1", now=NOW)
+    again = store.put([b"x"], "a.txt", "c1", now=NOW)
+    other = store.put([b"y"], "a.txt", "c1", now=NOW)
+    assert again["path"] == first["path"]
+    assert other["filename"] == "a-1.txt"
+    assert store.refcount(first["sha256"]) == 1
+
+
+def test_release_frees_blob_with_last_reference(tmp_path):
+    store = BlobStore(tmp_path / "uploads")
+    first = store.put([b"shared"], "a.txt", "c1", now=NOW)
+    second = store.put([b"shared"], "a.txt", "c2", now=NOW)
+    sha = first["sha256"]
+
+    assert store.release(first) is False
+    assert store.refcount(sha) == 1 and not (tmp_path / first["path"]).exists()
+    assert store.release(first) is False  # already released
+    assert store.release(second) is True
+    assert not store.has(sha)
+
+
+def test_release_conversation_and_garbage_collection(tmp_path):
+    store = BlobStore(tmp_path)
+    store.put([b"one"], "a.txt", "c1", now=NOW)
+    store.put([b"two"], "b.txt", "c1", now=NOW)
+    kept = store.put([b"two"], "b.txt", "c2", now=NOW)
+    assert store.release_conversation("c1") == 1
+    assert store.refcount(kept["sha256"]) == 1
+
+    orphan = hashlib.sha256(b"orphan").hexdigest()
+    store.blob_path(orphan).parent.mkdir(parents=True, exist_ok=True)
+    store.blob_path(orphan).write_bytes(b"orphan")
+    assert store.collect_garbage() == 1
+    assert store.has(kept["sha256"])
+
+
+def test_rejected_uploads_leave_nothing_behind(tmp_path):
+    store = BlobStore(tmp_path, max_bytes=10)
+    with pytest.raises(UploadTooLarge):
+        store.put([b"x" * 6, b"x" * 6], "a.txt", "c1")
+    with pytest.raises(UploadError):
+        store.put([b"x"], "a.txt", "blobs")
+    assert [p for p in tmp_path.rglob("*") if p.is_file()] == []
+
+
+def test_known_hash_is_verified_without_writing(tmp_path, monkeypatch):
+    from personal_chatbot.src import blob_store
+
+    store = BlobStore(tmp_path)
+    data = b"known bytes" * 1000
+    sha = hashlib.sha256(data).hexdigest()
+    store.put(io.BytesIO(data), "a.txt", "c1", now=NOW)
+
+    def no_spooling(*args, **kwargs):
+        raise AssertionError("known bytes were written to a temp file")
+
+    monkeypatch.setattr(blob_store, "stream_to_temp", no_spooling)
+    again = store.put(io.BytesIO(data), "b.txt", "c2", sha256=sha, now=NOW)
+    assert again["deduplicated"] and again["sha256"] == sha and store.refcount(sha) == 2
+    with pytest.raises(UploadError):
+        store.put(io.BytesIO(b"other bytes"), "c.txt", "c2", sha256=sha, now=NOW)
+    assert store.refcount(sha) == 2
+    assert [p.name for p in (tmp_path / "blobs").iterdir() if p.is_file()] == []  # pins removed
+    assert store.stats.uploads == 2 and store.stats.bytes_written == len(data) == store.stats.bytes_saved
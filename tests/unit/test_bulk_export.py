@@ -0,0 +1,183 @@
+import json
+import os
+import zipfile
+from datetime import datetime, timezone
+
+import pytest
+
+from personal_chatbot.src import bulk_export
+from personal_chatbot.src.bulk_export import export_all, load_manifest
+from personal_chatbot.src.exporter import ConversationInfo, iter_records, render_markdown
+from personal_chatbot.src.memory_manager import InMemoryStore, MemoryRecord
+
+NOW = datetime(2025, 3, 9, 14, 30, 5, tzinfo=timezone.utc)
+
+
+def _store(conversations=5, messages=30):
+    store = InMemoryStore()
+    for c in range(conversations):
+        for i in range(messages):
+            role = "user" if i % 2 == 0 else "assistant"
+            store.create(MemoryRecord(f"c{c}-r{i:04d}", f"c{c}", f"message {i} of c{c} " * 20, {"role": role}))
+    return store
+
+
+def _infos(n=5):
+    return [ConversationInfo(f"c{c}", title=f"Chat {c}") for c in range(n)]
+
+
+def _markdown(store, info):
+    return "".join(render_markdown(info, iter_records(store, info.conversation_id)))
+
+
+class FailingStore:
+    """Delegates to a store but fails listing one conversation."""
+
+    def __init__(self, store, fail_on):
+        self._store = store
+        self.fail_on = fail_on
+
+    def list_by_user(self, user_id, limit=50, cursor=None):
+        if user_id == self.fail_on:
+            raise RuntimeError("store unavailable")
+        return self._store.list_by_user(user_id, limit, cursor=cursor)
+
+
+def test_exports_every_conversation_into_one_zip(tmp_path):
+    store = _store()
+    result = export_all(store, _infos(), exports_dir=tmp_path, workers=3, now=NOW, block_size=512, queue_blocks=2)
+
+    assert result.archive == tmp_path / "conversations-20250309_143005.zip"
+    assert (result.exported, result.skipped, result.messages) == (5, 0, 150)
+    assert result.archive_bytes == result.archive.stat().st_size
+    with zipfile.ZipFile(result.archive) as zf:
+        assert zf.testzip() is None
+        assert zf.namelist() == [f"c{c}/Chat-{c}-20250309_143005.md" for c in range(5)]
+        for info in _infos():
+            name = f"{info.conversation_id}/Chat-{info.conversation_id[1:]}-20250309_143005.md"
+            assert zf.read(name).decode("utf-8") == _markdown(store, info)
+    assert sorted(load_manifest(tmp_path)) == [f"c{c}" for c in range(5)]
+    assert not (tmp_path / bulk_export.PART_FILE).exists()
+    assert not (tmp_path / bulk_export.JOURNAL_FILE).exists()
+
+
+def test_unchanged_conversations_are_skipped(tmp_path):
+    store = _store()
+    export_all(store, _infos(), exports_dir=tmp_path, now=NOW)
+
+    again = export_all(store, _infos(), exports_dir=tmp_path, now=NOW)
+    assert again.archive is None
+    assert (again.exported, again.skipped) == (0, 5)
+
+    store.create(MemoryRecord("c3-r9999", "c3", "new message", {"role": "user"}))
+    later = datetime(2025, 3, 10, tzinfo=timezone.utc)
+    changed = export_all(store, _infos(), exports_dir=tmp_path, now=later)
+    assert (changed.exported, changed.skipped) == (1, 4)
+    with zipfile.ZipFile(changed.archive) as zf:
+        assert zf.testzip() is None
+        assert zf.namelist() == ["c3/Chat-3-20250310_000000.md"]
+        assert zf.read("c3/Chat-3-20250310_000000.md").decode("utf-8").endswith("new message\n  ```\n")
+
+    forced = export_all(store, _infos(), exports_dir=tmp_path, now=later, force=True)
+    assert forced.exported == 5 and forced.archive.name == "conversations-20250310_000000-1.zip"
+
+
+class CountingStore:
+    """Change-tracking store wrapper that counts listing calls per conversation."""
+
+    def __init__(self, store):
+        self._store = store
+        self.listed = []
+
+    def list_by_user(self, user_id, limit=50, cursor=None):
+        self.listed.append(user_id)
+        return self._store.list_by_user(user_id, limit, cursor=cursor)
+
+    def last_change(self, user_id):
+        return self._store.last_change(user_id)
+
+    def changes_since(self, user_id, after=0, limit=1000):
+        return self._store.changes_since(user_id, after, limit)
+
+
+def test_unchanged_conversations_are_not_rendered_again(tmp_path):
+    store = CountingStore(_store())
+    export_all(store, _infos(), exports_dir=tmp_path, now=NOW)
+    store.listed.clear()
+
+    again = export_all(store, _infos(), exports_dir=tmp_path, now=NOW)
+    assert (again.archive, again.skipped, store.listed) == (None, 5, [])
+
+    store._store.delete("c1-r0003")
+    renamed = [ConversationInfo(info.conversation_id, title="Renamed") if info.conversation_id == "c4" else info
+               for info in _infos()]
+    changed = export_all(store, renamed, exports_dir=tmp_path, now=NOW)
+    assert (changed.exported, changed.skipped) == (2, 3)
+    assert sorted(set(store.listed)) == ["c1", "c4"]
+
+
+def test_stores_without_a_change_log_are_hashed_without_writing(tmp_path):
+    store = _store()
+    plain = FailingStore(store, fail_on=None)  # list_by_user only
+    export_all(plain, _infos(), exports_dir=tmp_path, now=NOW)
+    again = export_all(plain, _infos(), exports_dir=tmp_path, now=NOW, block_size=1)
+    assert (again.archive, again.exported, again.skipped) == (None, 0, 5)
+    assert again.messages == 150  # rendered to compare hashes, never compressed
+    assert sorted(os.listdir(tmp_path)) == [bulk_export.MANIFEST_FILE, "conversations-20250309_143005.zip"]
+
+
+def test_interrupted_export_resumes_without_redoing_finished_entries(tmp_path):
+    store = _store()
+    failing = FailingStore(store, fail_on="c3")
+    with pytest.raises(RuntimeError, match="unavailable"):
+        export_all(failing, _infos(), exports_dir=tmp_path, workers=2, now=NOW, sync_every=1)
+    assert (tmp_path / bulk_export.PART_FILE).exists()
+    journal = (tmp_path / bulk_export.JOURNAL_FILE).read_text().splitlines()
+    assert [json.loads(line)["id"] for line in journal[1:]] == ["c0", "c1", "c2"]
+    assert load_manifest(tmp_path) == {}
+
+    failing.fail_on = "c0"  # finished entries are not rendered again
+    later = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    result = export_all(failing, _infos(), exports_dir=tmp_path, workers=2, now=later)
+
+    assert (result.resumed, result.exported) == (3, 2)
+    assert result.archive.name == "conversations-20250309_143005.zip"  # the interrupted run's stamp
+    with zipfile.ZipFile(result.archive) as zf:
+        assert zf.testzip() is None
+        assert [name.split("/")[0] for name in zf.namelist()] == ["c0", "c1", "c2", "c3", "c4"]
+        assert zf.read(zf.namelist()[0]).decode("utf-8") == _markdown(store, _infos()[0])
+    assert sorted(load_manifest(tmp_path)) == [f"c{c}" for c in range(5)]
+
+
+def test_resume_drops_journaled_entries_missing_from_the_archive(tmp_path):
+    store = _store()
+    with pytest.raises(RuntimeError):
+        export_all(FailingStore(store, "c4"), _infos(), exports_dir=tmp_path, now=NOW, sync_every=1)
+    part = tmp_path / bulk_export.PART_FILE
+    journal = (tmp_path / bulk_export.JOURNAL_FILE).read_text().splitlines()
+    cut = json.loads(journal[3])["entry"]["offset"] + 10  # c2's local header is torn
+    with open(part, "r+b") as fh:
+        fh.truncate(cut)
+    with open(tmp_path / bulk_export.JOURNAL_FILE, "a") as fh:
+        fh.write('{"id": "c3", "sha')  # torn final line
+
+    result = export_all(store, _infos(), exports_dir=tmp_path, now=NOW)
+    assert (result.resumed, result.exported) == (2, 3)
+    with zipfile.ZipFile(result.archive) as zf:
+        assert zf.testzip() is None
+        assert len(zf.namelist()) == 5
+
+
+def test_stale_part_without_journal_starts_over(tmp_path):
+    (tmp_path / bulk_export.PART_FILE).write_bytes(b"garbage")
+    result = export_all(_store(2), _infos(2), exports_dir=tmp_path, now=NOW)
+    assert result.resumed == 0 and result.exported == 2
+    assert sorted(os.listdir(tmp_path)) == [bulk_export.MANIFEST_FILE, result.archive.name]
+
+
+def test_duplicate_ids_are_exported_once_and_workers_validated(tmp_path):
+    store = _store(2)
+    result = export_all(store, _infos(2) + _infos(2), exports_dir=tmp_path, now=NOW)
+    assert result.exported == 2
+    with pytest.raises(ValueError):
+        export_all(store, _infos(2), exports_dir=tmp_path, workers=0)
@@ -1,3 +1,5 @@
+import gc
+
 import pytest
 
 from personal_chatbot.src.memory_manager import InMemoryStore, MemoryRecord
@@ -50,4 +52,149 @@ def test_minimal_orchestration_function_contract():
     payload = call["json"]
     assert "messages" in payload and isinstance(payload["messages"], list)
     assert payload["messages"][0]["role"] == "user"
-    assert payload["messages"][0]["content"] == user_text
\ No newline at end of file
+    assert payload["messages"][0]["content"] == user_text
+
+class _FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class _StreamingClient:
+    """Client stub whose chat_stream advances a fake clock per delta."""
+
+    def __init__(self, deltas, clock: _FakeClock, step: float = 0.02):
+        self._deltas = deltas
+        self._clock = clock
+        self._step = step
+        self.calls = []
+        self.closed = False
+
+    def chat_stream(self, messages):
+        self.calls.append(messages)
+        return self._gen()
+
+    def _gen(self):
+        try:
+            for d in self._deltas:
+                self._clock.now += self._step
+                yield d
+        finally:
+            self.closed = True
+
+
+def test_respond_stream_coalesces_by_time_and_size_and_persists_once():
+    memory = InMemoryStore()
+    clock = _FakeClock()
+    deltas = ["a"] * 8 + ["x" * 40]
+    client = _StreamingClient(deltas, clock, step=0.03125)
+
+    stream = ui.respond_stream("Hi", "u1", memory, client, flush_interval=0.125, max_buffer_chars=32, clock=clock)
+    chunks = list(stream)
+
+    # Time-based flushes every 4 deltas, then a size-triggered flush
+    assert chunks == ["aaaa", "aaaa", "x" * 40]
+    assert stream.text == "".join(deltas)
+    assert stream.stats.tokens == 9
+    assert stream.stats.flushes == 3
+    assert stream.stats.flush_intervals == pytest.approx([0.125, 0.125, 0.03125])
+    assert client.calls[0] == [{"role": "user", "content": "Hi"}]
+
+    stored = [r.content for r in memory.list_by_user("u1")]
+    assert stored == ["Hi", "".join(deltas)]
+
+
+def test_respond_stream_cancel_persists_partial_reply_once():
+    memory = InMemoryStore()
+    clock = _FakeClock()
+    client = _StreamingClient([str(i) for i in range(100)], clock, step=0.0625)
+
+    stream = ui.respond_stream("Hi", "u1", memory, client, flush_interval=0.125, clock=clock)
+    first = next(stream)
+    stream.cancel()
+    rest = list(stream)
+
+    # Cancellation takes effect before the next delta is buffered
+    assert first == "01"
+    assert rest == []
+    assert stream.cancelled is True
+    assert client.closed is True
+    assistant = memory.list_by_user("u1")[-1]
+    assert assistant.content == "01"
+    assert assistant.metadata == {"role": "assistant", "cancelled": True}
+
+
+def test_respond_stream_consumer_close_and_model_failure():
+    memory = InMemoryStore()
+    clock = _FakeClock()
+    stream = ui.respond_stream("Hi", "u1", memory, _StreamingClient(list("abcdef"), clock, step=0.0625),
+                               flush_interval=0.125, clock=clock)
+    assert next(stream) == "ab"
+    stream.close()
+    assert memory.list_by_user("u1")[-1].content == "ab"
+
+    class _Broken:
+        def chat_stream(self, messages):
+            yield "partial"
+            raise RuntimeError("upstream reset")
+
+    other = InMemoryStore()
+    with pytest.raises(RuntimeError):
+        list(ui.respond_stream("Hi", "u2", other, _Broken(), clock=clock))
+    assert [r.content for r in other.list_by_user("u2")] == ["Hi"]
+
+
+def test_respond_stream_closed_or_dropped_before_iterating():
+    class _Upstream:
+        """Stands in for an open HTTP stream."""
+
+        def __init__(self):
+            self.closed = False
+
+        def __iter__(self):
+            return iter(["never", "read"])
+
+        def close(self):
+            self.closed = True
+
+    class _Client:
+        def __init__(self):
+            self.upstream = _Upstream()
+
+        def chat_stream(self, messages):
+            return self.upstream
+
+    memory = InMemoryStore()
+    client = _Client()
+    stream = ui.respond_stream("Hi", "u1", memory, client)
+    stream.close()
+    stream.close()
+    assert list(stream) == []
+    assert client.upstream.closed is True
+    assert stream.cancelled is True
+    assert [(r.content, r.metadata) for r in memory.list_by_user("u1")] == [
+        ("Hi", {"role": "user"}),
+        ("", {"role": "assistant", "cancelled": True}),
+    ]
+
+    dropped = _Client()
+    ui.respond_stream("Hi", "u2", memory, dropped)  # never iterated nor closed
+    gc.collect()
+    assert dropped.upstream.closed is True
+    assert [r.content for r in memory.list_by_user("u2")] == ["Hi", ""]
+
+
+def test_respond_once_supports_multiple_turns_with_time_ordered_ids():
+    memory = InMemoryStore()
+    cfg = OpenRouterConfig(base_url="https://openrouter.ai/api/v1", model="test-model")
+    client = OpenRouterClient(config=cfg, transport=_LocalMockTransport(content="reply"))
+
+    for i in range(3):
+        assert ui.respond_once(user_text=f"turn {i}", user_id="u1", memory_store=memory, client=client) == "reply"
+
+    history = memory.list_by_user("u1")
+    assert [r.content for r in history] == ["turn 0", "reply", "turn 1", "reply", "turn 2", "reply"]
+    # IDs alone reproduce chronological order
+    assert sorted(history, key=lambda r: r.id) == history
@@ -0,0 +1,119 @@
+import pytest
+
+from personal_chatbot.src.context_builder import ContextBuilder, estimate_tokens
+from personal_chatbot.src.memory_manager import InMemoryStore, MemoryRecord
+from personal_chatbot.src.openrouter_client import OpenRouterClient, OpenRouterConfig
+from personal_chatbot.src import chat_ui as ui
+
+
+class _CountingStore(InMemoryStore):
+    """InMemoryStore that records how many records each list call returned."""
+
+    def __init__(self):
+        super().__init__()
+        self.fetched = 0
+
+    def list_by_user(self, user_id, limit=50, **kw):
+        page = super().list_by_user(user_id, limit, **kw)
+        self.fetched += len(page)
+        return page
+
+
+def _add(store, i, role="user", content=None, user_id="u1"):
+    store.create(MemoryRecord(id=f"m{i}", user_id=user_id, content=content or f"message {i}", metadata={"role": role}))
+
+
+def _one_token(text):
+    return 1
+
+
+def test_build_returns_recent_turns_within_budget_in_order():
+    store = InMemoryStore()
+    for i in range(10):
+        _add(store, i, role="user" if i % 2 == 0 else "assistant")
+
+    builder = ContextBuilder(store, max_tokens=4, counter=_one_token, page_size=3)
+    messages = builder.build("u1")
+
+    assert [m["content"] for m in messages] == ["message 6", "message 7", "message 8", "message 9"]
+    assert [m["role"] for m in messages] == ["user", "assistant", "user", "assistant"]
+    assert builder.token_count("u1") == 4
+
+
+def test_incremental_build_only_fetches_new_records():
+    store = _CountingStore()
+    for i in range(200):
+        _add(store, i)
+    builder = ContextBuilder(store, max_tokens=20, counter=_one_token)
+    builder.build("u1")
+    initial = store.fetched
+    assert initial <= 50  # one page, not the whole history
+
+    store.fetched = 0
+    _add(store, 200)
+    _add(store, 201)
+    messages = builder.build("u1")
+    assert store.fetched == 2
+    assert len(messages) == 20
+    assert messages[-1]["content"] == "message 201"
+    assert messages[0]["content"] == "message 182"
+
+
+def test_summarizer_folds_dropped_turns_deterministically():
+    def summarize(dropped, previous):
+        count = len(dropped) + (int(previous.split()[0]) if previous else 0)
+        return f"{count} earlier messages"
+
+    store = InMemoryStore()
+    builder = ContextBuilder(store, max_tokens=4, counter=_one_token, summarizer=summarize)
+    _add(store, 0)
+    builder.build("u1")
+    for i in range(1, 6):
+        _add(store, i)
+        messages = builder.build("u1")
+
+    assert messages[0] == {"role": "system", "content": "3 earlier messages"}
+    assert [m["content"] for m in messages[1:]] == ["message 3", "message 4", "message 5"]
+    assert builder.token_count("u1") == 4
+
+
+def test_latest_turn_always_included_and_deleted_cursor_rebuilds():
+    store = InMemoryStore()
+    _add(store, 0, content="x" * 400)
+    builder = ContextBuilder(store, max_tokens=10)
+    assert [m["content"] for m in builder.build("u1")] == ["x" * 400]
+
+    _add(store, 1, content="short")
+    store.delete("m1")
+    _add(store, 2, content="after delete")
+    assert builder.build("u1")[-1]["content"] == "after delete"
+
+    with pytest.raises(ValueError):
+        ContextBuilder(store, max_tokens=0)
+    assert estimate_tokens("abcd") == 5
+
+
+def test_respond_once_sends_history_from_context_builder():
+    class _Transport:
+        def __init__(self):
+            self.calls = []
+
+        def post(self, path, json, timeout):
+            self.calls.append(json)
+            return {"choices": [{"message": {"role": "assistant", "content": "reply"}}]}
+
+    store = InMemoryStore()
+    _add(store, 0, content="earlier question")
+    _add(store, 1, role="assistant", content="earlier answer")
+    transport = _Transport()
+    client = OpenRouterClient(OpenRouterConfig(base_url="https://openrouter.ai/api/v1", model="m"), transport=transport)
+
+    ui.respond_once("Hi", "u1", store, client, context=ContextBuilder(store))
+
+    sent = transport.calls[0]["messages"]
+    assert sent == [
+        {"role": "user", "content": "earlier question"},
+        {"role": "assistant", "content": "earlier answer"},
+        {"role": "user", "content": "Hi"},
+    ]
+    assert store.list_by_user("u1")[-1].metadata == {"role": "assistant"}
@@ -0,0 +1,143 @@
+import os
+from datetime import datetime, timezone
+
+import pytest
+
+from personal_chatbot.src import exporter
+from personal_chatbot.src import file_handler as fh
+from personal_chatbot.src.exporter import ConversationInfo, export_conversation, export_incremental, render_entry
+from personal_chatbot.src.memory_manager import InMemoryStore, MemoryRecord, SqliteStore
+
+NOW = datetime(2025, 3, 9, 14, 30, 5, tzinfo=timezone.utc)
+
+
+def _record(i, role, content, **metadata):
+    return MemoryRecord(id=f"r{i}", user_id="c1", content=content, metadata={"role": role, **metadata})
+
+
+def test_export_matches_documented_format(tmp_path):
+    store = InMemoryStore()
+    store.create(_record(1, "user", "hello\nthere", created_at="2025-03-09T10:00:00+00:00"))
+    store.create(_record(2, "assistant", "hi", created_at=1741514460, file_paths=["uploads/c1/2025-03/a.pdf"]))
+    info = ConversationInfo("c1", title='My "chat"', created_at="2025-03-09", updated_at="2025-03-10", model="m")
+
+    result = export_conversation(store, info, exports_dir=tmp_path, now=NOW, page_size=1)
+
+    assert result.path == tmp_path / "My-chat-20250309_143005.md"
+    assert result.messages == 2
+    text = result.path.read_text(encoding="utf-8")
+    assert text == (
+        "---\n"
+        'title: "My \\"chat\\""\n'
+        'created_at: "2025-03-09"\n'
+        'updated_at: "2025-03-10"\n'
+        'model: "m"\n'
+        "---\n\n"
+        "## Transcript\n\n"
+        "- [2025-03-09 10:00] user:\n  ```\n  hello\n  there\n  ```\n"
+        "- [2025-03-09 10:01] assistant:\n  ```\n  hi\n  ```\n"
+        "\n## Referenced Files\n- a.pdf — uploads/c1/2025-03/a.pdf\n"
+    )
+    assert result.bytes_written == len(text.encode("utf-8"))
+    assert os.listdir(tmp_path) == [result.path.name]
+
+
+def test_fence_outgrows_backticks_in_content_and_uuid7_timestamps():
+    from personal_chatbot.src.ids import new_id
+
+    entry = render_entry(MemoryRecord(new_id(), "c1", "```py\nx\n```", {"role": "assistant"}))
+    assert entry.splitlines()[1] == "  ````"
+    assert entry.startswith(f"- [{datetime.now(timezone.utc):%Y-%m-%d}")
+    assert render_entry(_record(1, "user", "x")).startswith("- user:\n")
+
+
+def test_export_defaults_to_exports_dir_and_never_overwrites(tmp_path, monkeypatch):
+    monkeypatch.setattr(fh, "EXPORTS_DIR", tmp_path / "exports")
+    store = SqliteStore()
+    store.create(_record(1, "user", "x"))
+    info = ConversationInfo("c1")
+    first = export_conversation(store, info, now=NOW)
+    second = export_conversation(store, info, now=NOW)
+    assert first.path.name == "c1-20250309_143005.md"
+    assert second.path.name == "c1-20250309_143005-1.md"
+    assert first.path.parent == tmp_path / "exports"
+
+
+def test_failed_render_leaves_no_partial_file(tmp_path, monkeypatch):
+    def broken(records, *args, **kwargs):
+        yield "---\n"
+        raise RuntimeError("store went away")
+
+    monkeypatch.setattr(exporter, "render_markdown", lambda info, records, **kw: broken(records))
+    with pytest.raises(RuntimeError):
+        export_conversation(InMemoryStore(), ConversationInfo("c1"), exports_dir=tmp_path, now=NOW)
+    assert os.listdir(tmp_path) == []
+
+
+def _full_text(store, info):
+    return "".join(exporter.render_markdown(info, exporter.iter_records(store, info.conversation_id)))
+
+
+@pytest.mark.parametrize("store_type", [InMemoryStore, SqliteStore], ids=["memory", "sqlite"])
+def test_incremental_export_appends_only_new_messages(tmp_path, store_type):
+    store = store_type()
+    for i in range(3):
+        store.create(_record(i, "user", f"m{i}"))
+    info = ConversationInfo("c1", title="chat", updated_at="2025-03-09T10:00:00")
+
+    first = export_incremental(store, info, exports_dir=tmp_path, now=NOW)
+    assert (first.incremental, first.messages) == (False, 3)
+    assert first.path.read_text(encoding="utf-8") == _full_text(store, info)
+
+    store.create(_record(3, "assistant", "new", file_paths=["uploads/c1/2025-03/b.txt"]))
+    info = ConversationInfo("c1", title="chat", updated_at="2025-03-09T11:00:00")  # same length: patched
+    second = export_incremental(store, info, exports_dir=tmp_path, now=NOW)
+    assert (second.incremental, second.messages, second.path) == (True, 1, first.path)
+    assert second.path.read_text(encoding="utf-8") == _full_text(store, info)
+    assert second.files == [("b.txt", "uploads/c1/2025-03/b.txt")]
+
+    unchanged = export_incremental(store, info, exports_dir=tmp_path, now=NOW)
+    assert (unchanged.incremental, unchanged.messages, unchanged.bytes_written) == (True, 0, 0)
+    assert sorted(os.listdir(tmp_path)) == sorted([first.path.name, exporter.CHECKPOINTS_DIR])
+
+
+def test_incremental_export_rerenders_after_delete_edit_or_title_change(tmp_path):
+    store = InMemoryStore()
+    for i in range(4):
+        store.create(_record(i, "user", f"m{i}"))
+    info = ConversationInfo("c1", title="chat")
+    path = export_incremental(store, info, exports_dir=tmp_path, now=NOW).path
+
+    store.delete("r1")
+    after_delete = export_incremental(store, info, exports_dir=tmp_path, now=NOW)
+    assert (after_delete.incremental, after_delete.messages, after_delete.path) == (False, 3, path)
+    assert path.read_text(encoding="utf-8") == _full_text(store, info)
+
+    renamed = ConversationInfo("c1", title="a much longer title")
+    after_rename = export_incremental(store, renamed, exports_dir=tmp_path, now=NOW)
+    assert after_rename.incremental is False and after_rename.path == path
+    assert path.read_text(encoding="utf-8") == _full_text(store, renamed)
+
+    with open(path, "a", encoding="utf-8") as fh:
+        fh.write("hand edit\n")
+    store.create(_record(9, "user", "later"))
+    after_edit = export_incremental(store, renamed, exports_dir=tmp_path, now=NOW)
+    assert after_edit.incremental is False
+    assert path.read_text(encoding="utf-8") == _full_text(store, renamed)
+
+
+def test_incremental_export_skips_records_already_in_the_checkpointed_file(tmp_path):
+    store = InMemoryStore()
+    for i in range(3):
+        store.create(_record(i, "user", f"m{i}"))
+    info = ConversationInfo("c1")
+    export_incremental(store, info, exports_dir=tmp_path, now=NOW)
+    checkpoint = exporter.load_checkpoint(tmp_path, "c1")
+    assert checkpoint.last_id == "r2"
+    checkpoint.seq = 1  # as if r1 and r2 were created while the first render ran
+    exporter._save_checkpoint(tmp_path, checkpoint)
+
+    store.create(_record(3, "user", "m3"))
+    result = export_incremental(store, info, exports_dir=tmp_path, now=NOW)
+    assert (result.incremental, result.messages) == (True, 1)
+    assert result.path.read_text(encoding="utf-8") == _full_text(store, info)
@@ -0,0 +1,204 @@
+import time
+from concurrent.futures import CancelledError
+
+import pytest
+
+from personal_chatbot.src.extraction import (
+    ExtractionError,
+    ExtractionPool,
+    ExtractionTimeout,
+    extract_content,
+)
+
+
+def test_text_extraction_shape_and_decoding_fallback(tmp_path):
+    utf8 = tmp_path / "notes.md"
+    utf8.write_text("# Title\nbody é\n", encoding="utf-8")
+    latin = tmp_path / "legacy.txt"
+    latin.write_bytes("café olé".encode("latin-1"))
+
+    content = extract_content(utf8)
+    assert content == {
+        "text": "# Title\nbody é\n",
+        "meta": {"chars": 15, "lines": 3, "ext": ".md", "pages": None, "sheets": None, "dimensions": None},
+    }
+    assert "caf" in extract_content(latin)["text"]
+
+
+def test_unsupported_and_corrupt_files_raise(tmp_path):
+    with pytest.raises(ExtractionError):
+        extract_content(tmp_path / "a.exe")
+    pytest.importorskip("fitz")
+    bad = tmp_path / "bad.pdf"
+    bad.write_bytes(b"not a pdf")
+    with pytest.raises(ExtractionError):
+        extract_content(bad)
+
+
+def test_pdf_docx_xlsx_and_image_metadata(tmp_path):
+    fitz = pytest.importorskip("fitz")
+    docx = pytest.importorskip("docx")
+    openpyxl = pytest.importorskip("openpyxl")
+    Image = pytest.importorskip("PIL.Image")
+
+    pdf = fitz.open()
+    for i in range(3):
+        pdf.new_page().insert_text((72, 72), f"page {i}")
+    pdf.save(tmp_path / "a.pdf")
+    document = docx.Document()
+    document.add_paragraph("hello")
+    document.add_paragraph("world")
+    document.save(tmp_path / "a.docx")
+    workbook = openpyxl.Workbook()
+    workbook.active.append(["a", 1])
+    workbook.create_sheet("Second").append([None, "b"])
+    workbook.save(tmp_path / "a.xlsx")
+    Image.new("RGB", (32, 16)).save(tmp_path / "a.png")
+
+    pdf_content = extract_content(tmp_path / "a.pdf")
+    assert pdf_content["meta"]["pages"] == 3 and "page 2" in pdf_content["text"]
+    assert extract_content(tmp_path / "a.docx")["text"] == "hello\nworld"
+    xlsx = extract_content(tmp_path / "a.xlsx")
+    assert xlsx["meta"]["sheets"] == 2 and "a,1" in xlsx["text"] and ",b" in xlsx["text"]
+    assert extract_content(tmp_path / "a.png")["meta"]["dimensions"] == [32, 16]
+
+
+def _named_sleeper(path):
+    time.sleep(0.3 if path.name.startswith("block") else 0.01)
+    return path.name
+
+
+def _forever(path):
+    time.sleep(30)
+
+
+def _hog(path):
+    return len(bytearray(2 * 1024 ** 3))
+
+
+def _write(tmp_path, name, size):
+    path = tmp_path / name
+    path.write_bytes(b"x" * size)
+    return path
+
+
+def test_pool_runs_queued_small_files_first(tmp_path):
+    done = []
+    with ExtractionPool(1, extractor=_named_sleeper) as pool:
+        block = pool.submit(_write(tmp_path, "block.txt", 1))
+        while block.started_at is None:
+            time.sleep(0.005)
+        jobs = [
+            pool.submit(_write(tmp_path, "huge.pdf", 500_000)),
+            pool.submit(_write(tmp_path, "mid.txt", 5_000)),
+            pool.submit(_write(tmp_path, "tiny.txt", 10)),
+        ]
+        for job in jobs:
+            job.future.add_done_callback(lambda f: done.append(f.result()))
+        for job in jobs:
+            job.result(timeout=5)
+    assert done == ["tiny.txt", "mid.txt", "huge.pdf"]
+
+
+def test_pool_times_out_and_replaces_worker(tmp_path):
+    with ExtractionPool(1, timeout=0.3, extractor=_forever) as pool:
+        job = pool.submit(_write(tmp_path, "a.txt", 1))
+        with pytest.raises(ExtractionTimeout):
+            job.result(timeout=5)
+    assert pool.stats.timed_out == 1 and pool.stats.workers_restarted == 1
+
+    with ExtractionPool(1, timeout=5) as pool:
+        assert pool.submit(_write(tmp_path, "b.txt", 3)).result(timeout=5)["text"] == "xxx"
+
+
+def test_pool_cancels_running_and_queued_jobs(tmp_path):
+    with ExtractionPool(1, extractor=_forever) as pool:
+        running = pool.submit(_write(tmp_path, "a.txt", 1))
+        queued = pool.submit(_write(tmp_path, "b.txt", 2))
+        while running.started_at is None:
+            time.sleep(0.005)
+        assert queued.cancel() and running.cancel()
+        t0 = time.monotonic()
+        with pytest.raises(CancelledError):
+            running.result(timeout=5)
+        assert time.monotonic() - t0 < 2
+        with pytest.raises(CancelledError):
+            queued.result(timeout=0)
+        assert running.cancelled() and queued.cancelled() and running.done()
+    assert pool.stats.cancelled == 2
+    assert pool._ctx.get_start_method() != "fork"  # forking the pool's threads could deadlock workers
+
+
+def test_pool_enforces_memory_limit(tmp_path):
+    pytest.importorskip("resource")
+    with ExtractionPool(1, memory_limit_mb=512, extractor=_hog) as pool:
+        with pytest.raises(ExtractionError, match="Memory limit"):
+            pool.submit(_write(tmp_path, "a.txt", 1)).result(timeout=10)
+
+
+def _read_all(path, max_chars=None, max_tokens=None, **chunking):
+    from personal_chatbot.src.extraction import extract_partial
+
+    parts, offset, calls = [], None, 0
+    while True:
+        partial = extract_partial(path, offset=offset, max_chars=max_chars, max_tokens=max_tokens, **chunking)
+        parts.append(partial.content["text"])
+        calls += 1
+        if partial.complete:
+            return "".join(parts), calls
+        offset = partial.next_offset
+
+
+def test_partial_reads_resume_to_the_full_text(tmp_path):
+    text = tmp_path / "big.txt"
+    text.write_text("".join(f"línea {i} ✓\n" for i in range(2_000)), encoding="utf-8")
+    full = extract_content(text)["text"]
+    joined, calls = _read_all(text, max_chars=997, text_chunk_bytes=1000)  # chunk cuts split multibyte chars
+    assert joined == full and calls == len(full) // 997 + 1
+
+    from personal_chatbot.src.extraction import extract_partial
+
+    preview = extract_partial(text, max_chars=50)
+    assert preview.content["text"] == full[:50] and preview.content["meta"]["chars"] == 50
+    assert not preview.complete
+
+
+def test_partial_pdf_and_xlsx_resume_and_report_totals(tmp_path):
+    fitz = pytest.importorskip("fitz")
+    openpyxl = pytest.importorskip("openpyxl")
+    from personal_chatbot.src.extraction import ExtractionOffset, extract_partial, iter_chunks
+
+    pdf = fitz.open()
+    for i in range(12):
+        pdf.new_page().insert_text((72, 72), f"page {i} " + "word " * 40)
+    pdf.save(tmp_path / "a.pdf")
+    workbook = openpyxl.Workbook()
+    workbook.active.title = "first"
+    for i in range(30):
+        workbook.active.append([i, f"row{i}"])
+    workbook.create_sheet("second").append(["tail"])
+    workbook.save(tmp_path / "a.xlsx")
+
+    for name, chunking in (("a.pdf", {}), ("a.xlsx", {"rows_per_chunk": 7})):
+        full = extract_content(tmp_path / name)["text"]
+        for budget in (40, 250):
+            assert _read_all(tmp_path / name, max_chars=budget, **chunking)[0] == full
+
+    page0 = len(next(iter_chunks(tmp_path / "a.pdf")).text)
+    first_pages = extract_partial(tmp_path / "a.pdf", max_chars=page0 + 10)
+    assert first_pages.content["meta"]["pages"] == 12
+    assert first_pages.next_offset == ExtractionOffset(1, 0, 10)  # stopped inside the second page
+    sheet = extract_partial(tmp_path / "a.xlsx", offset=ExtractionOffset(1, 0, 0))
+    assert sheet.complete and sheet.content["text"] == "\n## Sheet: second\ntail"
+    assert sheet.content["meta"]["sheets"] == 2
+
+
+def test_partial_respects_token_budget(tmp_path):
+    from personal_chatbot.src.extraction import extract_partial
+
+    doc = tmp_path / "a.md"
+    doc.write_text("word " * 1000, encoding="utf-8")
+    words = lambda s: len(s.split())
+    partial = extract_partial(doc, max_tokens=100, count_tokens=words)
+    assert words(partial.content["text"]) == 100
+    assert _read_all(doc, max_tokens=64)[0] == extract_content(doc)["text"]
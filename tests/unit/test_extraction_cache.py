@@ -0,0 +1,98 @@
+import os
+
+import pytest
+
+from personal_chatbot.src import extraction
+from personal_chatbot.src.extraction import extract_content, make_content
+from personal_chatbot.src.extraction_cache import ExtractionCache, file_sha256
+
+
+class _CountingExtractor:
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, path):
+        self.calls += 1
+        return extract_content(path)
+
+
+def test_hit_skips_the_parser_and_reports_savings(tmp_path):
+    doc = tmp_path / "notes.txt"
+    doc.write_text("hello world\n" * 500, encoding="utf-8")
+    cache = ExtractionCache(tmp_path / "cache", preview_chars=20)
+    extractor = _CountingExtractor()
+
+    first = cache.get_or_extract(doc, extractor=extractor)
+    second = cache.get_or_extract(doc, extractor=extractor)
+    assert extractor.calls == 1
+    assert second == first
+    assert first["preview"] == "hello world\nhello wo…"
+    assert first["meta"]["chars"] == 6000
+    assert cache.stats.hits == 1 and cache.stats.misses == 1 and cache.stats.hit_rate == 0.5
+    assert cache.stats.source_bytes_saved == 6000
+    assert 0 < cache.stats.bytes_on_disk < 6000  # compressed
+
+
+def test_key_includes_options_and_extractor_version(tmp_path, monkeypatch):
+    cache = ExtractionCache(tmp_path)
+    content = make_content("text", ".txt")
+    cache.put("a" * 64, content, options={"ocr": False})
+    assert cache.get("a" * 64, {"ocr": False})["text"] == "text"
+    assert cache.get("a" * 64, {"ocr": True}) is None
+    monkeypatch.setattr("personal_chatbot.src.extraction_cache.EXTRACTOR_VERSION", extraction.EXTRACTOR_VERSION + 1)
+    assert cache.get("a" * 64, {"ocr": False}) is None
+
+
+def test_options_reach_the_extractor(tmp_path):
+    doc = tmp_path / "notes.txt"
+    doc.write_text("Hello", encoding="utf-8")
+    cache = ExtractionCache(tmp_path / "cache")
+    seen = []
+
+    def extractor(path, upper=False):
+        seen.append(upper)
+        text = path.read_text(encoding="utf-8")
+        return make_content(text.upper() if upper else text, ".txt")
+
+    assert cache.get_or_extract(doc, extractor=extractor)["text"] == "Hello"
+    assert cache.get_or_extract(doc, options={"upper": True}, extractor=extractor)["text"] == "HELLO"
+    assert cache.get_or_extract(doc, options={"upper": True}, extractor=extractor)["text"] == "HELLO"
+    assert seen == [False, True]
+    with pytest.raises(ValueError):
+        cache.get_or_extract(doc, options={"upper": True})  # extract_content takes no options
+    with pytest.raises(ValueError):
+        cache.get_or_extract(doc, options={"lower": True}, extractor=extractor)
+    assert seen == [False, True]
+
+
+def test_lru_by_bytes_survives_reopen(tmp_path):
+    text = os.urandom(3000).hex()  # incompressible enough to size entries predictably
+    cache = ExtractionCache(tmp_path, max_bytes=10_000)
+    for name in "abc":
+        cache.put(name * 64, make_content(text + name, ".txt"))
+    assert cache.stats.bytes_on_disk <= 10_000
+    evicted = [name for name in "abc" if cache.get(name * 64) is None]
+    assert evicted and "c" not in evicted
+
+    reopened = ExtractionCache(tmp_path, max_bytes=10_000)
+    assert reopened.stats.bytes_on_disk == cache.stats.bytes_on_disk
+    assert reopened.get("c" * 64) is not None
+
+
+def test_corrupt_entry_is_dropped(tmp_path):
+    cache = ExtractionCache(tmp_path)
+    cache.put("b" * 64, make_content("x", ".txt"))
+    entry = next(tmp_path.rglob("*.zjson"))
+    entry.write_bytes(b"garbage")
+    assert cache.get("b" * 64) is None
+    assert not entry.exists() and cache.stats.bytes_on_disk == 0
+
+
+def test_sha256_from_upload_skips_hashing(tmp_path):
+    doc = tmp_path / "a.md"
+    doc.write_text("# x", encoding="utf-8")
+    sha = file_sha256(doc)
+    cache = ExtractionCache(tmp_path / "cache")
+    cache.get_or_extract(doc, sha256=sha)
+    doc.unlink()  # a hit needs neither the file nor the parser
+    assert cache.get_or_extract(doc, sha256=sha)["text"] == "# x"
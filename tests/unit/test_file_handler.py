@@ -44,4 +44,62 @@ def test_ensure_runtime_dirs_idempotent(tmp_path, monkeypatch):
 
     # Second call should be idempotent (no exception)
     fh.ensure_runtime_dirs()
-    assert uploads.exists() and exports.exists()
\ No newline at end of file
+    assert uploads.exists() and exports.exists()
+
+def _fixed_now():
+    from datetime import datetime, timezone
+
+    return datetime(2025, 3, 9, tzinfo=timezone.utc)
+
+
+def test_save_upload_streams_hashes_and_places_file(tmp_path):
+    import hashlib
+    import io
+
+    data = os.urandom(300_000)
+    base = tmp_path / "uploads"
+    saved = fh.save_upload(io.BytesIO(data), "My Notes.txt", "conv1", base_dir=base, chunk_size=4096, now=_fixed_now())
+
+    assert saved == {
+        "filename": "My Notes.txt",
+        "path": "uploads/conv1/2025-03/My Notes.txt",
+        "ext": ".txt",
+        "size": len(data),
+        "sha256": hashlib.sha256(data).hexdigest(),
+    }
+    assert (tmp_path / saved["path"]).read_bytes() == data
+    assert os.listdir(base / "conv1" / "2025-03") == ["My Notes.txt"]  # no temp left behind
+
+
+def test_save_upload_accepts_chunk_iterables_and_never_overwrites(tmp_path):
+    first = fh.save_upload([b"a", b"b"], "x.md", "c", base_dir=tmp_path, now=_fixed_now())
+    second = fh.save_upload(iter([b"cd"]), "x.md", "c", base_dir=tmp_path, now=_fixed_now())
+    assert first["filename"] == "x.md" and second["filename"] == "x-1.md"
+    assert (tmp_path / "c" / "2025-03" / "x.md").read_bytes() == b"ab"
+    assert second["size"] == 2
+
+
+def test_save_upload_aborts_mid_stream_when_over_cap(tmp_path):
+    pulled = []
+
+    def chunks():
+        for i in range(100):
+            pulled.append(i)
+            yield b"x" * 1000
+
+    with pytest.raises(fh.UploadTooLarge):
+        fh.save_upload(chunks(), "big.txt", "c", base_dir=tmp_path, max_bytes=5_500, now=_fixed_now())
+    assert len(pulled) == 6  # stopped reading right after crossing the cap
+    assert os.listdir(tmp_path / "c" / "2025-03") == []
+
+
+def test_save_upload_rejects_before_reading(tmp_path):
+    class _Unreadable:
+        def read(self, n):  # pragma: no cover - must not be called
+            raise AssertionError("stream should not be read")
+
+    with pytest.raises(fh.UploadTooLarge):
+        fh.save_upload(_Unreadable(), "a.txt", "c", base_dir=tmp_path, expected_size=fh.MAX_UPLOAD_BYTES + 1)
+    with pytest.raises(fh.UploadError):
+        fh.save_upload(_Unreadable(), "a.exe", "c", base_dir=tmp_path)
+    assert not (tmp_path / "c").exists()
@@ -0,0 +1,56 @@
+import multiprocessing
+import threading
+import time
+import uuid
+
+from personal_chatbot.src.ids import id_timestamp_ms, new_id
+
+
+def test_new_id_is_uuid7_with_embedded_timestamp():
+    before = int(time.time() * 1000)
+    rid = new_id()
+    after = int(time.time() * 1000)
+    parsed = uuid.UUID(rid)
+    assert parsed.version == 7
+    assert parsed.variant == uuid.RFC_4122
+    assert str(parsed) == rid
+    assert before - 5 <= id_timestamp_ms(rid) <= after + 5
+
+
+def test_ids_sort_in_issue_order_within_a_thread():
+    ids = [new_id() for _ in range(10_000)]
+    assert ids == sorted(ids)
+    assert len(set(ids)) == len(ids)
+
+
+def test_ids_unique_across_threads():
+    results = []
+
+    def worker():
+        results.append([new_id() for _ in range(5_000)])
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    flat = [i for batch in results for i in batch]
+    assert len(set(flat)) == len(flat)
+    assert all(batch == sorted(batch) for batch in results)
+
+
+def _child(queue):
+    queue.put([new_id() for _ in range(2_000)])
+
+
+def test_ids_unique_across_forked_processes():
+    ctx = multiprocessing.get_context("fork")
+    queue = ctx.Queue()
+    procs = [ctx.Process(target=_child, args=(queue,)) for _ in range(3)]
+    for p in procs:
+        p.start()
+    batches = [queue.get(timeout=10) for _ in procs] + [[new_id() for _ in range(2_000)]]
+    for p in procs:
+        p.join()
+    flat = [i for batch in batches for i in batch]
+    assert len(set(flat)) == len(flat)
@@ -0,0 +1,197 @@
+import os
+import time
+
+import pytest
+
+from personal_chatbot.src import log_store
+from personal_chatbot.src.log_store import INDEX_FILE, LogStore
+from personal_chatbot.src.memory_manager import MemoryError, MemoryRecord
+
+
+def _open(path, **kwargs):
+    kwargs.setdefault("segment_bytes", 4096)
+    kwargs.setdefault("compact_interval", None)
+    return LogStore(path, **kwargs)
+
+
+def _fill(store, n=200):
+    for i in range(n):
+        metadata = {"role": "user", "n": i} if i % 2 else {}
+        store.create(MemoryRecord(id=f"r{i}", user_id=f"u{i % 3}", content=f"message {i} ✓ " * 5, metadata=metadata))
+
+
+def _snapshot(store):
+    return {u: [(r.id, r.content, r.metadata) for r in store.list_by_user(u, 1000)] for u in ("u0", "u1", "u2")}
+
+
+def test_matches_memory_store_contract(tmp_path):
+    store = _open(tmp_path)
+    _fill(store, 20)
+    assert store.get("r3") == MemoryRecord("r3", "u0", "message 3 ✓ " * 5, {"role": "user", "n": 3})
+    assert store.get("missing") is None
+    with pytest.raises(MemoryError):
+        store.create(MemoryRecord("r3", "u0", "dup", {}))
+
+    assert [r.id for r in store.list_by_user("u0", limit=3)] == ["r0", "r3", "r6"]
+    assert [r.id for r in store.list_by_user("u0", limit=3, cursor="r6")] == ["r9", "r12", "r15"]
+    assert [r.id for r in store.list_by_user("u0", limit=2, newest_first=True)] == ["r18", "r15"]
+    assert [r.id for r in store.list_by_user("u0", limit=2, newest_first=True, cursor="r15")] == ["r12", "r9"]
+    with pytest.raises(MemoryError):
+        store.list_by_user("u1", cursor="r3")
+
+    assert store.delete("r6") is True
+    assert store.delete("r6") is False
+    assert [r.id for r in store.list_by_user("u0", limit=3, cursor="r3")] == ["r9", "r12", "r15"]
+    with pytest.raises(MemoryError):
+        store.list_by_user("u0", cursor="r6")
+    store.close()
+
+
+def test_reopen_loads_index_and_replays_only_the_tail(tmp_path):
+    store = _open(tmp_path)
+    _fill(store)
+    store.delete("r10")
+    expected = _snapshot(store)
+    store.close()
+    assert (tmp_path / INDEX_FILE).exists()
+
+    reopened = _open(tmp_path)
+    assert reopened.stats.replayed_frames == 0
+    assert _snapshot(reopened) == expected
+    reopened.create(MemoryRecord("new", "u0", "after index", {}))
+    reopened.delete("r11")
+    reopened.flush()  # simulate a crash: no close(), index not rewritten
+
+    crashed = _open(tmp_path)
+    assert crashed.stats.replayed_frames == 2
+    assert crashed.get("new").content == "after index"
+    assert crashed.get("r11") is None
+    assert crashed.stats.live_records == 199
+
+
+def test_missing_or_stale_index_falls_back_to_full_replay(tmp_path):
+    store = _open(tmp_path)
+    _fill(store)
+    for i in range(0, 200, 3):
+        store.delete(f"r{i}")
+    expected = _snapshot(store)
+    store.close()
+
+    (tmp_path / INDEX_FILE).write_bytes(b"not an index")
+    replayed = _open(tmp_path)
+    assert replayed.stats.replayed_frames > 200
+    assert _snapshot(replayed) == expected
+    replayed.close()
+
+    os.remove(tmp_path / INDEX_FILE)
+    assert _snapshot(_open(tmp_path)) == expected
+
+
+def test_torn_tail_is_ignored_and_overwritten(tmp_path):
+    store = _open(tmp_path, segment_bytes=1 << 20)
+    _fill(store, 10)
+    store.close()
+    segment = tmp_path / "segment-00000001.log"
+    with open(segment, "ab") as fh:
+        fh.write(b"\x40\x00\x00\x00garbage-from-a-torn-write")
+
+    reopened = _open(tmp_path, segment_bytes=1 << 20)
+    assert reopened.stats.live_records == 10
+    reopened.create(MemoryRecord("after", "u0", "ok", {}))
+    reopened.close()
+    assert _open(tmp_path).get("after").content == "ok"
+
+
+def test_compaction_reclaims_dead_bytes_and_keeps_order(tmp_path):
+    store = _open(tmp_path, compact_ratio=0.3)
+    _fill(store)
+    for i in range(150):
+        if i % 4:
+            store.delete(f"r{i}")
+    expected = _snapshot(store)
+    before = store.stats
+
+    reclaimed = store.compact()
+    after = store.stats
+    assert reclaimed > 0 and after.compactions > 0
+    assert after.bytes_on_disk == before.bytes_on_disk - reclaimed
+    assert _snapshot(store) == expected
+    store.create(MemoryRecord("post", "u0", "x", {}))
+    store.close()
+
+    assert _snapshot(_open(tmp_path)) == {**expected, "u0": expected["u0"] + [("post", "x", {})]}
+    os.remove(tmp_path / INDEX_FILE)  # deletes must survive a full replay of compacted segments
+    assert _snapshot(_open(tmp_path)) == {**expected, "u0": expected["u0"] + [("post", "x", {})]}
+
+
+def test_delete_during_compaction_copy_stays_deleted(tmp_path, monkeypatch):
+    store = _open(tmp_path, compact_ratio=0.3)
+    _fill(store)
+    for i in range(1, 60, 2):
+        store.delete(f"r{i}")
+    real_fsync = os.fsync
+    victims = iter(["r0", "r2", "r4"])
+
+    def fsync_and_delete(fd):
+        for victim in victims:  # all on the first fsync: between the copy and the swap
+            store.delete(victim)
+        real_fsync(fd)
+
+    monkeypatch.setattr(log_store.os, "fsync", fsync_and_delete)
+    store.compact()
+    monkeypatch.setattr(log_store.os, "fsync", real_fsync)
+    for i in range(150, 200):  # kill the segment holding the victims' tombstones ...
+        store.delete(f"r{i}")
+    for i in range(60):  # ... seal it, and compact it too
+        store.create(MemoryRecord(f"f{i}", "u2", "filler " * 10, {}))
+    store.compact()
+    expected = _snapshot(store)
+    assert "r0" not in {rid for rid, _, _ in expected["u0"]}
+    store.close()
+    os.remove(tmp_path / INDEX_FILE)
+    assert _snapshot(_open(tmp_path)) == expected
+
+
+def test_delete_then_recreate_during_compaction_keeps_the_new_record(tmp_path, monkeypatch):
+    store = _open(tmp_path, compact_ratio=0.3)
+    _fill(store)
+    for i in range(1, 60, 2):
+        store.delete(f"r{i}")
+    real_fsync = os.fsync
+    calls = []
+
+    def fsync_and_recreate(fd):
+        if not calls:  # between the copy and the swap
+            store.delete("r0")
+            store.create(MemoryRecord("r0", "u0", "second life", {}))
+        calls.append(fd)
+        real_fsync(fd)
+
+    monkeypatch.setattr(log_store.os, "fsync", fsync_and_recreate)
+    store.compact()
+    monkeypatch.setattr(log_store.os, "fsync", real_fsync)
+    assert store.get("r0").content == "second life"
+    expected = _snapshot(store)
+    store.close()
+
+    os.remove(tmp_path / INDEX_FILE)  # full replay must apply the delete before the re-create
+    replayed = _open(tmp_path, compact_ratio=0.3)
+    assert replayed.get("r0").content == "second life"
+    assert _snapshot(replayed) == expected
+    replayed.compact()  # the tombstone and the copied PUT are dropped together
+    replayed.close()
+    os.remove(tmp_path / INDEX_FILE)
+    assert _snapshot(_open(tmp_path)) == expected
+
+
+def test_background_compaction(tmp_path):
+    store = _open(tmp_path, compact_ratio=0.3, compact_interval=0.01)
+    _fill(store)
+    for i in range(100):
+        store.delete(f"r{i}")
+    deadline = time.monotonic() + 5
+    while store.stats.compactions == 0 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert store.stats.compactions > 0
+    store.close()
+    assert _open(tmp_path).stats.live_records == 100
@@ -1,5 +1,6 @@
 import pytest
-from personal_chatbot.src.memory_manager import InMemoryStore, MemoryRecord, MemoryError
+from personal_chatbot.src import memory_manager
+from personal_chatbot.src.memory_manager import InMemoryStore, MemoryRecord, MemoryError, SqliteStore, UserRecordIndex
 
 
 def test_create_and_get_record_roundtrip():
@@ -41,4 +42,231 @@ def test_delete_records():
     assert store.delete("1") is True
     assert store.get("1") is None
     # Deleting non-existing returns False
-    assert store.delete("1") is False
\ No newline at end of file
+    assert store.delete("1") is False
+
+def test_list_by_user_preserves_insertion_order_and_newest_first():
+    store = InMemoryStore()
+    for i in range(5):
+        store.create(MemoryRecord(id=f"a{i}", user_id="u1", content=str(i), metadata={}))
+        store.create(MemoryRecord(id=f"b{i}", user_id="u2", content=str(i), metadata={}))
+
+    assert [r.id for r in store.list_by_user("u1")] == ["a0", "a1", "a2", "a3", "a4"]
+    assert [r.id for r in store.list_by_user("u1", limit=2, newest_first=True)] == ["a4", "a3"]
+    assert store.list_by_user("missing") == []
+
+
+def test_list_by_user_cursor_pagination_both_directions():
+    store = InMemoryStore()
+    for i in range(7):
+        store.create(MemoryRecord(id=str(i), user_id="u1", content="x", metadata={}))
+
+    pages = []
+    cursor = None
+    while True:
+        page = store.list_by_user("u1", limit=3, cursor=cursor)
+        if not page:
+            break
+        pages.append([r.id for r in page])
+        cursor = page[-1].id
+    assert pages == [["0", "1", "2"], ["3", "4", "5"], ["6"]]
+
+    older = store.list_by_user("u1", limit=2, newest_first=True, cursor="4")
+    assert [r.id for r in older] == ["3", "2"]
+
+    with pytest.raises(MemoryError):
+        store.list_by_user("u2", cursor="4")
+
+
+def test_delete_keeps_user_index_consistent_across_compaction():
+    store = InMemoryStore()
+    for i in range(100):
+        store.create(MemoryRecord(id=str(i), user_id="u1", content="x", metadata={}))
+    # Delete enough to trigger compaction of the per-user index
+    for i in range(0, 90):
+        if i != 50:
+            assert store.delete(str(i)) is True
+
+    assert [r.id for r in store.list_by_user("u1", limit=3)] == ["50", "90", "91"]
+    assert [r.id for r in store.list_by_user("u1", limit=2, cursor="50")] == ["90", "91"]
+    assert [r.id for r in store.list_by_user("u1", limit=2, newest_first=True)] == ["99", "98"]
+
+    # Ids can be reused once deleted, and land at the end of the history
+    store.create(MemoryRecord(id="3", user_id="u1", content="again", metadata={}))
+    assert store.list_by_user("u1", limit=1, newest_first=True)[0].content == "again"
+
+
+def test_user_record_index_pages_ids_without_the_records():
+    index = UserRecordIndex()
+    for i in range(6):
+        index.add("u1" if i % 2 else "u2", str(i))
+    index.remove("u1", "3")
+    assert index.page("u1", 10) == ["1", "5"]
+    assert index.page("u1", 1, newest_first=True, cursor="5") == ["1"]
+    with pytest.raises(MemoryError):
+        index.page("u2", 10, cursor="1")  # another user's record
+    with pytest.raises(MemoryError):
+        index.page("u1", 10, cursor="3")  # deleted
+    index.clear()
+    assert index.page("u2", 10) == []
+
+
+def test_sqlite_store_roundtrip_and_survives_reopen(tmp_path):
+    path = tmp_path / "memory.db"
+    store = SqliteStore(path)
+    store.create(MemoryRecord(id="r1", user_id="u1", content="hello", metadata={"role": "user"}))
+    with pytest.raises(MemoryError):
+        store.create(MemoryRecord(id="r1", user_id="u1", content="dup", metadata={}))
+    store.close()
+
+    reopened = SqliteStore(path)
+    fetched = reopened.get("r1")
+    assert fetched == MemoryRecord(id="r1", user_id="u1", content="hello", metadata={"role": "user"})
+    assert reopened._conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    assert reopened.delete("r1") is True
+    assert reopened.delete("r1") is False
+    assert reopened.get("r1") is None
+
+
+def test_sqlite_store_listing_matches_in_memory_contract():
+    store = SqliteStore()
+    with store.batch():
+        for i in range(7):
+            store.create(MemoryRecord(id=str(i), user_id="u1", content="x", metadata={}))
+            store.create(MemoryRecord(id=f"o{i}", user_id="u2", content="y", metadata={}))
+
+    assert [r.id for r in store.list_by_user("u1", limit=3)] == ["0", "1", "2"]
+    assert [r.id for r in store.list_by_user("u1", limit=3, cursor="2")] == ["3", "4", "5"]
+    assert [r.id for r in store.list_by_user("u1", limit=2, newest_first=True)] == ["6", "5"]
+    assert [r.id for r in store.list_by_user("u1", limit=2, newest_first=True, cursor="4")] == ["3", "2"]
+    with pytest.raises(MemoryError):
+        store.list_by_user("u2", cursor="4")
+
+
+def test_sqlite_store_orders_by_insertion_not_wall_clock(monkeypatch):
+    store = SqliteStore()
+    clock = iter([100.0, 50.0, 75.0])  # the wall clock steps backwards
+    monkeypatch.setattr(memory_manager.time, "time", lambda: next(clock))
+    for rid in ("a", "b", "c"):
+        store.create(MemoryRecord(id=rid, user_id="u1", content="x", metadata={}))
+
+    assert [r.id for r in store.list_by_user("u1")] == ["a", "b", "c"]
+    assert [r.id for r in store.list_by_user("u1", cursor="a")] == ["b", "c"]
+    assert [r.id for r in store.list_by_user("u1", newest_first=True, cursor="c")] == ["b", "a"]
+
+
+def test_sqlite_store_batch_rolls_back_on_error():
+    store = SqliteStore()
+    store.create(MemoryRecord(id="keep", user_id="u1", content="x", metadata={}))
+    with pytest.raises(RuntimeError):
+        with store.batch():
+            store.create(MemoryRecord(id="a", user_id="u1", content="x", metadata={}))
+            with store.batch():
+                store.create(MemoryRecord(id="b", user_id="u1", content="x", metadata={}))
+            raise RuntimeError("boom")
+
+    assert [r.id for r in store.list_by_user("u1")] == ["keep"]
+
+
+@pytest.mark.parametrize("store_type", [InMemoryStore, SqliteStore], ids=["memory", "sqlite"])
+def test_change_log_is_monotonic_per_user(store_type):
+    store = store_type()
+    assert store.last_change("u1") == 0
+    store.create(MemoryRecord(id="a", user_id="u1", content="x", metadata={}))
+    store.create(MemoryRecord(id="o", user_id="u2", content="y", metadata={}))
+    store.create(MemoryRecord(id="b", user_id="u1", content="x", metadata={}))
+    store.delete("a")
+    store.delete("missing")
+
+    changes = store.changes_since("u1")
+    assert [(c.op, c.record_id) for c in changes] == [("create", "a"), ("create", "b"), ("delete", "a")]
+    assert [c.seq for c in changes] == sorted({c.seq for c in changes})
+    assert store.last_change("u1") == changes[-1].seq
+    assert [c.record_id for c in store.changes_since("u1", changes[0].seq, limit=1)] == ["b"]
+    assert store.changes_since("u1", changes[-1].seq) == []
+    assert [c.record_id for c in store.changes_since("u2")] == ["o"]
+
+
+def test_memory_record_is_compact_but_keeps_its_api():
+    import pickle
+    import sys
+
+    user = "".join(["u", "1"])  # built at runtime, so not already interned
+    role = "".join(["assi", "stant"])
+    rec = MemoryRecord("r1", user, "hi", {"role": role})
+    other = MemoryRecord(id="r2", user_id="".join(["u", "1"]), content="x", metadata={})
+
+    assert not hasattr(rec, "__dict__")
+    assert rec.user_id is other.user_id
+    assert rec.metadata["role"] is sys.intern("assistant")
+    assert repr(other) == "MemoryRecord(id='r2', user_id='u1', content='x', metadata={})"
+    assert other == MemoryRecord("r2", "u1", "x", {})
+    assert other != MemoryRecord("r2", "u1", "x", {"k": 1})
+    assert other._metadata is None
+    other.metadata["k"] = 1  # empty metadata is still a mutable dict once touched
+    assert other == MemoryRecord("r2", "u1", "x", {"k": 1})
+    assert pickle.loads(pickle.dumps(rec)) == rec
+    with pytest.raises(TypeError):
+        hash(rec)
+    match rec:
+        case MemoryRecord(record_id, _, content, {"role": matched_role}):
+            assert (record_id, content, matched_role) == ("r1", "hi", "assistant")
+
+
+def test_record_columns_round_trip_records():
+    from personal_chatbot.src.memory_manager import RecordColumns
+
+    records = [
+        MemoryRecord("a", "u1", "hello", {"role": "user"}),
+        MemoryRecord("b", "u1", "hi", {"role": "assistant"}),
+        MemoryRecord("c", "u2", "plain", {}),
+        MemoryRecord("d", "u1", "tool", {"role": "tool", "file_paths": ["x.pdf"]}),
+    ]
+    columns = RecordColumns(records)
+
+    assert len(columns) == 4
+    assert list(columns) == records
+    assert columns[-1] == records[-1] and columns[1] == records[1]
+    assert [columns.role(i) for i in range(4)] == ["user", "assistant", None, "tool"]
+    assert columns.content(2) == "plain" and columns.ids == ["a", "b", "c", "d"]
+    with pytest.raises(IndexError):
+        columns[4]
+    with pytest.raises(IndexError):
+        columns.role(4)
+    with pytest.raises(IndexError):
+        RecordColumns().role(0)
+    assert columns.role(-1) == "tool"
+
+    columns[3].metadata["role"] = "user"
+    records[3].metadata["extra"] = True
+    assert columns.role(3) == "tool" and "extra" not in columns[3].metadata
+
+
+def test_memory_record_copies_the_metadata_it_is_given():
+    role = "".join(["us", "er"])  # not interned
+    empty, tagged = {}, {"role": role}
+    a = MemoryRecord("a", "u1", "x", empty)
+    b = MemoryRecord("b", "u1", "x", tagged)
+    assert tagged["role"] is role  # the caller's dict is left alone
+    empty["late"] = tagged["late"] = True
+    assert a.metadata == {} and b.metadata == {"role": "user"}
+
+
+def test_readers_do_not_allocate_empty_metadata(tmp_path):
+    from personal_chatbot.src.context_builder import ContextBuilder
+    from personal_chatbot.src.exporter import ConversationInfo, render_markdown
+    from personal_chatbot.src.log_store import LogStore
+
+    store = InMemoryStore()
+    store.create(MemoryRecord("r0", "u1", "hello", {}))
+    record = store.get("r0")
+    SqliteStore().create(record)
+    log = LogStore(tmp_path, compact_interval=None)
+    log.create(record)
+    log.close()
+    "".join(render_markdown(ConversationInfo("u1"), [record]))
+    assert ContextBuilder(store).build("u1") == [{"role": "user", "content": "hello"}]
+
+    assert record._metadata is None
+    assert record.metadata_view() == {} and record == MemoryRecord("r0", "u1", "hello", {})
+    with pytest.raises(TypeError):
+        record.metadata_view()["k"] = 1  # type: ignore[index]
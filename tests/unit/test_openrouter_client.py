@@ -1,13 +1,53 @@
+import asyncio
+import json
+
 import pytest
 from typing import Any, Dict
 
 from personal_chatbot.src.openrouter_client import (
+    AsyncOpenRouterClient,
+    HttpxAsyncTransport,
+    OpenRouterAuthError,
     OpenRouterClient,
     OpenRouterConfig,
     OpenRouterError,
+    OpenRouterTimeout,
+    SSEParser,
 )
 
 
+def _sse(*events: Dict[str, Any]) -> bytes:
+    body = b": OPENROUTER PROCESSING\r\n\r\n"
+    for event in events:
+        body += b"data: " + json.dumps(event).encode("utf-8") + b"\n\n"
+    return body + b"data: [DONE]\n\n"
+
+
+def _delta(text: str) -> Dict[str, Any]:
+    return {"choices": [{"delta": {"content": text}}]}
+
+
+class _StreamingTransport:
+    """In-process streaming transport replaying an SSE body in fixed-size chunks."""
+
+    def __init__(self, body: bytes, chunk_size: int = 7):
+        self._body = body
+        self._chunk_size = chunk_size
+        self.calls = []
+        self.closed = False
+
+    def post(self, path: str, json: Dict[str, Any], timeout: float) -> Dict[str, Any]:  # pragma: no cover - unused
+        raise AssertionError("post should not be used for streaming")
+
+    def stream(self, path: str, json: Dict[str, Any], timeout: float):
+        self.calls.append({"path": path, "json": json, "timeout": timeout})
+        try:
+            for i in range(0, len(self._body), self._chunk_size):
+                yield self._body[i:i + self._chunk_size]
+        finally:
+            self.closed = True
+
+
 def test_chat_complete_raises_without_transport():
     config = OpenRouterConfig(base_url="https://openrouter.ai/api/v1", model="test-model", request_timeout_seconds=5.0)
     client = OpenRouterClient(config=config, transport=None)
@@ -36,4 +76,404 @@ def test_chat_complete_invokes_transport_with_payload_and_timeout(mock_transport
     # Basic contract for result structure (minimal placeholder)
     assert isinstance(result, dict)
     assert "choices" in result
-    assert isinstance(result["choices"], list)
\ No newline at end of file
+    assert isinstance(result["choices"], list)
+
+
+def test_sse_parser_handles_arbitrary_chunk_boundaries():
+    body = b"data: a\r\n\n: comment\nevent: x\ndata: multi\ndata: line\n\ndata: \xc3\xa9t\xc3\xa9\n\ndata: tail"
+    for size in (1, 2, 3, 5, len(body)):
+        parser = SSEParser()
+        events = []
+        for i in range(0, len(body), size):
+            events.extend(parser.feed(body[i:i + size]))
+        events.extend(parser.close())
+        assert events == ["a", "multi\nline", "été", "tail"]
+
+
+def test_chat_stream_yields_deltas_and_reports_stats():
+    body = _sse(_delta("Hel"), _delta("lo"), {"choices": [{"delta": {}}]}, _delta(" world"))
+    transport = _StreamingTransport(body, chunk_size=5)
+    config = OpenRouterConfig(base_url="https://openrouter.ai/api/v1", model="test-model", request_timeout_seconds=4.0)
+    client = OpenRouterClient(config=config, transport=transport)
+
+    stream = client.chat_stream([{"role": "user", "content": "Hi"}])
+    assert list(stream) == ["Hel", "lo", " world"]
+
+    call = transport.calls[0]
+    assert call["path"] == "/chat/completions"
+    assert call["json"]["stream"] is True
+    assert call["timeout"] == pytest.approx(4.0)
+    assert transport.closed is True
+    assert stream.stats.tokens == 3
+    assert stream.stats.chars == len("Hello world")
+    assert stream.stats.time_to_first_token is not None
+    assert stream.stats.duration >= stream.stats.time_to_first_token
+    assert stream.stats.tokens_per_second >= 0.0
+
+
+def test_chat_stream_prefers_reported_usage_and_surfaces_errors():
+    config = OpenRouterConfig(base_url="https://openrouter.ai/api/v1", model="test-model")
+    body = _sse(_delta("a"), _delta("b"), {"choices": [], "usage": {"completion_tokens": 5}})
+    stream = OpenRouterClient(config=config, transport=_StreamingTransport(body)).chat_stream([])
+    assert "".join(stream) == "ab"
+    assert stream.stats.tokens == 5
+
+    broken = _sse(_delta("a"), {"error": {"code": 502, "message": "upstream"}})
+    with pytest.raises(OpenRouterError):
+        list(OpenRouterClient(config=config, transport=_StreamingTransport(broken)).chat_stream([]))
+
+    with pytest.raises(OpenRouterError):
+        OpenRouterClient(config=config, transport=object()).chat_stream([])  # type: ignore[arg-type]
+
+
+def test_chat_stream_close_releases_transport():
+    config = OpenRouterConfig(base_url="https://openrouter.ai/api/v1", model="test-model")
+    transport = _StreamingTransport(_sse(*(_delta(str(i)) for i in range(50))), chunk_size=4)
+    stream = OpenRouterClient(config=config, transport=transport).chat_stream([])
+    assert next(stream) == "0"
+    stream.close()
+    assert transport.closed is True
+
+
+def test_chat_stream_closes_the_response_even_if_never_iterated():
+    class _Response:
+        """Open HTTP response body: iterable with an explicit close."""
+
+        closes = 0
+
+        def __iter__(self):
+            return iter([_sse(_delta("never read"))])
+
+        def close(self):
+            self.closes += 1
+
+    response = _Response()
+
+    class _Transport:
+        def stream(self, path, json, timeout):
+            return response
+
+    config = OpenRouterConfig(base_url="https://openrouter.ai/api/v1", model="test-model")
+    stream = OpenRouterClient(config=config, transport=_Transport()).chat_stream([])
+    stream.close()
+    stream.close()
+    assert response.closes == 1
+    assert list(stream) == []
+
+    response = _Response()
+    assert list(OpenRouterClient(config=config, transport=_Transport()).chat_stream([])) == ["never read"]
+    assert response.closes == 1
+
+
+class _AsyncTransport:
+    def __init__(self, delay: float = 0.0):
+        self.calls = []
+        self._delay = delay
+
+    async def post(self, path: str, json: Dict[str, Any], timeout: float) -> Dict[str, Any]:
+        self.calls.append({"path": path, "json": json, "timeout": timeout})
+        await asyncio.sleep(self._delay)
+        return {"choices": [{"message": {"role": "assistant", "content": "async"}}]}
+
+
+def test_async_client_invokes_transport_and_enforces_timeout():
+    config = OpenRouterConfig(base_url="https://openrouter.ai/api/v1", model="test-model", request_timeout_seconds=0.05)
+
+    async def scenario():
+        transport = _AsyncTransport()
+        async with AsyncOpenRouterClient(config=config, transport=transport) as client:
+            results = await asyncio.gather(*(client.chat_complete([{"role": "user", "content": str(i)}]) for i in range(100)))
+        assert len(transport.calls) == 100
+        assert transport.calls[0]["json"]["model"] == "test-model"
+        assert transport.calls[0]["timeout"] == pytest.approx(0.05)
+        assert all(r["choices"][0]["message"]["content"] == "async" for r in results)
+
+        slow = AsyncOpenRouterClient(config=config, transport=_AsyncTransport(delay=1.0))
+        with pytest.raises(OpenRouterTimeout):
+            await slow.chat_complete([])
+        with pytest.raises(OpenRouterError):
+            await AsyncOpenRouterClient(config=config).chat_complete([])
+
+    asyncio.run(scenario())
+
+
+def test_httpx_async_transport_maps_status_codes(monkeypatch):
+    httpx = pytest.importorskip("httpx")
+    monkeypatch.setenv("OPENROUTER_API_KEY", "test-key")
+    seen = []
+
+    def handler(request):
+        seen.append(request)
+        status = {"/ok": 200, "/auth": 401}.get(request.url.path.rsplit("/v1", 1)[-1], 503)
+        return httpx.Response(status, json={"choices": []})
+
+    config = OpenRouterConfig(base_url="https://openrouter.ai/api/v1", request_timeout_seconds=2.0)
+
+    async def scenario():
+        transport = HttpxAsyncTransport(config, transport=httpx.MockTransport(handler))
+        assert await transport.post("/ok", json={}, timeout=1.0) == {"choices": []}
+        with pytest.raises(OpenRouterAuthError):
+            await transport.post("/auth", json={}, timeout=1.0)
+        with pytest.raises(OpenRouterError):
+            await transport.post("/down", json={}, timeout=1.0)
+        await transport.aclose()
+
+    asyncio.run(scenario())
+    assert seen[0].headers["Authorization"] == "Bearer test-key"
+    assert str(seen[0].url) == "https://openrouter.ai/api/v1/ok"
+
+
+class _FakeClock:
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class _FlakyTransport:
+    """Fails with the queued exceptions (advancing the fake clock), then succeeds."""
+
+    def __init__(self, clock, failures, cost=0.1):
+        self.clock = clock
+        self.failures = list(failures)
+        self.cost = cost
+        self.timeouts = []
+
+    def post(self, path, json, timeout):
+        self.timeouts.append(timeout)
+        self.clock.now += min(self.cost, timeout)
+        if self.failures:
+            raise self.failures.pop(0)
+        return {"choices": [{"message": {"role": "assistant", "content": "ok"}}]}
+
+
+def _resilient_client(transport, clock, *, timeout=10.0, retry=None, breaker=None):
+    from personal_chatbot.src.openrouter_client import RetryPolicy
+
+    config = OpenRouterConfig(base_url="https://openrouter.ai/api/v1", model="m", request_timeout_seconds=timeout)
+    return OpenRouterClient(
+        config,
+        transport=transport,
+        retry=retry or RetryPolicy(retries=2, base_delay=0.5, jitter=0.0),
+        breaker=breaker,
+        clock=clock,
+        sleep=clock.sleep,
+    )
+
+
+def test_retries_transient_errors_with_exponential_backoff():
+    from personal_chatbot.src.openrouter_client import OpenRouterHTTPError
+
+    clock = _FakeClock()
+    transport = _FlakyTransport(clock, [OpenRouterTimeout("t"), OpenRouterHTTPError(503)])
+    client = _resilient_client(transport, clock)
+
+    assert client.chat_complete([])["choices"][0]["message"]["content"] == "ok"
+    assert clock.sleeps == [0.5, 1.0]
+    assert client.stats.retries == 2
+    # Later attempts only get the remaining deadline budget
+    assert transport.timeouts[0] == pytest.approx(10.0)
+    assert transport.timeouts[2] == pytest.approx(10.0 - 0.1 - 0.5 - 0.1 - 1.0)
+
+
+def test_non_retryable_errors_and_retry_after_and_exhaustion():
+    from personal_chatbot.src.openrouter_client import OpenRouterHTTPError
+
+    clock = _FakeClock()
+    auth = _FlakyTransport(clock, [OpenRouterAuthError("nope")])
+    with pytest.raises(OpenRouterAuthError):
+        _resilient_client(auth, clock).chat_complete([])
+    assert clock.sleeps == []
+
+    limited = _FlakyTransport(clock, [OpenRouterHTTPError(429, retry_after=2.0)])
+    _resilient_client(limited, clock).chat_complete([])
+    assert clock.sleeps == [2.0]
+
+    always = _FlakyTransport(clock, [OpenRouterHTTPError(500)] * 5)
+    client = _resilient_client(always, clock)
+    with pytest.raises(OpenRouterHTTPError):
+        client.chat_complete([])
+    assert len(always.timeouts) == 3
+
+
+def test_retries_never_exceed_request_deadline():
+    from personal_chatbot.src.openrouter_client import RetryPolicy
+
+    clock = _FakeClock()
+    transport = _FlakyTransport(clock, [OpenRouterTimeout("t")] * 10, cost=0.9)
+    client = _resilient_client(transport, clock, timeout=2.0,
+                               retry=RetryPolicy(retries=10, base_delay=0.5, jitter=0.0))
+    with pytest.raises(OpenRouterTimeout):
+        client.chat_complete([])
+    assert clock.now <= 2.0
+    assert client.stats.deadline_exhausted == 1
+
+
+def test_circuit_breaker_fails_fast_then_probes_and_recovers():
+    from personal_chatbot.src.openrouter_client import CircuitBreaker, OpenRouterCircuitOpen, RetryPolicy
+
+    clock = _FakeClock()
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=5.0, clock=clock)
+    transport = _FlakyTransport(clock, [OpenRouterTimeout("t")] * 3, cost=1.0)
+    client = _resilient_client(transport, clock, breaker=breaker, retry=RetryPolicy(retries=0))
+
+    for _ in range(2):
+        with pytest.raises(OpenRouterTimeout):
+            client.chat_complete([])
+    assert breaker.state == CircuitBreaker.OPEN
+    assert client.stats.breaker_trips == 1
+
+    calls_before = len(transport.timeouts)
+    with pytest.raises(OpenRouterCircuitOpen):
+        client.chat_complete([])
+    assert len(transport.timeouts) == calls_before
+    assert client.stats.fast_failures == 1
+    assert client.stats.saved_seconds == pytest.approx(1.0)
+
+    clock.now += 5.0
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    with pytest.raises(OpenRouterTimeout):
+        client.chat_complete([])  # failed probe re-opens
+    assert breaker.state == CircuitBreaker.OPEN
+
+    clock.now += 5.0
+    assert client.chat_complete([])["choices"]
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_non_retryable_error_on_a_half_open_probe_does_not_close_the_breaker():
+    from personal_chatbot.src.openrouter_client import CircuitBreaker, RetryPolicy
+
+    clock = _FakeClock()
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=5.0, clock=clock)
+    transport = _FlakyTransport(clock, [OpenRouterTimeout("t"), OpenRouterAuthError("bad key")])
+    client = _resilient_client(transport, clock, breaker=breaker, retry=RetryPolicy(retries=0))
+    with pytest.raises(OpenRouterTimeout):
+        client.chat_complete([])
+    clock.now += 5.0
+
+    with pytest.raises(OpenRouterAuthError):
+        client.chat_complete([])  # the probe got a 4xx: no verdict on provider health
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert client.chat_complete([])["choices"]  # the probe slot was released for the next call
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+class _LatencyTransport:
+    """Transport whose per-model latency and failures come from injectable functions."""
+
+    def __init__(self, latency, fail=lambda model, n: None):
+        self._latency = latency
+        self._fail = fail
+        self._lock = __import__("threading").Lock()
+        self.calls = []
+
+    def post(self, path, json, timeout):
+        with self._lock:
+            n = len(self.calls)
+            self.calls.append(json["model"])
+        __import__("time").sleep(self._latency(json["model"], n))
+        error = self._fail(json["model"], n)
+        if error is not None:
+            raise error
+        return {"choices": [{"message": {"role": "assistant", "content": json["model"]}}]}
+
+
+def _hedged_client(transport, policy, timeout=5.0):
+    config = OpenRouterConfig(base_url="https://openrouter.ai/api/v1", model="primary", request_timeout_seconds=timeout)
+    return OpenRouterClient(config, transport=transport, hedge=policy)
+
+
+def _content(response):
+    return response["choices"][0]["message"]["content"]
+
+
+def test_hedge_duplicate_wins_when_first_attempt_is_slow():
+    from personal_chatbot.src.openrouter_client import HedgePolicy
+
+    transport = _LatencyTransport(lambda model, n: 0.5 if n == 0 else 0.01)
+    client = _hedged_client(transport, HedgePolicy(delay=0.02, budget_fraction=1.0))
+    import time as _time
+
+    start = _time.perf_counter()
+    assert _content(client.chat_complete([])) == "primary"
+    assert _time.perf_counter() - start < 0.3
+    assert transport.calls == ["primary", "primary"]
+    assert client.hedge_stats.hedges == 1 and client.hedge_stats.hedge_wins == 1
+    client.close()
+
+
+def test_fallback_models_race_in_order_and_failures_fall_through():
+    from personal_chatbot.src.openrouter_client import HedgePolicy, OpenRouterHTTPError
+
+    slow_primary = _LatencyTransport(lambda model, n: 0.4 if model == "primary" else 0.01)
+    client = _hedged_client(slow_primary, HedgePolicy(delay=0.02, fallback_models=("alt-a", "alt-b"),
+                                                      max_attempts=3, budget_fraction=1.0))
+    assert _content(client.chat_complete([])) == "alt-a"
+    client.close()
+
+    failing_primary = _LatencyTransport(
+        lambda model, n: 0.0,
+        fail=lambda model, n: OpenRouterHTTPError(503) if model == "primary" else None,
+    )
+    client = _hedged_client(failing_primary, HedgePolicy(delay=1.0, fallback_models=("alt-a",), budget_fraction=0.0))
+    assert _content(client.chat_complete([])) == "alt-a"
+    assert client.hedge_stats.fallbacks == 1 and client.hedge_stats.hedges == 0
+    client.close()
+
+    auth = _LatencyTransport(lambda model, n: 0.0, fail=lambda model, n: OpenRouterAuthError("bad key"))
+    client = _hedged_client(auth, HedgePolicy(delay=1.0, fallback_models=("alt-a",)))
+    with pytest.raises(OpenRouterAuthError):
+        client.chat_complete([])
+    assert auth.calls == ["primary"]
+    client.close()
+
+
+def test_hedging_respects_traffic_budget_and_deadline():
+    from personal_chatbot.src.openrouter_client import HedgePolicy
+
+    transport = _LatencyTransport(lambda model, n: 0.03)
+    client = _hedged_client(transport, HedgePolicy(delay=0.005, budget_fraction=0.25))
+    for _ in range(8):
+        client.chat_complete([])
+    assert client.hedge_stats.hedges == 2
+    assert client.hedge_stats.hedges_suppressed == 6
+    client.close()
+
+    stuck = _LatencyTransport(lambda model, n: 0.5)
+    client = _hedged_client(stuck, HedgePolicy(delay=0.01, budget_fraction=1.0), timeout=0.1)
+    with pytest.raises(OpenRouterTimeout):
+        client.chat_complete([])
+    client.close()
+
+
+def test_hedge_pool_follows_the_limiter_and_counts_concurrent_calls():
+    import threading
+    import time as _time
+
+    from personal_chatbot.src.openrouter_client import HedgePolicy
+    from personal_chatbot.src.rate_limiter import RateLimiter
+
+    transport = _LatencyTransport(lambda model, n: 0.1)
+    client = _hedged_client(transport, HedgePolicy(delay=1.0, budget_fraction=0.0))
+    callers = [threading.Thread(target=client.chat_complete, args=([],)) for _ in range(24)]
+    start = _time.perf_counter()
+    for t in callers:
+        t.start()
+    for t in callers:
+        t.join()
+    assert _time.perf_counter() - start < 0.25  # not queued behind a handful of workers
+    assert client.stats.calls == 24 and client.hedge_stats.calls == 24
+    client.close()
+
+    config = OpenRouterConfig(base_url="https://openrouter.ai/api/v1", model="primary")
+    limited = OpenRouterClient(config, transport=transport, hedge=HedgePolicy(), limiter=RateLimiter(max_concurrency=3))
+    limited.chat_complete([])
+    assert limited._hedge_pool._max_workers == 3
+    limited.close()
@@ -0,0 +1,271 @@
+import asyncio
+
+import pytest
+from typing import Any, Dict
+
+from personal_chatbot.src.openrouter_client import (
+    AsyncOpenRouterClient,
+    CircuitBreaker,
+    OpenRouterClient,
+    OpenRouterConfig,
+    OpenRouterHTTPError,
+    OpenRouterRateLimited,
+    RetryPolicy,
+)
+from personal_chatbot.src.rate_limiter import RateLimiter, TokenBucket
+
+
+class _FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+        self.sleeps = []
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+def _cfg(timeout: float = 10.0) -> OpenRouterConfig:
+    return OpenRouterConfig(
+        base_url="https://openrouter.ai/api/v1",
+        api_key_env="OPENROUTER_API_KEY",
+        request_timeout_seconds=timeout,
+        model="openrouter/auto",
+    )
+
+
+def test_token_bucket_refills_and_borrows():
+    bucket = TokenBucket(rate=2.0, capacity=4.0, now=0.0)
+    assert bucket.wait_time(4, 0.0) == 0.0
+    bucket.take(4, 0.0)
+    assert bucket.wait_time(1, 0.0) == 0.5
+    bucket.take(1, 0.0)  # borrowed
+    assert bucket.wait_time(1, 0.0) == 1.0
+    assert bucket.wait_time(4, 10.0) == 0.0  # capped at capacity
+
+
+def test_requests_per_minute_paces_and_fails_fast_past_deadline():
+    clock = _FakeClock()
+    limiter = RateLimiter(requests_per_minute=60, clock=clock, sleep=clock.sleep)
+    with limiter.acquire(timeout=5):
+        pass
+    with limiter.acquire(timeout=5):
+        pass
+    assert clock.sleeps == [1.0]
+    # The next slot is 1s away; a 0.5s deadline is rejected immediately without reserving.
+    with pytest.raises(OpenRouterRateLimited):
+        with limiter.acquire(timeout=0.5):
+            pass
+    assert clock.sleeps == [1.0]
+    assert limiter.stats.admitted == 2 and limiter.stats.rejected == 1
+
+
+def test_tokens_per_minute_budget_uses_request_cost():
+    clock = _FakeClock()
+    limiter = RateLimiter(tokens_per_minute=600, clock=clock, sleep=clock.sleep)  # 10 tokens/s, burst 10
+    assert limiter.reserve(10, timeout=0) == 0.0
+    assert limiter.reserve(5, timeout=1) == 0.5
+    payload = {"messages": [{"role": "user", "content": "x" * 40}], "max_tokens": 6}
+    assert RateLimiter.request_cost(payload) == 10 + 4 + 6
+
+
+def test_throttle_halves_rate_honours_retry_after_and_recovers():
+    clock = _FakeClock()
+    limiter = RateLimiter(requests_per_minute=120, recovery_step=0.25, clock=clock, sleep=clock.sleep)
+    limiter.reserve(timeout=0)
+    limiter.reserve(timeout=0)
+    limiter.on_throttled(retry_after=3)
+    assert limiter.rate_scale == 0.5
+    assert limiter.reserve(timeout=10) == 3.0  # paused by Retry-After
+    clock.now = 3.0
+    assert limiter.reserve(timeout=10) == 0.0  # burst capacity refilled during the pause
+    assert limiter.reserve(timeout=10) == 0.0
+    assert limiter.reserve(timeout=10) == 1.0  # then paced at half rate (1 req/s)
+    limiter.on_success()
+    limiter.on_success()
+    assert limiter.rate_scale == 1.0
+    limiter.on_success()
+    assert limiter.rate_scale == 1.0
+
+
+def test_throttle_floor():
+    limiter = RateLimiter(requests_per_minute=60, min_rate_fraction=0.2, clock=_FakeClock())
+    for _ in range(10):
+        limiter.on_throttled()
+    assert limiter.rate_scale == 0.2
+
+
+def test_concurrency_limit_fails_fast_and_hands_over_slots():
+    clock = _FakeClock()
+    limiter = RateLimiter(max_concurrency=1, clock=clock, sleep=clock.sleep)
+    with limiter.acquire(timeout=1):
+        with pytest.raises(OpenRouterRateLimited):
+            with limiter.acquire(timeout=0):
+                pass
+    with limiter.acquire(timeout=0):
+        pass
+    assert limiter._active == 0 and not limiter._waiters
+
+
+def test_concurrency_timeout_refunds_the_rate_reservation():
+    clock = _FakeClock()
+    limiter = RateLimiter(requests_per_minute=120, tokens_per_minute=600, max_concurrency=1,
+                          clock=clock, sleep=clock.sleep)  # burst: 2 requests, 10 tokens
+    with limiter.acquire(5, timeout=1):
+        for _ in range(3):
+            with pytest.raises(OpenRouterRateLimited):
+                with limiter.acquire(5, timeout=0):
+                    pass
+    assert limiter.stats.admitted == 1 and limiter.stats.rejected == 3
+    assert limiter.reserve(5, timeout=0) == 0.0  # the timed-out requests did not spend the budget
+
+
+def test_sync_and_async_share_concurrency_slots():
+    clock = _FakeClock()
+    limiter = RateLimiter(max_concurrency=1, clock=clock, sleep=clock.sleep)
+    order = []
+
+    async def waiter() -> None:
+        async with limiter.acquire_async(timeout=5):
+            order.append("async")
+
+    async def main() -> None:
+        with limiter.acquire(timeout=1):
+            task = asyncio.create_task(waiter())
+            await asyncio.sleep(0)
+            assert len(limiter._waiters) == 1
+            order.append("sync")
+        await task
+
+    asyncio.run(main())
+    assert order == ["sync", "async"]
+    assert limiter._active == 0
+
+
+def test_async_waiter_times_out_with_rate_limited():
+    limiter = RateLimiter(max_concurrency=1, clock=_FakeClock())
+
+    async def main() -> None:
+        with limiter.acquire(timeout=1):
+            with pytest.raises(OpenRouterRateLimited):
+                async with limiter.acquire_async(timeout=0.01):
+                    pass
+
+    asyncio.run(main())
+    assert not limiter._waiters and limiter._active == 0
+
+
+class _ScriptedTransport:
+    def __init__(self, outcomes):
+        self.outcomes = list(outcomes)
+        self.timeouts = []
+
+    def post(self, path: str, json: Dict[str, Any], timeout: float) -> Dict[str, Any]:
+        self.timeouts.append(timeout)
+        outcome = self.outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+
+def test_client_feeds_429_into_limiter_and_waits_within_deadline():
+    clock = _FakeClock()
+    limiter = RateLimiter(requests_per_minute=60, clock=clock, sleep=clock.sleep)
+    transport = _ScriptedTransport([OpenRouterHTTPError(429, retry_after=2.0), {"ok": True}])
+    client = OpenRouterClient(
+        _cfg(), transport, retry=RetryPolicy(retries=1, jitter=0.0), clock=clock, sleep=clock.sleep, limiter=limiter
+    )
+    assert client.chat_complete([{"role": "user", "content": "hi"}]) == {"ok": True}
+    assert limiter.stats.throttled == 1 and limiter.stats.admitted == 2
+    assert transport.timeouts[0] == 10.0
+    assert transport.timeouts[1] == pytest.approx(8.0)  # Retry-After backoff spent from the deadline
+    assert limiter.rate_scale > 0.5  # recovered one step after the success
+
+
+def test_client_rejects_when_admission_exceeds_deadline():
+    clock = _FakeClock()
+    limiter = RateLimiter(requests_per_minute=6, clock=clock, sleep=clock.sleep)  # one request per 10s
+    transport = _ScriptedTransport([{"ok": True}])
+    client = OpenRouterClient(_cfg(timeout=5.0), transport, clock=clock, sleep=clock.sleep, limiter=limiter)
+    client.chat_complete([{"role": "user", "content": "hi"}])
+    with pytest.raises(OpenRouterRateLimited):
+        client.chat_complete([{"role": "user", "content": "hi"}])
+    assert clock.now == 0.0  # failed fast, no sleeping
+    assert len(transport.timeouts) == 1
+
+
+def test_rate_limited_half_open_probe_does_not_wedge_the_breaker():
+    clock = _FakeClock()
+    limiter = RateLimiter(requests_per_minute=6, clock=clock, sleep=clock.sleep)  # one request per 10s
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=5.0, clock=clock)
+    transport = _ScriptedTransport([OpenRouterHTTPError(503), {"ok": True}])
+    client = OpenRouterClient(_cfg(timeout=3.0), transport, breaker=breaker, clock=clock, sleep=clock.sleep, limiter=limiter)
+    with pytest.raises(OpenRouterHTTPError):
+        client.chat_complete([{"role": "user", "content": "hi"}])
+    assert breaker.state == CircuitBreaker.OPEN
+
+    clock.now += 5.0
+    with pytest.raises(OpenRouterRateLimited):  # probe admitted by the breaker, refused by the limiter
+        client.chat_complete([{"role": "user", "content": "hi"}])
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+
+    clock.now += 10.0
+    assert client.chat_complete([{"role": "user", "content": "hi"}]) == {"ok": True}
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+class _StreamTransport:
+    def __init__(self, fail_with=None) -> None:
+        self.fail_with = fail_with
+
+    def stream(self, path: str, json: Dict[str, Any], timeout: float):
+        if self.fail_with is not None:
+            raise self.fail_with
+        yield b'data: {"choices": [{"delta": {"content": "hi"}}]}\n\ndata: [DONE]\n\n'
+
+
+def test_streams_hold_a_concurrency_slot_and_report_outcomes():
+    limiter = RateLimiter(requests_per_minute=600, max_concurrency=1)
+    client = OpenRouterClient(_cfg(timeout=0.05), _StreamTransport(), limiter=limiter)
+    first = client.chat_stream([{"role": "user", "content": "hi"}])
+    with pytest.raises(OpenRouterRateLimited):
+        client.chat_stream([{"role": "user", "content": "hi"}])
+    assert list(first) == ["hi"]
+
+    second = client.chat_stream([{"role": "user", "content": "hi"}])
+    second.close()  # closed before reading: the slot is still handed back
+    assert limiter.stats.rejected == 1
+
+    throttled = OpenRouterClient(_cfg(timeout=0.05), _StreamTransport(OpenRouterHTTPError(429)), limiter=limiter)
+    with pytest.raises(OpenRouterHTTPError):
+        list(throttled.chat_stream([{"role": "user", "content": "hi"}]))
+    assert limiter.stats.throttled == 1 and limiter.rate_scale == 0.5
+    assert list(client.chat_stream([{"role": "user", "content": "hi"}])) == ["hi"]
+
+
+def test_async_client_throttle_feedback():
+    limiter = RateLimiter(requests_per_minute=600, max_concurrency=2)
+
+    class _AsyncTransport:
+        def __init__(self) -> None:
+            self.calls = 0
+
+        async def post(self, path: str, json: Dict[str, Any], timeout: float) -> Dict[str, Any]:
+            self.calls += 1
+            if self.calls == 1:
+                raise OpenRouterHTTPError(429)
+            return {"ok": True}
+
+    client = AsyncOpenRouterClient(_cfg(), _AsyncTransport(), limiter=limiter)
+
+    async def main() -> None:
+        with pytest.raises(OpenRouterHTTPError):
+            await client.chat_complete([{"role": "user", "content": "hi"}])
+        assert await client.chat_complete([{"role": "user", "content": "hi"}]) == {"ok": True}
+
+    asyncio.run(main())
+    assert limiter.stats.throttled == 1
+    assert limiter._active == 0
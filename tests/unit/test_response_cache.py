@@ -0,0 +1,182 @@
+import threading
+
+import pytest
+
+from personal_chatbot.src.openrouter_client import OpenRouterClient, OpenRouterConfig, OpenRouterError
+from personal_chatbot.src.response_cache import CachingTransport, ResponseCache, cache_key, is_deterministic
+
+OK = {"choices": [{"message": {"role": "assistant", "content": "cached?"}}]}
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class _Transport:
+    def __init__(self, responses=None, raise_exc=None):
+        self.calls = 0
+        self._responses = list(responses or [OK])
+        self._raise = raise_exc
+
+    def post(self, path, json, timeout):
+        self.calls += 1
+        if self._raise:
+            raise self._raise
+        return self._responses[min(self.calls, len(self._responses)) - 1]
+
+    def stream(self, path, json, timeout):
+        self.calls += 1
+        yield b"data: [DONE]\n\n"
+
+
+def _unless_streaming(payload):  # the client sends no temperature; opt its requests in
+    return not payload.get("stream")
+
+
+def _client(transport):
+    cfg = OpenRouterConfig(base_url="https://openrouter.ai/api/v1", model="m")
+    return OpenRouterClient(cfg, transport=transport)
+
+
+def test_cache_key_is_canonical():
+    a = {"model": "m", "messages": [{"role": "user", "content": "hi"}]}
+    b = {"messages": [{"content": "hi", "role": "user"}], "model": "m"}
+    assert cache_key(a) == cache_key(b)
+    assert cache_key(a) != cache_key({**a, "model": "other"})
+
+
+def test_repeated_requests_are_served_from_memory_and_copies_are_isolated():
+    inner = _Transport()
+    caching = CachingTransport(inner, ResponseCache(), cacheable=_unless_streaming)
+    client = _client(caching)
+    msgs = [{"role": "user", "content": "hi"}]
+
+    first = client.chat_complete(msgs)
+    second = client.chat_complete(msgs)
+    second["choices"][0]["message"]["content"] = "mutated"
+    third = client.chat_complete(msgs)
+
+    assert inner.calls == 1
+    assert first == OK and third == OK
+    assert caching.stats.hits == 2 and caching.stats.misses == 1 and caching.stats.memory_hits == 2
+    assert caching.stats.hit_rate == pytest.approx(2 / 3)
+
+    client.chat_complete([{"role": "user", "content": "different"}])
+    assert inner.calls == 2
+
+
+def test_errors_streams_and_sampled_requests_are_never_cached():
+    failing = _Transport(raise_exc=OpenRouterError("boom"))
+    caching = CachingTransport(failing, ResponseCache())
+    for _ in range(2):
+        with pytest.raises(OpenRouterError):
+            _client(caching).chat_complete([])
+    assert failing.calls == 2
+
+    error_body = _Transport(responses=[{"error": {"code": 500}}, OK])
+    caching = CachingTransport(error_body, ResponseCache())
+    assert "error" in caching.post("/chat/completions", json={"model": "m"}, timeout=1)
+    assert caching.post("/chat/completions", json={"model": "m"}, timeout=1) == OK
+    assert error_body.calls == 2
+
+    streaming = _Transport()
+    caching = CachingTransport(streaming, ResponseCache())
+    for _ in range(2):
+        list(_client(caching).chat_stream([]))
+        caching.post("/chat/completions", json={"model": "m", "temperature": 0.7}, timeout=1)
+        caching.post("/chat/completions", json={"model": "m"}, timeout=1)  # provider default: sampled
+    assert streaming.calls == 6
+    assert caching.stats.stores == 0
+    caching.post("/chat/completions", json={"model": "m", "temperature": 0}, timeout=1)
+    assert caching.stats.stores == 1
+    assert is_deterministic({"temperature": 0.0}) and not is_deterministic({"temperature": 0, "stream": True})
+
+
+def test_stream_is_only_offered_when_the_transport_streams():
+    class _PostOnly:
+        def post(self, path, json, timeout):
+            return OK
+
+    caching = CachingTransport(_PostOnly(), ResponseCache())
+    assert not hasattr(caching, "stream")
+    with pytest.raises(OpenRouterError, match="does not support streaming"):
+        list(_client(caching).chat_stream([]))
+    assert hasattr(CachingTransport(_Transport(), ResponseCache()), "stream")
+
+
+def test_lru_is_bounded_by_bytes_and_entries_expire():
+    clock = _Clock()
+    cache = ResponseCache(max_bytes=120, ttl_seconds=10, clock=clock)
+    for i in range(3):
+        cache.put(f"k{i}", {"choices": [i], "pad": "x" * 20})
+    assert cache.stats.bytes_in_memory <= 120
+    assert cache.stats.evictions == 1
+    assert cache.get("k0") is None
+    assert cache.get("k1") is not None
+
+    clock.now += 11
+    assert cache.get("k2") is None
+    assert cache.stats.expirations == 1
+
+
+def test_concurrent_gets_and_puts_keep_lru_and_stats_consistent():
+    cache = ResponseCache(max_bytes=2000, ttl_seconds=None)
+    errors = []
+
+    def worker(n):
+        try:
+            for i in range(2000):
+                key = f"k{(n * 7 + i) % 50}"
+                if cache.get(key) is None:
+                    cache.put(key, {"choices": [i], "pad": "x" * 40})
+        except Exception as exc:  # pragma: no cover - the failure being tested
+            errors.append(exc)
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert errors == []
+    assert cache.stats.hits + cache.stats.misses == 8 * 2000
+    assert cache.stats.bytes_in_memory == sum(len(body) for _, body in cache._entries.values())
+    assert cache.stats.bytes_in_memory <= 2000
+
+
+def test_disk_tier_survives_restart_and_respects_ttl(tmp_path):
+    clock = _Clock()
+    cache = ResponseCache(disk_dir=tmp_path, ttl_seconds=60, clock=clock)
+    cache.put("abc123", OK)
+
+    restarted = ResponseCache(disk_dir=tmp_path, ttl_seconds=60, clock=clock)
+    assert restarted.get("abc123") == OK
+    assert restarted.stats.disk_hits == 1
+    assert restarted.get("abc123") == OK
+    assert restarted.stats.memory_hits == 1
+
+    clock.now += 61
+    cold = ResponseCache(disk_dir=tmp_path, ttl_seconds=60, clock=clock)
+    assert cold.get("abc123") is None
+    assert not list(tmp_path.rglob("*.json"))
+
+
+def test_disk_tier_is_bounded_by_bytes_and_swept(tmp_path):
+    clock = _Clock()
+    cache = ResponseCache(disk_dir=tmp_path, disk_max_bytes=300, ttl_seconds=60, clock=clock)
+    for i in range(4):
+        cache.put(f"k{i}", {"choices": [i], "pad": "x" * 60})
+    files = list(tmp_path.rglob("*.json"))
+    assert cache.stats.disk_evictions >= 1
+    assert sum(p.stat().st_size for p in files) == cache.stats.bytes_on_disk <= 300
+    assert {p.stem for p in files} <= {"k1", "k2", "k3"} and "k3" in {p.stem for p in files}
+
+    reopened = ResponseCache(disk_dir=tmp_path, disk_max_bytes=300, ttl_seconds=60, clock=clock)
+    assert reopened.stats.bytes_on_disk == cache.stats.bytes_on_disk
+    clock.now += 61
+    assert reopened.sweep() == len(files)
+    assert reopened.stats.bytes_on_disk == 0 and not list(tmp_path.rglob("*.json"))
@@ -0,0 +1,71 @@
+import pytest
+
+from personal_chatbot.src.memory_manager import InMemoryStore, MemoryRecord, SqliteStore
+from personal_chatbot.src.search_index import IndexedStore, InvertedIndex, make_snippet
+
+DOCS = [
+    ("d1", "u1", "The quarterly budget review is scheduled for Friday"),
+    ("d2", "u1", "Budget budget budget: please send the budget spreadsheet"),
+    ("d3", "u1", "Lunch plans for Friday?"),
+    ("d4", "u2", "My budget is private to me"),
+]
+
+
+def _fill(store):
+    for rid, uid, text in DOCS:
+        store.create(MemoryRecord(id=rid, user_id=uid, content=text, metadata={}))
+    return store
+
+
+@pytest.mark.parametrize("factory", [lambda: IndexedStore(InMemoryStore()), SqliteStore], ids=["inverted", "fts5"])
+def test_search_ranks_by_bm25_and_scopes_to_user(factory):
+    store = _fill(factory())
+
+    hits = store.search("u1", "budget")
+    assert [h.record_id for h in hits] == ["d2", "d1"]
+    assert hits[0].score > hits[1].score > 0
+    assert "[budget]" in hits[1].snippet.lower()
+
+    assert [h.record_id for h in store.search("u1", "friday lunch", limit=1)] == ["d3"]
+    assert [h.record_id for h in store.search("u2", "budget")] == ["d4"]
+    assert store.search("u1", "   ") == []
+    assert store.search("u1", 'budget" OR *') != []  # operators are not interpreted
+
+
+@pytest.mark.parametrize("factory", [lambda: IndexedStore(InMemoryStore()), SqliteStore], ids=["inverted", "fts5"])
+def test_search_index_follows_create_and_delete(factory):
+    store = _fill(factory())
+    assert store.delete("d2") is True
+    assert [h.record_id for h in store.search("u1", "budget")] == ["d1"]
+    store.create(MemoryRecord(id="d5", user_id="u1", content="new budget memo", metadata={}))
+    assert {h.record_id for h in store.search("u1", "budget")} == {"d1", "d5"}
+
+
+def test_sqlite_fts_is_built_for_existing_databases(tmp_path):
+    path = tmp_path / "m.db"
+    store = SqliteStore(path)
+    store.create(MemoryRecord(id="a", user_id="u1", content="legacy budget row", metadata={}))
+    store._conn.execute("DROP TABLE memory_records_fts")
+    store._conn.execute("DROP TRIGGER memory_records_ai")
+    store._conn.execute("DROP TRIGGER memory_records_ad")
+    store.close()
+
+    assert [h.record_id for h in SqliteStore(path).search("u1", "budget")] == ["a"]
+
+
+def test_reindex_and_snippet_window():
+    inner = _fill(InMemoryStore())
+    store = IndexedStore(inner)
+    assert store.search("u1", "budget") == []
+    assert store.reindex("u1") == 3
+    assert len(store.search("u1", "budget")) == 2
+
+    text = " ".join(f"w{i}" for i in range(40)) + " needle " + " ".join(f"x{i}" for i in range(40))
+    snippet = make_snippet(text, {"needle"}, width=8)
+    assert snippet.startswith("…") and snippet.endswith("…")
+    assert "[needle]" in snippet
+    assert len(snippet.split()) == 8
+
+    index = InvertedIndex()
+    index.add(MemoryRecord(id="z", user_id="u", content="alpha", metadata={}))
+    assert index.search("u", "alpha")[0].snippet == ""
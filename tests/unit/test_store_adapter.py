@@ -0,0 +1,85 @@
+import pytest
+
+from personal_chatbot.src import store_adapter as sa
+from personal_chatbot.src.memory_manager import InMemoryStore, MemoryRecord
+
+
+class _AddMessageStore:
+    def __init__(self):
+        self.messages = []
+
+    def add_message(self, user_id, message):
+        self.messages.append((user_id, message))
+
+
+class _AppendStore:
+    def __init__(self):
+        self.items = []
+
+    def append(self, user_id, message):
+        self.items.append((user_id, message))
+
+
+class _PairCreateStore:
+    def __init__(self):
+        self.rows = []
+
+    def create(self, user_id, message):
+        self.rows.append((user_id, message))
+
+
+class _DictWriteStore:
+    def __init__(self):
+        self.rows = []
+
+    def write(self, message):
+        self.rows.append(message)
+
+
+def test_record_store_receives_memory_record_with_role():
+    store = InMemoryStore()
+    adapter = sa.adapt(store)
+    adapter.write("u1", "assistant", "hi", record_id="r1", metadata={"cancelled": True})
+    assert store.get("r1") == MemoryRecord(id="r1", user_id="u1", content="hi",
+                                           metadata={"role": "assistant", "cancelled": True})
+    adapter.write("u1", "user", "generated id")
+    generated = store.list_by_user("u1", newest_first=True, limit=1)[0]
+    assert generated.content == "generated id" and len(generated.id) == 36
+
+
+@pytest.mark.parametrize(
+    "store_cls, attr",
+    [(_AddMessageStore, "messages"), (_AppendStore, "items"), (_PairCreateStore, "rows")],
+)
+def test_pair_stores_receive_user_id_and_message(store_cls, attr):
+    store = store_cls()
+    sa.adapt(store).write("u1", "user", "hello", record_id="ignored")
+    assert getattr(store, attr) == [("u1", {"role": "user", "content": "hello"})]
+
+
+def test_single_arg_write_store_and_unsupported_store():
+    store = _DictWriteStore()
+    sa.adapt(store).write("u1", "user", "hello")
+    assert store.rows == [{"role": "user", "content": "hello"}]
+
+    with pytest.raises(AttributeError):
+        sa.adapt(object())
+
+
+def test_strategy_is_resolved_once_per_type(monkeypatch):
+    calls = []
+    original = sa._resolve
+
+    def counting_resolve(store):
+        calls.append(type(store))
+        return original(store)
+
+    monkeypatch.setattr(sa, "_STRATEGIES", {})
+    monkeypatch.setattr(sa, "_resolve", counting_resolve)
+    for _ in range(3):
+        sa.adapt(_AppendStore()).write("u1", "user", "x")
+        sa.adapt(InMemoryStore())
+    assert calls == [_AppendStore, InMemoryStore]
+
+    adapter = sa.adapt(_AppendStore())
+    assert sa.adapt(adapter) is adapter
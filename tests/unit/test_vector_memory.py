@@ -0,0 +1,98 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from personal_chatbot.src.memory_manager import MemoryRecord
+from personal_chatbot.src.vector_memory import HashingEmbedder, VectorMemory
+
+
+def _rec(rid, text, user="u1"):
+    return MemoryRecord(id=rid, user_id=user, content=text, metadata={})
+
+
+def test_hashing_embedder_is_deterministic_and_sized():
+    emb = HashingEmbedder(dim=64)
+    a = emb.embed(["hello world", "hello world", "other"])
+    assert a.shape == (3, 64) and a.dtype == np.float32
+    assert np.array_equal(a[0], a[1])
+    assert not np.array_equal(a[0], a[2])
+
+
+def test_search_returns_most_similar_records_for_user():
+    memory = VectorMemory(HashingEmbedder(dim=128))
+    memory.add_many([
+        _rec("a", "my cat likes tuna and naps in the sun"),
+        _rec("b", "quarterly budget spreadsheet for finance"),
+        _rec("c", "the cat naps all day"),
+        _rec("d", "cat naps", user="u2"),
+    ])
+
+    hits = memory.search("u1", "cat naps", k=2)
+    assert [rid for rid, _ in hits] == ["c", "a"]
+    assert 1.0 >= hits[0][1] > hits[1][1] > 0
+    assert [rid for rid, _ in memory.search("u2", "cat naps", k=5)] == ["d"]
+    assert memory.search("nobody", "cat") == []
+
+    assert memory.remove("c") is True
+    assert memory.remove("c") is False
+    assert [rid for rid, _ in memory.search("u1", "cat naps", k=1)] == ["a"]
+
+
+def test_duplicate_ids_in_one_batch_keep_the_last():
+    memory = VectorMemory(HashingEmbedder(dim=64))
+    memory.add_many([_rec("a", "first draft about cats"), _rec("b", "unrelated"), _rec("a", "gardening notes")])
+    assert len(memory) == 2
+    hits = memory.search("u1", "gardening notes", k=5)
+    assert [rid for rid, _ in hits] == ["a", "b"]
+    assert hits[0][1] == pytest.approx(1.0)
+
+
+def test_growth_beyond_initial_capacity(monkeypatch):
+    monkeypatch.setattr(VectorMemory, "_INITIAL_CAPACITY", 4)
+    memory = VectorMemory(HashingEmbedder(dim=32))
+    memory.add_many([_rec(str(i), f"note number {i}") for i in range(10)])
+    assert len(memory) == 10
+    assert memory.search("u1", "note number 7", k=1)[0][0] == "7"
+
+
+def test_memory_mapped_index_reloads_without_reembedding(tmp_path, monkeypatch):
+    monkeypatch.setattr(VectorMemory, "_INITIAL_CAPACITY", 4)
+    memory = VectorMemory(HashingEmbedder(dim=32), tmp_path / "vec")
+    memory.add_many([_rec(str(i), f"entry {i} about topic{i % 3}") for i in range(9)])
+    memory.remove("4")
+    memory.add(_rec("2", "replaced entry about gardening"))
+    memory.close()
+
+    # Torn trailing write from a crash is ignored
+    with open(tmp_path / "vec" / "rows.tsv", "a", encoding="utf-8") as fh:
+        fh.write("+\tpartial")
+
+    class _NoEmbed(HashingEmbedder):
+        def embed(self, texts):
+            if len(texts) > 1:
+                raise AssertionError("history must not be re-embedded")
+            return super().embed(texts)
+
+    reloaded = VectorMemory(_NoEmbed(dim=32), tmp_path / "vec")
+    assert len(reloaded) == 8
+    assert reloaded.search("u1", "gardening", k=1)[0][0] == "2"
+    assert "4" not in {rid for rid, _ in reloaded.search("u1", "entry 4", k=9)}
+    reloaded.add(_rec("new", "appended after reload"))
+    reloaded.close()
+    assert len(VectorMemory(HashingEmbedder(dim=32), tmp_path / "vec")) == 9
+
+    with pytest.raises(ValueError):
+        VectorMemory(HashingEmbedder(dim=16), tmp_path / "vec")
+
+
+def test_ids_with_separators_survive_a_reload(tmp_path):
+    odd = ["tab\tid", "line\nid", "back\\tslash", "crlf\r\n", "plain"]
+    memory = VectorMemory(HashingEmbedder(dim=32), tmp_path / "vec")
+    memory.add_many([_rec(rid, f"note {i} about apples", user=f"u\t{i % 2}") for i, rid in enumerate(odd)])
+    memory.remove("line\nid")
+    memory.close()
+
+    reloaded = VectorMemory(HashingEmbedder(dim=32), tmp_path / "vec")
+    assert len(reloaded) == 4
+    found = {rid for user in ("u\t0", "u\t1") for rid, _ in reloaded.search(user, "apples", k=5)}
+    assert found == {"tab\tid", "back\\tslash", "crlf\r\n", "plain"}